@@ -0,0 +1,56 @@
+"""add task position key
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from itertools import groupby
+
+from utils.fractional_index import generate_n_keys_between
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Add fractional ordering key (byte-order collation so keys sort correctly)
+    op.add_column(
+        'tasks',
+        sa.Column('position_key', sa.String(length=255, collation='C'), nullable=True)
+    )
+    
+    # Backfill keys from the current integer positions, per sibling group
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, user_id, project_id, parent_task_id FROM tasks "
+        "ORDER BY user_id, project_id, parent_task_id, position, created_at, id"
+    ))
+    
+    for _, group in groupby(rows, key=lambda row: (row.user_id, row.project_id, row.parent_task_id)):
+        ids = [row.id for row in group]
+        keys = generate_n_keys_between(None, None, len(ids))
+        bind.execute(
+            sa.text("UPDATE tasks SET position_key = :key WHERE id = :id"),
+            [{"id": task_id, "key": key} for task_id, key in zip(ids, keys)]
+        )
+    
+    # Create index
+    op.create_index(
+        'idx_task_position_key',
+        'tasks',
+        ['user_id', 'project_id', 'parent_task_id', 'position_key']
+    )
+
+
+def downgrade() -> None:
+    # Drop index
+    op.drop_index('idx_task_position_key', table_name='tasks')
+    
+    # Drop column
+    op.drop_column('tasks', 'position_key')
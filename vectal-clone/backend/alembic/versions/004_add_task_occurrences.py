@@ -0,0 +1,56 @@
+"""add task occurrences
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create task_occurrences table
+    op.create_table(
+        'task_occurrences',
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('occurs_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id', 'occurs_at')
+    )
+    
+    # Create task_recurrence_expansions table
+    op.create_table(
+        'task_recurrence_expansions',
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('recurrence_rule', sa.Text(), nullable=False),
+        sa.Column('dtstart', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expanded_from', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expanded_until', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expanded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    
+    # Create indexes
+    op.create_index('idx_occurrence_user_time', 'task_occurrences', ['user_id', 'occurs_at'])
+    op.create_index('idx_expansion_until', 'task_recurrence_expansions', ['expanded_until'])
+
+
+def downgrade() -> None:
+    # Drop indexes
+    op.drop_index('idx_expansion_until', table_name='task_recurrence_expansions')
+    op.drop_index('idx_occurrence_user_time', table_name='task_occurrences')
+    
+    # Drop tables
+    op.drop_table('task_recurrence_expansions')
+    op.drop_table('task_occurrences')
@@ -0,0 +1,21 @@
+"""
+Admin access dependency
+"""
+from fastapi import Header, HTTPException, status
+from typing import Optional
+import hmac
+
+from utils.config import settings
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured ADMIN_TOKEN
+
+    Admin endpoints are opt-in: without PROFILING_ENABLED and an ADMIN_TOKEN
+    they answer 404 as if they did not exist.
+    """
+    expected = getattr(settings, "ADMIN_TOKEN", None)
+    if not getattr(settings, "PROFILING_ENABLED", False) or not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,35 @@
+"""
+Database session dependencies
+"""
+from typing import AsyncGenerator
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies.resources import get_app_resources
+from utils.replica_routing import replica_router, writer_key
+from utils.resources import AppResources
+
+
+async def get_db(
+    resources: AppResources = Depends(get_app_resources)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the primary from the container's pool"""
+    async with resources.session_factory() as session:
+        yield session
+
+
+async def get_read_db(
+    request: Request,
+    resources: AppResources = Depends(get_app_resources)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes
+
+    Uses the read replica unless none is configured, it lags, or the
+    caller wrote recently; otherwise the primary, like get_db.
+    Read-your-writes only covers the caller, so routes whose results
+    go into the read cache use get_db instead.
+    """
+    factory = await replica_router.session_factory(resources, writer_key(request.headers.get("authorization")))
+    async with factory() as session:
+        yield session
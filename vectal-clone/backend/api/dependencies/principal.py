@@ -0,0 +1,31 @@
+"""
+Authenticated user dependency backed by the principal cache
+"""
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies.database import get_db
+from models.user import User
+from services.principal_cache import resolve_user
+
+security = HTTPBearer()
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """User for the bearer token; Postgres is only read on a cache miss
+
+    The user is detached and has no password_hash; routes that check
+    credentials reload the row.
+    """
+    user = await resolve_user(db, credentials.credentials)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
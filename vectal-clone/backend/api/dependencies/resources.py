@@ -0,0 +1,11 @@
+"""
+Application resource dependency
+"""
+from fastapi import Request
+
+from utils.resources import AppResources, get_resources
+
+
+def get_app_resources(request: Request) -> AppResources:
+    """Resource container of the app serving the request"""
+    return getattr(request.app.state, "resources", None) or get_resources()
@@ -0,0 +1,182 @@
+"""
+Response compression middleware
+
+Replaces Starlette's GZipMiddleware:
+- negotiates zstd / Brotli / gzip from Accept-Encoding
+- never touches text/event-stream, already-encoded or binary bodies
+- streams are compressed chunk by chunk and flushed, so clients see each
+  chunk as soon as the route yields it
+- large bodies are compressed in a worker thread, off the event loop
+- compressed bodies of GET responses carrying an ETag are cached, so
+  cacheable payloads (e.g. rendered markdown) are compressed once
+"""
+from typing import Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from utils.compression import StreamCompressor, compress, negotiate_encoding
+from utils.ttl_cache import TTLCache
+
+# Smaller bodies are sent as-is
+COMPRESSION_MINIMUM_SIZE = 1000
+
+# Bodies (or stream chunks) at least this large are compressed in a thread
+COMPRESSION_THREAD_THRESHOLD = 256 * 1024
+
+# Pre-compressed body cache
+COMPRESSION_CACHE_MAXSIZE = 512
+COMPRESSION_CACHE_TTL = 300
+COMPRESSION_CACHE_MAX_BODY = 1024 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+NEVER_COMPRESSED_TYPES = ("text/event-stream",)
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    if content_type in NEVER_COMPRESSED_TYPES:
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        thread_threshold: int = COMPRESSION_THREAD_THRESHOLD,
+        preference: Optional[Sequence[str]] = None,
+        cache: Optional[TTLCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_threshold = thread_threshold
+        self.preference = list(preference) if preference else None
+        self.cache = cache if cache is not None else TTLCache(COMPRESSION_CACHE_MAXSIZE, COMPRESSION_CACHE_TTL)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    async def compress_body(self, data: bytes, encoding: str) -> bytes:
+        if len(data) >= self.thread_threshold:
+            return await run_in_threadpool(compress, data, encoding)
+        return compress(data, encoding)
+
+
+class _CompressionResponder:
+    """Per-response state: buffers the start message until the body shape is known"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = await self._compress_chunk(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        if more_body:
+            # First chunk of a streaming body
+            self.stream = StreamCompressor(self.encoding)
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self._send(self.start_message)
+            chunk = await self._compress_chunk(body) if body else b""
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+            return
+
+        if len(body) < self.middleware.minimum_size:
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        compressed = await self._compress_complete(body)
+        headers = self._encoded_headers()
+        headers["content-length"] = str(len(compressed))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _eligible(self, message) -> bool:
+        status = message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        return _compressible(headers.get("content-type", ""))
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(scope=self.start_message)
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def _compress_chunk(self, chunk: bytes) -> bytes:
+        if len(chunk) >= self.middleware.thread_threshold:
+            return await run_in_threadpool(self.stream.compress, chunk)
+        return self.stream.compress(chunk)
+
+    def _cache_key(self, body: bytes):
+        """Key for cacheable bodies: GET responses with an ETag and no 'no-store'"""
+        if self.scope["method"] != "GET" or len(body) > COMPRESSION_CACHE_MAX_BODY:
+            return None
+        headers = Headers(raw=self.start_message["headers"])
+        etag = headers.get("etag")
+        if not etag or "no-store" in headers.get("cache-control", ""):
+            return None
+        return (self.scope["path"], self.scope.get("query_string", b""), etag, self.encoding, len(body))
+
+    async def _compress_complete(self, body: bytes) -> bytes:
+        key = self._cache_key(body)
+        if key is not None:
+            cached = self.middleware.cache.get(key)
+            if cached is not None:
+                return cached
+
+        compressed = await self.middleware.compress_body(body, self.encoding)
+        if key is not None:
+            self.middleware.cache.set(key, compressed)
+        return compressed
@@ -0,0 +1,55 @@
+"""
+Request metrics middleware
+
+Observes every HTTP request in http_request_duration_seconds, labelled by
+the matched route template (never the raw path, so IDs do not create new
+series). With server_timing enabled, responses also carry a Server-Timing
+header breaking down Postgres, MongoDB and OpenAI time for the request.
+"""
+from typing import Iterable
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from utils.metrics import HTTP_REQUEST_DURATION, start_request_timings
+
+# Paths not observed (scrapes would otherwise dominate the histogram)
+DEFAULT_EXCLUDED_PATHS = ("/metrics",)
+
+
+def route_label(scope) -> str:
+    """Route template the request matched, or 'unmatched'"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency histograms"""
+
+    def __init__(self, app, server_timing: bool = False, excluded_paths: Iterable[str] = DEFAULT_EXCLUDED_PATHS):
+        self.app = app
+        self.server_timing = server_timing
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], route_label(scope), str(status_code)
+            ).observe(time.perf_counter() - timings.started)
@@ -0,0 +1,67 @@
+"""
+Query count middleware
+
+Counts the SQL statements and MongoDB commands each request runs. A query
+shape repeated repeat_threshold times (an N+1 loop) is logged with the
+stack that issued it; requests over total_threshold queries are logged
+with their most frequent shapes. With header enabled, responses carry
+X-Query-Count (counted up to the moment headers are sent).
+"""
+from typing import Optional
+import logging
+
+from starlette.datastructures import MutableHeaders
+
+from api.middleware.metrics import route_label
+from utils.query_counter import N_PLUS_ONE_THRESHOLD, QUERY_COUNT_WARN_THRESHOLD, QueryCounter, count_queries
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+class QueryCountMiddleware:
+    """ASGI middleware reporting per-request query counts and N+1 patterns"""
+
+    def __init__(
+        self,
+        app,
+        header: bool = False,
+        repeat_threshold: int = N_PLUS_ONE_THRESHOLD,
+        total_threshold: Optional[int] = QUERY_COUNT_WARN_THRESHOLD
+    ):
+        self.app = app
+        self.header = header
+        self.repeat_threshold = repeat_threshold
+        self.total_threshold = total_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter(repeat_threshold=self.repeat_threshold)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start" and self.header:
+                MutableHeaders(scope=message).append(QUERY_COUNT_HEADER, counter.header())
+            await send(message)
+
+        with count_queries(counter):
+            try:
+                await self.app(scope, receive, send_with_count)
+            finally:
+                self._report(scope, counter)
+
+    def _report(self, scope, counter: QueryCounter):
+        endpoint = f"{scope['method']} {route_label(scope)}"
+
+        for kind, shape, count, stack in counter.repeated():
+            logger.warning(
+                f"Possible N+1 in {endpoint}: {count}x {kind}: {shape[:300]}"
+                + "".join(f"\n    at {frame}" for frame in stack)
+            )
+
+        total = counter.count()
+        if self.total_threshold is not None and total > self.total_threshold:
+            logger.warning(f"{endpoint} ran {total} queries ({counter.header()}):\n{counter.summary()}")
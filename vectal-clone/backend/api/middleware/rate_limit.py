@@ -0,0 +1,144 @@
+"""
+Rate limiting middleware
+
+Requests matching a RateLimitRule are counted per user (or per client IP
+for anonymous requests) before they reach the route. Every limited
+response carries RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset
+and RateLimit-Policy headers; rejected requests get 429 with Retry-After.
+"""
+from typing import Iterable, List, Optional
+import math
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from utils.rate_limiter import RateLimiter, RateLimitResult, SLIDING_WINDOW, TOKEN_BUCKET
+
+
+class RateLimitRule:
+    """Limit for requests matching a path (a trailing '*' matches a prefix)"""
+
+    def __init__(
+        self,
+        path: str,
+        limit: int,
+        window: float,
+        methods: Optional[Iterable[str]] = None,
+        algorithm: str = SLIDING_WINDOW,
+        scope: str = "user"
+    ):
+        if algorithm not in (SLIDING_WINDOW, TOKEN_BUCKET):
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        if scope not in ("user", "ip", "global"):
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        self.path = path
+        self.limit = limit
+        self.window = window
+        self.methods = {m.upper() for m in methods} if methods else None
+        self.algorithm = algorithm
+        self.scope = scope
+
+    @property
+    def name(self) -> str:
+        methods = ",".join(sorted(self.methods)) if self.methods else "*"
+        return f"{methods}:{self.path}"
+
+    @property
+    def policy(self) -> str:
+        return f"{self.limit};w={math.ceil(self.window)}"
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        if self.path.endswith("*"):
+            return path.startswith(self.path[:-1])
+        return path == self.path
+
+
+# Expensive endpoints limited by default
+DEFAULT_RATE_LIMIT_RULES = [
+    RateLimitRule("/api/v1/chat/message", limit=20, window=60, methods=["POST"], algorithm=TOKEN_BUCKET),
+    RateLimitRule("/api/v1/notes/search", limit=60, window=60, methods=["GET"]),
+    RateLimitRule("/api/v1/tasks/import", limit=10, window=60, methods=["POST"]),
+    RateLimitRule("/api/v1/export", limit=5, window=60, methods=["GET"]),
+]
+
+
+def rate_limit_headers(rule: RateLimitRule, result: RateLimitResult) -> dict:
+    """RateLimit-* response headers for a check"""
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(math.ceil(result.reset)),
+        "RateLimit-Policy": rule.policy,
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+    return headers
+
+
+def _client_identity(scope, rule: RateLimitRule) -> str:
+    """Bucket a request belongs to under a rule's scope"""
+    if rule.scope == "global":
+        return "global"
+
+    if rule.scope == "user":
+        authorization = Headers(scope=scope).get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            from services.principal_cache import principal_cache
+            payload = principal_cache.verify_token(authorization[7:].strip())
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the first matching rule to each request"""
+
+    def __init__(
+        self,
+        app,
+        rules: Optional[List[RateLimitRule]] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
+        self.app = app
+        self.rules = DEFAULT_RATE_LIMIT_RULES if rules is None else rules
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = next((r for r in self.rules if r.matches(scope["method"], scope["path"])), None)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{rule.name}:{_client_identity(scope, rule)}"
+        result = await self.limiter.hit(key, rule.limit, rule.window, rule.algorithm)
+        headers = rate_limit_headers(rule, result)
+
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": {
+                        "code": "RATE_LIMITED",
+                        "message": "Rate limit exceeded",
+                        "details": None
+                    }
+                },
+                headers=headers
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,36 @@
+"""
+Read-your-writes middleware
+
+Successful POST/PUT/PATCH/DELETE requests mark their caller as a recent
+writer, so get_read_db keeps that caller's reads on the primary until the
+read replica has caught up (see utils.replica_routing). The mark is made
+when the response starts, before the client can issue its next read.
+"""
+from starlette.datastructures import Headers
+
+from utils.replica_routing import UNSAFE_METHODS, ReplicaRouter, replica_router, writer_key
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware recording writers for replica routing"""
+
+    def __init__(self, app, router: ReplicaRouter = replica_router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        writer = writer_key(Headers(scope=scope).get("authorization"))
+        if writer is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_marking(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                await self.router.mark_write(writer)
+            await send(message)
+
+        await self.app(scope, receive, send_after_marking)
@@ -0,0 +1,51 @@
+"""
+Change feed API routes
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from services.change_feed import change_feed, parse_stream_id
+from api.dependencies.auth import get_current_user
+from api.dependencies.resources import get_app_resources
+from utils.resources import AppResources
+from models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_changes(
+    since: Optional[str] = Query(None, description="Resume after this event ID"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    resources: AppResources = Depends(get_app_resources)
+):
+    """
+    Server-sent events for task, note, project and collaborator changes
+
+    Each event's id is its sequence number. Reconnecting with Last-Event-ID
+    (EventSource does this automatically) or ?since= replays what was
+    missed; a 'reset' event means the client should refetch its lists.
+    """
+    since = since or last_event_id
+    if since is not None:
+        try:
+            parse_stream_id(since)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def events():
+        async for event in change_feed.subscribe(current_user.id, since):
+            yield ": keepalive\n\n" if event is None else event.to_sse()
+
+    return StreamingResponse(
+        resources.track_stream(events()),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -1,7 +1,7 @@
 """
 Chat API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from typing import Optional
 import math
@@ -16,7 +16,12 @@ from models.schemas.chat import (
     MessageResponse
 )
 from services.chat_service import ChatService
+from services.read_cache import CONVERSATIONS, read_cache
+from utils.responses import RawJSONResponse
+from utils.http_cache import cache_headers, make_etag, not_modified
 from api.dependencies.auth import get_current_user
+from api.dependencies.resources import get_app_resources
+from utils.resources import AppResources, ShuttingDown
 from models.user import User
 import logging
 
@@ -28,7 +33,8 @@ router = APIRouter()
 async def send_message(
     message_data: MessageCreate,
     stream: bool = False,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    resources: AppResources = Depends(get_app_resources)
 ):
     """Send a chat message and get AI response"""
     try:
@@ -45,7 +51,7 @@ async def send_message(
                 ):
                     yield chunk
             
-            return StreamingResponse(generate(), media_type="text/event-stream")
+            return StreamingResponse(resources.track_stream(generate()), media_type="text/event-stream")
         else:
             # Return complete response
             result = await ChatService.send_message(
@@ -57,6 +63,8 @@ async def send_message(
             
             return ChatResponse(**result)
             
+    except ShuttingDown:
+        raise
     except Exception as e:
         logger.error(f"Error sending message: {e}")
         raise HTTPException(
@@ -74,31 +82,39 @@ async def get_conversations(
 ):
     """Get user's conversations"""
     try:
-        conversations, total = await ChatService.get_conversations(
-            str(current_user.id),
-            is_archived,
-            page,
-            page_size
-        )
-        
-        # Convert to response
-        conv_responses = []
-        for conv in conversations:
-            response = ConversationResponse(
-                **conv.model_dump(),
-                message_count=len(conv.messages)
+        async def load():
+            conversations, total = await ChatService.get_conversations(
+                str(current_user.id),
+                is_archived,
+                page,
+                page_size
+            )
+            
+            # Convert to response
+            conv_responses = []
+            for conv in conversations:
+                response = ConversationResponse(
+                    **conv.model_dump(exclude={"messages"}),
+                    message_count=len(conv.messages)
+                )
+                conv_responses.append(response)
+            
+            total_pages = math.ceil(total / page_size)
+            
+            return ConversationListResponse(
+                items=conv_responses,
+                total=total,
+                page=page,
+                page_size=page_size,
+                total_pages=total_pages
             )
-            conv_responses.append(response)
-        
-        total_pages = math.ceil(total / page_size)
         
-        return ConversationListResponse(
-            items=conv_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
-        )
+        body = await read_cache.fetch(current_user.id, CONVERSATIONS, {
+            "is_archived": is_archived,
+            "page": page,
+            "page_size": page_size,
+        }, load)
+        return RawJSONResponse(body)
     except Exception as e:
         logger.error(f"Error getting conversations: {e}")
         raise HTTPException(
@@ -110,30 +126,50 @@ async def get_conversations(
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation(
     conversation_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific conversation with messages"""
-    conversation = await ChatService.get_conversation(
-        conversation_id,
-        str(current_user.id)
-    )
+    stamp = await ChatService.get_conversation_stamp(conversation_id, str(current_user.id))
     
-    if not conversation:
+    if not stamp:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
     
-    # Convert messages
-    messages = [MessageResponse(**msg.model_dump()) for msg in conversation.messages]
+    etag = make_etag("conversation", conversation_id, stamp["updated_at"])
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    response = ConversationDetailResponse(
-        **conversation.model_dump(),
-        message_count=len(conversation.messages),
-        messages=messages
-    )
+    async def load():
+        conversation = await ChatService.get_conversation(
+            conversation_id,
+            str(current_user.id)
+        )
+        
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+        
+        # Convert messages
+        messages = [MessageResponse(**msg.model_dump()) for msg in conversation.messages]
+        
+        return ConversationDetailResponse(
+            **conversation.model_dump(exclude={"messages"}),
+            message_count=len(conversation.messages),
+            messages=messages
+        )
     
-    return response
+    # Keyed by the stamp as well, so a cached body always matches its ETag
+    body = await read_cache.fetch(current_user.id, CONVERSATIONS, {
+        "id": conversation_id,
+        "updated_at": stamp["updated_at"],
+    }, load)
+    return RawJSONResponse(body, headers=cache_headers(etag))
 
 
 @router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
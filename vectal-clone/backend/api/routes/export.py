@@ -0,0 +1,43 @@
+"""
+Export API routes
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+
+from services.export_service import ExportService
+from api.dependencies.auth import get_current_user
+from api.dependencies.resources import get_app_resources
+from utils.resources import AppResources
+from models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+@router.get("")
+async def export_data(
+    format: str = Query("ndjson", pattern=r'^(ndjson|json)$'),
+    current_user: User = Depends(get_current_user),
+    resources: AppResources = Depends(get_app_resources)
+):
+    """Stream all tasks, notes and conversations for the current user"""
+    if format == "ndjson":
+        body = ExportService.stream_ndjson(current_user.id)
+    else:
+        body = ExportService.stream_json(current_user.id)
+    
+    filename = f"vectal-export-{datetime.utcnow():%Y%m%d}.{format}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    
+    # Compressed by CompressionMiddleware, negotiated from Accept-Encoding
+    logger.info(f"Export started for user {current_user.id} ({format})")
+    return StreamingResponse(resources.track_stream(body), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
@@ -1,7 +1,7 @@
 """
 Note API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from typing import Optional, List
 import math
 
@@ -15,6 +15,9 @@ from models.schemas.note import (
     NoteSearchListResponse
 )
 from services.note_service import NoteService
+from services.read_cache import NOTES, read_cache
+from utils.responses import ModelResponse, RawJSONResponse
+from utils.http_cache import CACHE_IMMUTABLE, cache_headers, make_etag, not_modified
 from api.dependencies.auth import get_current_user
 from models.user import User
 import logging
@@ -60,33 +63,46 @@ async def get_notes(
         # Parse tags
         tag_list = tags.split(",") if tags else None
         
-        notes, total = await NoteService.get_notes(
-            str(current_user.id),
-            project_id,
-            tag_list,
-            is_pinned,
-            is_archived,
-            page,
-            page_size
-        )
-        
-        # Convert to response
-        note_responses = []
-        for note in notes:
-            response = NoteResponse(**note.model_dump())
-            response.preview = NoteService._generate_preview(note.content)
-            response.word_count = len(note.content.split())
-            note_responses.append(response)
-        
-        total_pages = math.ceil(total / page_size)
+        async def load():
+            notes, total = await NoteService.get_notes(
+                str(current_user.id),
+                project_id,
+                tag_list,
+                is_pinned,
+                is_archived,
+                page,
+                page_size
+            )
+            
+            # Convert to response
+            note_responses = []
+            for note in notes:
+                response = NoteResponse.model_validate(note, from_attributes=True)
+                response.preview = NoteService._generate_preview(note.content)
+                response.word_count = len(note.content.split())
+                note_responses.append(response)
+            
+            total_pages = math.ceil(total / page_size)
+            
+            return NoteListResponse(
+                items=note_responses,
+                total=total,
+                page=page,
+                page_size=page_size,
+                total_pages=total_pages
+            )
         
-        return NoteListResponse(
-            items=note_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
-        )
+        # Serialized once, then served from Redis until the user's next note write
+        body = await read_cache.fetch(current_user.id, NOTES, {
+            "list": True,
+            "project_id": project_id,
+            "tags": tag_list,
+            "is_pinned": is_pinned,
+            "is_archived": is_archived,
+            "page": page,
+            "page_size": page_size,
+        }, load)
+        return RawJSONResponse(body)
     except Exception as e:
         logger.error(f"Error getting notes: {e}")
         raise HTTPException(
@@ -104,20 +120,26 @@ async def search_notes(
 ):
     """Search notes with full-text search"""
     try:
-        results, total = await NoteService.search_notes(
-            str(current_user.id),
-            q,
-            page,
-            page_size
-        )
+        async def load():
+            results, total = await NoteService.search_notes(
+                str(current_user.id),
+                q,
+                page,
+                page_size
+            )
+            
+            search_responses = [NoteSearchResponse(**result) for result in results]
+            
+            return NoteSearchListResponse(
+                items=search_responses,
+                total=total,
+                query=q
+            )
         
-        search_responses = [NoteSearchResponse(**result) for result in results]
-        
-        return NoteSearchListResponse(
-            items=search_responses,
-            total=total,
-            query=q
+        body = await read_cache.fetch(
+            current_user.id, NOTES, {"search": q, "page": page, "page_size": page_size}, load
         )
+        return RawJSONResponse(body)
     except Exception as e:
         logger.error(f"Error searching notes: {e}")
         raise HTTPException(
@@ -129,9 +151,22 @@ async def search_notes(
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific note"""
+    stamp = await NoteService.get_note_stamp(note_id, str(current_user.id))
+    
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    
+    cached = not_modified(request, make_etag("note", note_id, stamp["updated_at"], stamp["current_version"]))
+    if cached:
+        return cached
+    
     note = await NoteService.get_note(note_id, str(current_user.id))
     
     if not note:
@@ -144,7 +179,8 @@ async def get_note(
     response.preview = NoteService._generate_preview(note.content)
     response.word_count = len(note.content.split())
     
-    return response
+    etag = make_etag("note", note_id, note.updated_at, note.current_version)
+    return ModelResponse(response, headers=cache_headers(etag))
 
 
 @router.patch("/{note_id}", response_model=NoteResponse)
@@ -189,12 +225,61 @@ async def delete_note(
 @router.get("/{note_id}/versions", response_model=List[NoteVersionResponse])
 async def get_note_versions(
     note_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get version history for a note"""
+    # History grows when the content changes (current_version) and shrinks
+    # when it is compacted (history_revision)
+    stamp = await NoteService.get_note_stamp(note_id, str(current_user.id))
+    if not stamp:
+        return []
+    
+    etag = make_etag("note-versions", note_id, stamp["current_version"], stamp.get("history_revision", 0))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     versions = await NoteService.get_note_versions(note_id, str(current_user.id))
     
-    return [NoteVersionResponse(**v.model_dump()) for v in versions]
+    response = [NoteVersionResponse(**v.model_dump()).model_dump(mode="json") for v in versions]
+    return ModelResponse(response, headers=cache_headers(etag))
+
+
+@router.get("/{note_id}/versions/{version}", response_model=NoteVersionResponse)
+async def get_note_version(
+    note_id: str,
+    version: int,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Get one archived version of a note (immutable)"""
+    # Archived versions never change; compaction can only remove them, so
+    # check the version still exists before answering 304
+    stamp = await NoteService.get_note_stamp(note_id, str(current_user.id), version)
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note version not found"
+        )
+    
+    etag = make_etag("note-version", note_id, version, stamp.get("history_revision", 0))
+    cached = not_modified(request, etag, CACHE_IMMUTABLE)
+    if cached:
+        return cached
+    
+    note_version = await NoteService.get_note_version(note_id, str(current_user.id), version)
+    
+    if not note_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note version not found"
+        )
+    
+    return ModelResponse(
+        NoteVersionResponse(**note_version.model_dump()),
+        headers=cache_headers(etag, CACHE_IMMUTABLE)
+    )
 
 
 @router.get("/{note_id}/links")
@@ -214,12 +299,30 @@ async def get_note_links(
     return links
 
 
+@router.get("/{note_id}/render")
 @router.post("/{note_id}/render")
 async def render_note_markdown(
     note_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Render note markdown to HTML"""
+    # current_version changes exactly when the content does. The ETag also
+    # lets CompressionMiddleware reuse the compressed body.
+    stamp = await NoteService.get_note_stamp(note_id, str(current_user.id))
+    
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    
+    etag = make_etag("note-render", note_id, stamp["current_version"])
+    if request.method == "GET":
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+    
     note = await NoteService.get_note(note_id, str(current_user.id))
     
     if not note:
@@ -230,4 +333,5 @@ async def render_note_markdown(
     
     html = NoteService.render_markdown(note.content)
     
-    return {"html": html}
+    etag = make_etag("note-render", note_id, note.current_version)
+    return ModelResponse({"html": html}, headers=cache_headers(etag))
@@ -0,0 +1,45 @@
+"""
+On-demand profiling API routes (admin only, opt-in)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from api.dependencies.admin import require_admin_token
+from utils.profiler import PROFILE_MAX_SECONDS, ProfilerBusy, profile_cpu, profile_memory
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/cpu", response_class=PlainTextResponse, include_in_schema=False)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False
+):
+    """
+    Sample this worker's stacks for `seconds`
+
+    Returns collapsed stacks weighted by sample count; pipe them into
+    flamegraph.pl or load them in speedscope. Only the worker that serves
+    the request is profiled.
+    """
+    try:
+        collapsed = await profile_cpu(seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(collapsed)
+
+
+@router.get("/memory", response_class=PlainTextResponse, include_in_schema=False)
+async def memory_profile(seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS)):
+    """
+    Trace allocations in this worker for `seconds`
+
+    Returns collapsed allocation tracebacks weighted by bytes still live at
+    the end of the window.
+    """
+    try:
+        collapsed = await profile_memory(seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(collapsed)
@@ -1,13 +1,14 @@
 """
 Project API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import uuid
 import math
 
-from db.postgres import get_db
+import orjson
+
 from models.schemas.project import (
     ProjectCreate,
     ProjectUpdate,
@@ -20,7 +21,11 @@ from models.schemas.project import (
     ProjectWithCollaborators
 )
 from services.project_service import ProjectService
+from services.read_cache import PROJECTS, read_cache
+from utils.responses import ModelResponse, RawJSONResponse
+from utils.http_cache import cache_headers, make_etag, not_modified
 from api.dependencies.auth import get_current_user
+from api.dependencies.database import get_db, get_read_db
 from models.user import User
 import logging
 
@@ -28,6 +33,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _with_progress(response, progress: Optional[dict]):
+    """Copy task counts onto a project response"""
+    if progress:
+        response.task_count = progress['total_tasks']
+        response.completed_task_count = progress['completed_tasks']
+        response.progress_percentage = progress['progress_percentage']
+    return response
+
+
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
@@ -38,16 +52,10 @@ async def create_project(
     try:
         project = await ProjectService.create_project(db, current_user.id, project_data)
         
-        # Get progress
-        progress = await ProjectService.get_project_progress(db, project.id, current_user.id)
+        # The creator owns the project, so no access check is needed
+        progress = await ProjectService.get_projects_progress(db, [project.id])
         
-        response = ProjectResponse.model_validate(project)
-        if progress:
-            response.task_count = progress['total_tasks']
-            response.completed_task_count = progress['completed_tasks']
-            response.progress_percentage = progress['progress_percentage']
-        
-        return response
+        return _with_progress(ProjectResponse.model_validate(project), progress.get(project.id))
     except Exception as e:
         logger.error(f"Error creating project: {e}")
         raise HTTPException(
@@ -63,34 +71,47 @@ async def get_projects(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
+    # Primary, not get_read_db: the body is cached for every member under
+    # the current generation, so it must not come from a lagging replica
     db: AsyncSession = Depends(get_db)
 ):
-    """Get projects with filtering and pagination"""
+    """Get projects with filtering and pagination
+
+    The page is cached without task counts: tasks are written on paths that
+    do not invalidate PROJECTS, so progress is queried on every request.
+    """
     try:
-        projects, total = await ProjectService.get_projects(
-            db, current_user.id, include_archived, parent_project_id, page, page_size
-        )
-        
-        # Get progress for each project
-        project_responses = []
-        for project in projects:
-            progress = await ProjectService.get_project_progress(db, project.id, current_user.id)
-            project_response = ProjectResponse.model_validate(project)
-            if progress:
-                project_response.task_count = progress['total_tasks']
-                project_response.completed_task_count = progress['completed_tasks']
-                project_response.progress_percentage = progress['progress_percentage']
-            project_responses.append(project_response)
+        async def load():
+            projects, total = await ProjectService.get_projects(
+                db, current_user.id, include_archived, parent_project_id, page, page_size
+            )
+            
+            return ProjectListResponse(
+                items=[ProjectResponse.model_validate(project) for project in projects],
+                total=total,
+                page=page,
+                page_size=page_size,
+                total_pages=math.ceil(total / page_size)
+            )
         
-        total_pages = math.ceil(total / page_size)
+        body = await read_cache.fetch(current_user.id, PROJECTS, {
+            "include_archived": include_archived,
+            "parent_project_id": parent_project_id,
+            "page": page,
+            "page_size": page_size,
+        }, load)
         
-        return ProjectListResponse(
-            items=project_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        # Progress for the whole page in one query
+        content = orjson.loads(body)
+        progress = await ProjectService.get_projects_progress(
+            db, [uuid.UUID(item['id']) for item in content['items']]
         )
+        for item in content['items']:
+            stats = progress[uuid.UUID(item['id'])]
+            item['task_count'] = stats['total_tasks']
+            item['completed_task_count'] = stats['completed_tasks']
+            item['progress_percentage'] = stats['progress_percentage']
+        return ModelResponse(content)
     except Exception as e:
         logger.error(f"Error getting projects: {e}")
         raise HTTPException(
@@ -102,10 +123,25 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectWithCollaborators)
 async def get_project(
     project_id: uuid.UUID,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific project with collaborators"""
+    # One aggregate query covers the project, its task counts and collaborators
+    stamp = await ProjectService.get_project_stamp(db, project_id, current_user.id)
+    
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    etag = make_etag("project", project_id, *stamp)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     project = await ProjectService.get_project(db, project_id, current_user.id)
     
     if not project:
@@ -114,21 +150,17 @@ async def get_project(
             detail="Project not found"
         )
     
-    # Get progress
-    progress = await ProjectService.get_project_progress(db, project.id, current_user.id)
+    # Access was checked by get_project
+    progress = await ProjectService.get_projects_progress(db, [project.id])
     
     # Get collaborators
     collaborators = await ProjectService.get_collaborators(db, project_id, current_user.id)
     
-    response = ProjectWithCollaborators.model_validate(project)
-    if progress:
-        response.task_count = progress['total_tasks']
-        response.completed_task_count = progress['completed_tasks']
-        response.progress_percentage = progress['progress_percentage']
+    response = _with_progress(ProjectWithCollaborators.model_validate(project), progress.get(project.id))
     
     response.collaborators = [CollaboratorResponse.model_validate(c) for c in collaborators]
     
-    return response
+    return ModelResponse(response, headers=cache_headers(etag))
 
 
 @router.patch("/{project_id}", response_model=ProjectResponse)
@@ -147,16 +179,10 @@ async def update_project(
             detail="Project not found or insufficient permissions"
         )
     
-    # Get progress
-    progress = await ProjectService.get_project_progress(db, project.id, current_user.id)
-    
-    response = ProjectResponse.model_validate(project)
-    if progress:
-        response.task_count = progress['total_tasks']
-        response.completed_task_count = progress['completed_tasks']
-        response.progress_percentage = progress['progress_percentage']
+    # update_project already checked the user's role
+    progress = await ProjectService.get_projects_progress(db, [project.id])
     
-    return response
+    return _with_progress(ProjectResponse.model_validate(project), progress.get(project.id))
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -217,7 +243,7 @@ async def unarchive_project(
 async def get_project_progress(
     project_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get project progress statistics"""
     progress = await ProjectService.get_project_progress(db, project_id, current_user.id)
@@ -235,7 +261,7 @@ async def get_project_progress(
 async def get_project_tasks(
     project_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all tasks for a project"""
     from services.task_service import TaskService
@@ -253,13 +279,13 @@ async def get_project_tasks(
     filters = TaskFilter(project_id=project_id)
     tasks, total = await TaskService.get_tasks(db, current_user.id, filters, 1, 1000)
     
-    # Get labels for each task
+    # Labels for every task in one query
     from models.schemas.task import TaskResponse
+    labels = await ProjectService.get_labels_by_task(db, [task.id for task in tasks])
     task_responses = []
     for task in tasks:
-        labels = await TaskService.get_task_labels(db, task.id)
         task_response = TaskResponse.model_validate(task)
-        task_response.labels = labels
+        task_response.labels = labels[task.id]
         task_responses.append(task_response)
     
     return {
@@ -272,7 +298,7 @@ async def get_project_tasks(
 async def get_child_projects(
     project_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get child projects of a parent project"""
     # Check parent project access
@@ -285,16 +311,12 @@ async def get_child_projects(
     
     children = await ProjectService.get_child_projects(db, project_id, current_user.id)
     
-    # Get progress for each child
-    project_responses = []
-    for project in children:
-        progress = await ProjectService.get_project_progress(db, project.id, current_user.id)
-        project_response = ProjectResponse.model_validate(project)
-        if progress:
-            project_response.task_count = progress['total_tasks']
-            project_response.completed_task_count = progress['completed_tasks']
-            project_response.progress_percentage = progress['progress_percentage']
-        project_responses.append(project_response)
+    # Progress for every child in one query
+    progress = await ProjectService.get_projects_progress(db, [project.id for project in children])
+    project_responses = [
+        _with_progress(ProjectResponse.model_validate(project), progress.get(project.id))
+        for project in children
+    ]
     
     return ProjectListResponse(
         items=project_responses,
@@ -344,7 +366,7 @@ async def add_collaborator(
 async def get_collaborators(
     project_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all collaborators for a project"""
     collaborators = await ProjectService.get_collaborators(db, project_id, current_user.id)
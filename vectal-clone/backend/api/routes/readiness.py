@@ -0,0 +1,29 @@
+"""
+Datastore readiness API routes
+"""
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from api.dependencies.resources import get_app_resources
+from utils.datastores import datastores
+from utils.resources import AppResources
+
+router = APIRouter()
+
+
+@router.get("/health/ready")
+async def readiness(resources: AppResources = Depends(get_app_resources)):
+    """
+    Per-store connection status and connect latency
+
+    Returns 503 until every required datastore is connected, and again
+    once the worker starts draining for shutdown.
+    """
+    state = datastores.readiness()
+    state["draining"] = resources.draining
+    if resources.draining:
+        state["ready"] = False
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if state["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=state
+    )
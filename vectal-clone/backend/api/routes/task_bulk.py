@@ -0,0 +1,77 @@
+"""
+Bulk task API routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from api.dependencies.database import get_db
+from models.schemas.task_bulk import TaskImportResponse, TaskBatchRequest
+from models.schemas.task import TaskResponse
+from services.task_bulk_service import TaskBulkService
+from api.dependencies.auth import get_current_user
+from models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    request: Request,
+    format: Optional[str] = Query(None, pattern=r'^(csv|ndjson)$'),
+    atomic: bool = Query(False),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import tasks from a CSV or NDJSON request body"""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    
+    body = await request.body()
+    
+    try:
+        result = await TaskBulkService.import_tasks(db, current_user.id, body, format, atomic)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error importing tasks: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import tasks"
+        )
+    
+    return TaskImportResponse(**result)
+
+
+@router.post("/batch")
+async def batch_update_tasks(
+    batch: TaskBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply many task mutations in a single transaction"""
+    try:
+        tasks, labels = await TaskBulkService.apply_batch(db, current_user.id, batch.operations)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    task_responses = []
+    for task in tasks:
+        task_response = TaskResponse.model_validate(task)
+        task_response.labels = labels.get(task.id, [])
+        task_responses.append(task_response)
+    
+    return {
+        "items": task_responses,
+        "total": len(task_responses)
+    }
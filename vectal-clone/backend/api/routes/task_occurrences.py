@@ -0,0 +1,43 @@
+"""
+Task occurrence API routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+
+from api.dependencies.database import get_db
+from models.schemas.occurrence import TaskOccurrenceResponse, TaskOccurrenceListResponse
+from services.occurrence_service import OccurrenceService
+from api.dependencies.auth import get_current_user
+from models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Longest range a single request may expand
+MAX_OCCURRENCE_RANGE = timedelta(days=366)
+
+
+@router.get("/occurrences", response_model=TaskOccurrenceListResponse)
+async def get_occurrences(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get occurrences of recurring tasks in [start, end)"""
+    if end <= start or end - start > MAX_OCCURRENCE_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start and within one year of it"
+        )
+    
+    items = await OccurrenceService.get_occurrences(db, current_user.id, start, end)
+    
+    return TaskOccurrenceListResponse(
+        items=[TaskOccurrenceResponse(**item) for item in items],
+        total=len(items),
+        start=start,
+        end=end
+    )
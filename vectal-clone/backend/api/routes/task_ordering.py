@@ -0,0 +1,58 @@
+"""
+Task ordering API routes
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+from api.dependencies.database import get_db
+from models.schemas.task import TaskResponse
+from models.schemas.task_ordering import TaskPositionUpdate
+from services.task_ordering_service import TaskOrderingService
+from api.dependencies.auth import get_current_user
+from models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/{task_id}/position", response_model=TaskResponse)
+async def move_task(
+    task_id: uuid.UUID,
+    position: TaskPositionUpdate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Move a task between two siblings"""
+    try:
+        task, needs_rebalance = await TaskOrderingService.move_task(
+            db,
+            current_user.id,
+            task_id,
+            position.after_task_id,
+            position.before_task_id
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    if needs_rebalance:
+        background_tasks.add_task(
+            TaskOrderingService.rebalance_in_background,
+            current_user.id,
+            task.project_id,
+            task.parent_task_id
+        )
+    
+    return TaskResponse.model_validate(task)
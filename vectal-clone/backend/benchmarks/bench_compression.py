@@ -0,0 +1,100 @@
+"""
+Benchmark response compression: CPU time vs bytes on the wire
+
+Run from backend/:
+    python -m benchmarks.bench_compression --sizes 50,500
+
+Compresses a NoteListResponse body and rendered markdown with every
+available encoding at a few levels and reports the median CPU time and
+compressed size, plus the levels CompressionMiddleware uses.
+"""
+import argparse
+import json
+import statistics
+import time
+import zlib
+
+from benchmarks.bench_serialization import CONTENT, make_notes
+from utils import compression
+from utils.compression import brotli, zstandard
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 5, 11],
+    "zstd": [1, 3, 9],
+}
+
+
+def _compressor(encoding: str, level: int):
+    if encoding == "gzip":
+        def run(data):
+            c = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return c.compress(data) + c.flush()
+        return run
+    if encoding == "br":
+        return lambda data: brotli.compress(data, quality=level)
+    compressor = zstandard.ZstdCompressor(level=level)
+    return compressor.compress
+
+
+def measure(data: bytes, encoding: str, level: int, repeat: int) -> dict:
+    run = _compressor(encoding, level)
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        compressed = run(data)
+        timings.append((time.process_time() - started) * 1000)
+    return {
+        "encoding": encoding,
+        "level": level,
+        "cpu_ms": round(statistics.median(timings), 3),
+        "bytes": len(compressed),
+        "ratio": round(len(data) / len(compressed), 1),
+    }
+
+
+def payloads(sizes):
+    import markdown
+
+    for size in sizes:
+        yield f"notes_{size}", make_notes(size).model_dump_json().encode()
+    html = markdown.markdown(CONTENT * 20, extensions=["fenced_code", "tables", "nl2br"])
+    yield "rendered_markdown", json.dumps({"html": html}).encode()
+
+
+def run(sizes, repeat: int):
+    available = [name for name in LEVELS if name in compression.ENCODING_PREFERENCE]
+    results = []
+    for name, data in payloads(sizes):
+        results.append({
+            "payload": name,
+            "raw_bytes": len(data),
+            "results": [
+                measure(data, encoding, level, repeat)
+                for encoding in available
+                for level in LEVELS[encoding]
+            ],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--sizes", default="50,500")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps({
+        "middleware_levels": {
+            "gzip": compression.GZIP_LEVEL,
+            "br": compression.BROTLI_QUALITY,
+            "zstd": compression.ZSTD_LEVEL,
+        },
+        "preference": compression.ENCODING_PREFERENCE,
+        "payloads": run(sizes, args.repeat),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
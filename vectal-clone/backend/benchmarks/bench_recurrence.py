@@ -0,0 +1,108 @@
+"""
+Benchmark batch recurrence expansion against the per-task loop
+
+Run from backend/:
+    python -m benchmarks.bench_recurrence --tasks 500 --days 31
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil.rrule import rrulestr
+
+from utils.rrule_cache import occurrences_between
+from utils.recurrence_batch import expand_batch
+
+SIMPLE_RULES = [
+    "FREQ=DAILY;INTERVAL=1",
+    "FREQ=DAILY;INTERVAL=2",
+    "FREQ=WEEKLY;INTERVAL=1",
+    "FREQ=WEEKLY;INTERVAL=2",
+    "FREQ=MONTHLY;INTERVAL=1",
+    "FREQ=YEARLY;INTERVAL=1",
+    "FREQ=DAILY;COUNT=60",
+]
+COMPLEX_RULES = [
+    "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "FREQ=MONTHLY;BYMONTHDAY=-1",
+]
+
+
+def make_items(n: int, complex_share: float, seed: int = 42):
+    """Random (dtstart, rule) pairs resembling a user's recurring tasks"""
+    rng = random.Random(seed)
+    base = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for _ in range(n):
+        rules = COMPLEX_RULES if rng.random() < complex_share else SIMPLE_RULES
+        dtstart = base + timedelta(days=rng.randrange(0, 500), minutes=rng.randrange(0, 1440))
+        items.append((dtstart, rng.choice(rules)))
+    return items
+
+
+def per_task_uncached(items, start, end):
+    """Parse and expand each rule per task, as RecurrenceRule does"""
+    total = 0
+    for dtstart, rule in items:
+        total += len(rrulestr(rule, dtstart=dtstart).between(start, end, inc=True))
+    return total
+
+
+def per_task_cached(items, start, end):
+    """Per-task loop over the parsed-rule cache"""
+    return sum(len(occurrences_between(rule, dtstart, start, end)) for dtstart, rule in items)
+
+
+def batched(items, start, end):
+    """Vectorized batch expansion"""
+    return len(expand_batch(items, start, end))
+
+
+def measure(fn, items, start, end, repeat: int):
+    """Per-call timings in milliseconds"""
+    fn(items, start, end)  # warm caches
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(items, start, end)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--days", type=int, default=31, help="Window length")
+    parser.add_argument("--complex-share", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    items = make_items(args.tasks, args.complex_share)
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=args.days)
+
+    results = {}
+    for name, fn in (
+        ("per_task_uncached", per_task_uncached),
+        ("per_task_cached", per_task_cached),
+        ("batched", batched),
+    ):
+        timings = measure(fn, items, start, end, args.repeat)
+        results[name] = {
+            "occurrences": fn(items, start, end),
+            "median_ms": round(statistics.median(timings), 3),
+            "min_ms": round(min(timings), 3),
+        }
+
+    baseline = results["per_task_uncached"]["median_ms"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["median_ms"], 1) if result["median_ms"] else None
+
+    print(json.dumps({"tasks": args.tasks, "days": args.days, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark response serialization paths
+
+Run from backend/:
+    python -m benchmarks.bench_serialization --sizes 100,1000
+
+Compares, for NoteListResponse and ConversationDetailResponse:
+  fastapi_json   FastAPI's default path: dump, re-validate against
+                 response_model, jsonable_encoder, stdlib json
+  fastapi_orjson the same path rendered by ORJSONResponse
+  model_response ModelResponse: one model_dump_json() of the built model
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models.schemas.note import NoteResponse, NoteListResponse
+from models.schemas.chat import ConversationDetailResponse, MessageResponse
+from utils.responses import ModelResponse
+
+CONTENT = "# Heading\n\nSome **markdown** content with a [link](https://example.com).\n" * 10
+
+
+def make_notes(n: int) -> NoteListResponse:
+    now = datetime(2024, 1, 1)
+    items = [
+        NoteResponse(
+            id=f"note-{i}",
+            user_id="user-1",
+            project_id=None,
+            title=f"Note {i}",
+            content=CONTENT,
+            tags=["work", "ideas"],
+            linked_tasks=[f"task-{i}"],
+            linked_notes=[],
+            current_version=1,
+            is_pinned=False,
+            is_archived=False,
+            created_at=now + timedelta(minutes=i),
+            updated_at=now + timedelta(minutes=i),
+            preview=CONTENT[:200],
+            word_count=120,
+        )
+        for i in range(n)
+    ]
+    return NoteListResponse(items=items, total=n, page=1, page_size=n, total_pages=1)
+
+
+def make_conversation(n: int) -> ConversationDetailResponse:
+    now = datetime(2024, 1, 1)
+    messages = [
+        MessageResponse(
+            id=f"msg-{i}",
+            role="user" if i % 2 == 0 else "assistant",
+            content=CONTENT,
+            timestamp=now + timedelta(seconds=i),
+            tokens=250,
+        )
+        for i in range(n)
+    ]
+    return ConversationDetailResponse(
+        id="conv-1",
+        user_id="user-1",
+        title="Planning",
+        model="gpt-4",
+        total_tokens=250 * n,
+        is_archived=False,
+        created_at=now,
+        updated_at=now,
+        last_message_at=now,
+        message_count=n,
+        messages=messages,
+    )
+
+
+async def fastapi_path(model, response_class):
+    field = create_response_field(name="response", type_=type(model))
+    content = await serialize_response(field=field, response_content=model)
+    return response_class(content).body
+
+
+async def model_response_path(model, _response_class=None):
+    return ModelResponse(model).body
+
+
+async def measure(fn, model, response_class, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(model, response_class)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+async def run(sizes, repeat: int):
+    results = []
+    for name, factory in (("NoteListResponse", make_notes), ("ConversationDetailResponse", make_conversation)):
+        for size in sizes:
+            model = factory(size)
+            timings = {
+                "fastapi_json": await measure(fastapi_path, model, JSONResponse, repeat),
+                "fastapi_orjson": await measure(fastapi_path, model, ORJSONResponse, repeat),
+                "model_response": await measure(model_response_path, model, None, repeat),
+            }
+            results.append({
+                "model": name,
+                "items": size,
+                "median_ms": timings,
+                "speedup": round(timings["fastapi_json"] / timings["model_response"], 1),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--sizes", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps(asyncio.run(run(sizes, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
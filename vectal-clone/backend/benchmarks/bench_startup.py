@@ -0,0 +1,97 @@
+"""
+Benchmark application cold start
+
+Run from backend/:
+    python -m benchmarks.bench_startup --runs 5
+
+Measures the time to import the app in a fresh interpreter (with the
+slowest imports from -X importtime) and compares sequential against
+concurrent datastore connection for the given simulated latencies.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from utils.datastores import DatastoreRegistry
+
+
+def import_time(module: str, runs: int):
+    """Wall-clock import time of a module in fresh interpreters (ms)"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True, text=True)
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1]}
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 1), "min_ms": round(min(timings), 1)}
+
+
+def slowest_imports(module: str, top: int):
+    """Largest cumulative import times reported by -X importtime (ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative) / 1000, name.strip()))
+    entries.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(ms, 1)} for ms, name in entries[:top]]
+
+
+async def connect_time(latencies, parallel: bool):
+    """Time to connect stores with the given latencies (ms)"""
+    def store(seconds):
+        async def connect():
+            await asyncio.sleep(seconds)
+        return connect
+
+    started = time.perf_counter()
+    if parallel:
+        registry = DatastoreRegistry()
+        for name, seconds in latencies.items():
+            registry.register(name, store(seconds))
+        await registry.connect_all()
+    else:
+        for seconds in latencies.values():
+            await store(seconds)()
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application cold start")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--latencies", default="postgres=0.05,mongodb=0.3,redis=0.02",
+        help="Simulated connect latency per store in seconds"
+    )
+    args = parser.parse_args()
+
+    latencies = {
+        name: float(seconds)
+        for name, seconds in (pair.split("=") for pair in args.latencies.split(","))
+    }
+
+    print(json.dumps({
+        "import": import_time(args.module, args.runs),
+        "slowest_imports": slowest_imports(args.module, args.top),
+        "connect": {
+            "latencies_s": latencies,
+            "sequential_ms": asyncio.run(connect_time(latencies, parallel=False)),
+            "concurrent_ms": asyncio.run(connect_time(latencies, parallel=True)),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
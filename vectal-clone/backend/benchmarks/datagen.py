@@ -0,0 +1,262 @@
+"""
+Synthetic data for load tests
+
+Run from backend/ against the datastores in the environment (.env):
+    python -m benchmarks.datagen --users 20 --tasks 2000 --notes 500 --messages 400
+
+Creates users with projects, thousands of ordered tasks (some labelled),
+notes with version history and long conversations, then writes their IDs
+and access tokens to a manifest that benchmarks.load reads. The same
+--seed always produces the same content; rows are bulk inserted in
+batches rather than through the services, so seeding is fast and does
+not enqueue jobs or publish change feed events.
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+BATCH_SIZE = 1000
+DEFAULT_MANIFEST = "benchmarks/fixtures.json"
+
+WORDS = (
+    "plan review draft ship fix write call email design test deploy sync budget "
+    "roadmap launch hire interview onboard research refactor document migrate "
+    "customer invoice report quarterly weekly meeting agenda notes feedback"
+).split()
+LABELS = ["work", "home", "urgent", "errand", "deep-work", "waiting"]
+STATUSES = ["pending", "pending", "in_progress", "completed"]
+
+
+def sentence(rng: random.Random, low: int = 3, high: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize()
+
+
+def markdown(rng: random.Random, paragraphs: int) -> str:
+    blocks = [f"# {sentence(rng)}"]
+    for _ in range(paragraphs):
+        blocks.append(" ".join(sentence(rng, 6, 14) + "." for _ in range(rng.randint(2, 5))))
+        blocks.append("\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(1, 4))))
+    return "\n\n".join(blocks)
+
+
+def make_user_rows(rng: random.Random, index: int, args) -> dict:
+    """Rows and documents for one user"""
+    from utils.fractional_index import generate_n_keys_between
+
+    now = datetime.now(timezone.utc)
+    user_id = uuid.UUID(int=rng.getrandbits(128))
+    user = {
+        "id": user_id,
+        "email": f"bench-{args.seed}-{index}@example.com",
+        "full_name": f"Bench User {index}",
+        "is_verified": True,
+        "is_active": True,
+    }
+
+    projects = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "user_id": user_id,
+            "name": sentence(rng, 1, 3),
+            "color": f"#{rng.randrange(0x1000000):06X}",
+            "is_archived": rng.random() < 0.1,
+        }
+        for _ in range(args.projects)
+    ]
+    collaborators = [
+        {"project_id": p["id"], "user_id": user_id, "role": "owner", "status": "accepted", "invited_by": user_id}
+        for p in projects
+    ]
+
+    tasks, labels = [], []
+    per_project = max(1, args.tasks // (len(projects) + 1))
+    for project in [None] + projects:
+        keys = generate_n_keys_between(None, None, per_project)
+        for position, key in enumerate(keys):
+            task_id = uuid.UUID(int=rng.getrandbits(128))
+            status = rng.choice(STATUSES)
+            tasks.append({
+                "id": task_id,
+                "user_id": user_id,
+                "project_id": project["id"] if project else None,
+                "title": sentence(rng),
+                "description": sentence(rng, 8, 20) if rng.random() < 0.3 else None,
+                "status": status,
+                "priority": rng.randint(0, 4),
+                "due_date": now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.5 else None,
+                "completed_at": now - timedelta(days=rng.randint(0, 30)) if status == "completed" else None,
+                "recurrence_rule": "FREQ=WEEKLY;INTERVAL=1" if rng.random() < 0.05 else None,
+                "position": position,
+                "position_key": key,
+            })
+            for label in rng.sample(LABELS, rng.randint(0, 2)):
+                labels.append({"task_id": task_id, "label": label})
+
+    notes = []
+    for _ in range(args.notes):
+        created = now - timedelta(days=rng.randint(0, 365))
+        versions = [
+            {
+                "version": v + 1,
+                "content": markdown(rng, 1),
+                "updated_at": created + timedelta(hours=v),
+                "updated_by": str(user_id),
+            }
+            for v in range(rng.randint(0, 8))
+        ]
+        notes.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": str(user_id),
+            "project_id": str(rng.choice(projects)["id"]) if projects and rng.random() < 0.5 else None,
+            "title": sentence(rng, 2, 6),
+            "content": markdown(rng, rng.randint(1, 6)),
+            "tags": rng.sample(LABELS, rng.randint(0, 3)),
+            "linked_tasks": [str(rng.choice(tasks)["id"])] if rng.random() < 0.2 else [],
+            "linked_notes": [],
+            "versions": versions,
+            "current_version": len(versions) + 1,
+            "is_pinned": rng.random() < 0.05,
+            "is_archived": rng.random() < 0.05,
+            "created_at": created,
+            "updated_at": created + timedelta(hours=len(versions)),
+        })
+
+    conversations = []
+    for _ in range(args.conversations):
+        started = now - timedelta(days=rng.randint(0, 90))
+        messages = [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "role": "user" if m % 2 == 0 else "assistant",
+                "content": sentence(rng, 5, 20) if m % 2 == 0 else markdown(rng, rng.randint(1, 3)),
+                "timestamp": started + timedelta(minutes=m),
+                "tokens": rng.randint(10, 400),
+                "mentions": [],
+                "commands": [],
+                "extracted_tasks": [],
+            }
+            for m in range(args.messages)
+        ]
+        conversations.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": str(user_id),
+            "messages": messages,
+            "title": sentence(rng, 2, 5),
+            "model": "gpt-4",
+            "total_tokens": sum(m["tokens"] for m in messages),
+            "is_archived": False,
+            "created_at": started,
+            "updated_at": started + timedelta(minutes=len(messages)),
+            "last_message_at": started + timedelta(minutes=len(messages)),
+        })
+
+    return {
+        "user": user,
+        "projects": projects,
+        "collaborators": collaborators,
+        "tasks": tasks,
+        "labels": labels,
+        "notes": notes,
+        "conversations": conversations,
+    }
+
+
+async def insert_rows(session, model, rows):
+    from sqlalchemy import insert
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        await session.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+async def insert_documents(collection, documents):
+    for start in range(0, len(documents), BATCH_SIZE):
+        await collection.insert_many(documents[start:start + BATCH_SIZE], ordered=False)
+
+
+async def seed(args) -> dict:
+    from db.mongodb import Collections
+    from db.postgres import Base
+    from models.task import Project, ProjectCollaborator, Task, TaskLabel
+    from models.user import User
+    from utils.jwt import create_access_token
+    from utils.password import hash_password
+    from utils.resources import AppResources, set_resources
+
+    resources = AppResources()
+    set_resources(resources)
+    rng = random.Random(args.seed)
+    # One hash for every user: bcrypt would otherwise dominate seeding
+    password_hash = hash_password(args.password)
+    manifest = {"seed": args.seed, "password": args.password, "users": []}
+
+    try:
+        if args.create_tables:
+            async with resources.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        for index in range(args.users):
+            data = make_user_rows(rng, index, args)
+            data["user"]["password_hash"] = password_hash
+
+            async with resources.session() as session:
+                await insert_rows(session, User, [data["user"]])
+                await insert_rows(session, Project, data["projects"])
+                await insert_rows(session, ProjectCollaborator, data["collaborators"])
+                await insert_rows(session, Task, data["tasks"])
+                await insert_rows(session, TaskLabel, data["labels"])
+                await session.commit()
+
+            await insert_documents(resources.collection(Collections.NOTES), data["notes"])
+            await insert_documents(resources.collection(Collections.CONVERSATIONS), data["conversations"])
+
+            user_id = str(data["user"]["id"])
+            manifest["users"].append({
+                "id": user_id,
+                "email": data["user"]["email"],
+                "token": create_access_token({"sub": user_id}, expires_delta=timedelta(days=7)),
+                "project_ids": [str(p["id"]) for p in data["projects"] if not p["is_archived"]],
+                "task_ids": [str(t["id"]) for t in data["tasks"] if t["project_id"] is None][:500],
+                "conversation_ids": [c["id"] for c in data["conversations"]],
+                "search_terms": sorted({w for n in data["notes"][:50] for w in n["title"].lower().split()})[:20],
+            })
+    finally:
+        await resources.shutdown()
+        set_resources(None)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic users, tasks, notes and conversations")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=8, help="Projects per user")
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks per user")
+    parser.add_argument("--notes", type=int, default=500, help="Notes per user")
+    parser.add_argument("--conversations", type=int, default=10, help="Conversations per user")
+    parser.add_argument("--messages", type=int, default=400, help="Messages per conversation")
+    parser.add_argument("--password", default="Bench123!@#")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-tables", action="store_true")
+    parser.add_argument("--out", default=DEFAULT_MANIFEST)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = asyncio.run(seed(args))
+    with open(args.out, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(json.dumps({
+        "users": args.users,
+        "tasks_per_user": args.tasks,
+        "notes_per_user": args.notes,
+        "messages_per_user": args.conversations * args.messages,
+        "seconds": round(time.perf_counter() - started, 1),
+        "manifest": args.out,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
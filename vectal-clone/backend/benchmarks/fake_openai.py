@@ -0,0 +1,190 @@
+"""
+Fake OpenAI API for load tests
+
+Run from backend/:
+    python -m benchmarks.fake_openai --port 8100 --latency 0.4 --token-interval 0.02
+
+and start the API with OPENAI_BASE_URL=http://127.0.0.1:8100/v1 so chat and
+embedding calls never leave the machine. Serves /v1/chat/completions
+(plain and streamed as server-sent events) and /v1/embeddings. Latency is
+the time before the first byte (optionally with jitter); streamed
+completions then emit one token per --token-interval. Every response
+reports usage like the real API.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+REPLY = (
+    "Here is a plan for your week. First, review the roadmap and pick the "
+    "three most important tasks. Block time for deep work in the mornings, "
+    "batch email twice a day, and schedule a short review every Friday."
+).split()
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+class FakeOpenAIConfig:
+    """Latency, stream pacing and error knobs"""
+
+    def __init__(
+        self,
+        latency: float = 0.3,
+        jitter: float = 0.0,
+        token_interval: float = 0.02,
+        completion_tokens: int = 60,
+        embedding_latency: float = 0.05,
+        error_rate: float = 0.0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_interval = token_interval
+        self.completion_tokens = completion_tokens
+        self.embedding_latency = embedding_latency
+        self.error_rate = error_rate
+
+    async def wait(self, seconds: float):
+        if self.jitter:
+            seconds = max(0.0, random.gauss(seconds, seconds * self.jitter))
+        if seconds:
+            await asyncio.sleep(seconds)
+
+
+def _prompt_tokens(messages) -> int:
+    return sum(len(str(m.get("content", ""))) // 4 for m in messages)
+
+
+def _tokens(count: int):
+    return [(" " if i else "") + REPLY[i % len(REPLY)] for i in range(count)]
+
+
+def create_app(config: FakeOpenAIConfig) -> Starlette:
+    """ASGI app mimicking the subset of the OpenAI API the backend uses"""
+
+    def rate_limited():
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            status_code=429
+        )
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if config.error_rate and random.random() < config.error_rate:
+            return rate_limited()
+
+        model = body.get("model", "gpt-4")
+        count = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+        tokens = _tokens(count)
+        usage = {
+            "prompt_tokens": _prompt_tokens(body.get("messages", [])),
+            "completion_tokens": count,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        await config.wait(config.latency)
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        def chunk(delta, finish_reason=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            yield chunk({"role": "assistant", "content": ""})
+            for i, token in enumerate(tokens):
+                if i and config.token_interval:
+                    await asyncio.sleep(config.token_interval)
+                yield chunk({"content": token})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def embeddings(request: Request):
+        body = await request.json()
+        if config.error_rate and random.random() < config.error_rate:
+            return rate_limited()
+
+        inputs = body.get("input", "")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        await config.wait(config.embedding_latency)
+
+        data = []
+        for index, text in enumerate(inputs):
+            # Deterministic per input, so repeated texts embed identically
+            rng = random.Random(hashlib.sha256(str(text).encode()).digest())
+            data.append({
+                "object": "embedding",
+                "index": index,
+                "embedding": [rng.uniform(-1, 1) for _ in range(EMBEDDING_DIMENSIONS)],
+            })
+        prompt_tokens = sum(len(str(text)) // 4 for text in inputs)
+        return JSONResponse({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-ada-002"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        })
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1/embeddings", embeddings, methods=["POST"]),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI API for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative standard deviation of latencies")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="Seconds between streamed tokens")
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeOpenAIConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        token_interval=args.token_interval,
+        completion_tokens=args.completion_tokens,
+        embedding_latency=args.embedding_latency,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Load scenarios against a running API
+
+Bring up the datastores, seed them and start the stack, then run from backend/:
+    python -m benchmarks.datagen --users 20
+    python -m benchmarks.fake_openai --latency 0.4 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn main:app --workers 2 &
+    python -m benchmarks.load --concurrency 20 --duration 30 --out load-$(git rev-parse --short HEAD).json
+
+Each scenario runs as its own phase: --concurrency closed-loop clients
+(each acting as a random seeded user) send requests for --duration
+seconds after --warmup seconds whose samples are discarded. The JSON
+result has p50/p95/p99 latency, throughput and error counts per scenario
+(plus time to first byte for streamed chat). Pass --compare with an
+earlier result to print the relative change per scenario.
+"""
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.datagen import DEFAULT_MANIFEST
+
+CHAT_PROMPTS = [
+    "What should I focus on today?",
+    "Summarize my overdue tasks",
+    "Create a task to send the quarterly report by Friday",
+    "Plan my week around the product launch",
+]
+
+
+class Sample:
+    __slots__ = ("latency", "ttfb", "ok")
+
+    def __init__(self, latency: float, ok: bool, ttfb: Optional[float] = None):
+        self.latency = latency
+        self.ttfb = ttfb
+        self.ok = ok
+
+
+def _headers(user: dict) -> dict:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+async def project_list(client: httpx.AsyncClient, user: dict, rng: random.Random) -> Sample:
+    started = time.perf_counter()
+    response = await client.get("/api/v1/projects", params={"page_size": 50}, headers=_headers(user))
+    return Sample(time.perf_counter() - started, response.status_code == 200)
+
+
+async def note_search(client: httpx.AsyncClient, user: dict, rng: random.Random) -> Sample:
+    term = rng.choice(user["search_terms"] or ["plan"])
+    started = time.perf_counter()
+    response = await client.get("/api/v1/notes/search", params={"q": term}, headers=_headers(user))
+    return Sample(time.perf_counter() - started, response.status_code == 200)
+
+
+async def task_reorder(client: httpx.AsyncClient, user: dict, rng: random.Random) -> Sample:
+    task_id, after_id = rng.sample(user["task_ids"], 2)
+    started = time.perf_counter()
+    response = await client.post(
+        f"/api/v1/tasks/{task_id}/position",
+        json={"after_task_id": after_id},
+        headers=_headers(user)
+    )
+    return Sample(time.perf_counter() - started, response.status_code == 200)
+
+
+async def chat(client: httpx.AsyncClient, user: dict, rng: random.Random) -> Sample:
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/v1/chat/message",
+        json={"content": rng.choice(CHAT_PROMPTS), "conversation_id": rng.choice(user["conversation_ids"])},
+        headers=_headers(user)
+    )
+    return Sample(time.perf_counter() - started, response.status_code == 200)
+
+
+async def chat_stream(client: httpx.AsyncClient, user: dict, rng: random.Random) -> Sample:
+    started = time.perf_counter()
+    ttfb = None
+    async with client.stream(
+        "POST",
+        "/api/v1/chat/message",
+        params={"stream": "true"},
+        json={"content": rng.choice(CHAT_PROMPTS), "conversation_id": rng.choice(user["conversation_ids"])},
+        headers=_headers(user)
+    ) as response:
+        async for _ in response.aiter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+    return Sample(time.perf_counter() - started, response.status_code == 200, ttfb)
+
+
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, dict, random.Random], Awaitable[Sample]]] = {
+    "project_list": project_list,
+    "note_search": note_search,
+    "task_reorder": task_reorder,
+    "chat": chat,
+    "chat_stream": chat_stream,
+}
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Linear-interpolated percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values: List[float]) -> dict:
+    """p50/p95/p99/mean/max in milliseconds"""
+    ordered = sorted(v * 1000 for v in values)
+    if not ordered:
+        return {}
+    return {
+        "p50": round(percentile(ordered, 50), 2),
+        "p95": round(percentile(ordered, 95), 2),
+        "p99": round(percentile(ordered, 99), 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def summarize(samples: List[Sample], elapsed: float, exceptions: int) -> dict:
+    ok = [s for s in samples if s.ok]
+    result = {
+        "requests": len(samples) + exceptions,
+        "errors": len(samples) - len(ok) + exceptions,
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": distribution([s.latency for s in ok]),
+    }
+    ttfb = [s.ttfb for s in ok if s.ttfb is not None]
+    if ttfb:
+        result["ttfb_ms"] = distribution(ttfb)
+    return result
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, users: List[dict], args) -> dict:
+    scenario = SCENARIOS[name]
+    samples: List[Sample] = []
+    exceptions = 0
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + args.warmup
+    stop_at = measure_from + args.duration
+
+    async def worker(index: int):
+        nonlocal exceptions
+        rng = random.Random(args.seed * 1000 + index)
+        while loop.time() < stop_at:
+            user = rng.choice(users)
+            measured = loop.time() >= measure_from
+            try:
+                sample = await scenario(client, user, rng)
+            except (httpx.HTTPError, ValueError):
+                if measured:
+                    exceptions += 1
+                continue
+            if measured:
+                samples.append(sample)
+
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    return summarize(samples, args.duration, exceptions)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Relative change (%) of each scenario's percentiles and throughput against a baseline"""
+    changes = {}
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        change = {}
+        for key in ("p50", "p95", "p99"):
+            old, new = before["latency_ms"].get(key), result["latency_ms"].get(key)
+            if old and new is not None:
+                change[f"{key}_pct"] = round((new - old) / old * 100, 1)
+        if before["throughput_rps"]:
+            change["throughput_pct"] = round(
+                (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100, 1
+            )
+        changes[name] = change
+    return {"baseline_commit": baseline.get("meta", {}).get("commit"), "scenarios": changes}
+
+
+async def run(args) -> dict:
+    with open(args.manifest) as f:
+        users = json.load(f)["users"]
+    names = args.scenarios.split(",")
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for name in names:
+            results[name] = await run_scenario(name, client, users, args)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "users": len(users),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run load scenarios against a running API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--scenarios", default="project_list,note_search,task_reorder,chat,chat_stream")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Write the JSON result to this file")
+    parser.add_argument("--compare", help="Earlier result to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.compare:
+        with open(args.compare) as f:
+            result["comparison"] = compare(result, json.load(f))
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,16 @@ Main application entry point
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import logging
+import time
 
-from api.routes import health
+from api.routes import health, readiness, metrics
 from utils.config import settings
+from utils.metrics import install_instrumentation
+from utils.resources import AppResources, ShuttingDown, set_resources
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +22,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Datastore timing hooks must be in place before any engine or client exists
+install_instrumentation()
+
+# MongoDB indexes
+async def ensure_indexes():
+    from services.note_service import NoteService
+    from services.chat_service import ChatService
+    try:
+        await asyncio.gather(NoteService.ensure_indexes(), ChatService.ensure_indexes())
+    except Exception as e:
+        logger.warning(f"MongoDB index creation failed: {e}")
+
+# Startup and shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting Vectal.ai Clone API...")
+    logger.info(f"Environment: {settings.ENVIRONMENT}")
+    logger.info(f"Debug mode: {settings.DEBUG}")
+    
+    # Pooled clients for the whole worker; datastores connect concurrently
+    resources = AppResources()
+    app.state.resources = resources
+    set_resources(resources)
+    
+    started = time.perf_counter()
+    await resources.startup()
+    logger.info(f"Required datastores ready in {(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    # Keep the recurring task occurrence index up to date
+    from services.occurrence_service import OccurrenceService
+    materializer = asyncio.create_task(OccurrenceService.run_materializer())
+    
+    # MongoDB indexes are created once per worker instead of on the request path
+    indexer = asyncio.create_task(ensure_indexes())
+    
+    # Replica lag guard for read-only sessions
+    replica_monitor = None
+    if resources.replica_url:
+        from utils.replica_routing import replica_router
+        replica_monitor = asyncio.create_task(replica_router.run_lag_monitor(resources))
+    
+    # Opt-in: kill -USR2 <pid> writes a CPU profile of this worker
+    if getattr(settings, "PROFILING_ENABLED", False):
+        from utils.profiler import install_signal_handler
+        install_signal_handler()
+    
+    try:
+        yield
+    finally:
+        logger.info("Shutting down Vectal.ai Clone API...")
+        materializer.cancel()
+        indexer.cancel()
+        if replica_monitor:
+            replica_monitor.cancel()
+        
+        # End open change feeds so draining does not wait on them
+        from services.change_feed import change_feed
+        await change_feed.close()
+        
+        # Let in-flight streams finish, then close every pool
+        await resources.shutdown()
+        set_resources(None)
+        logger.info("All database connections closed")
+
 # Create FastAPI app
 app = FastAPI(
     title="Vectal.ai Clone API",
@@ -25,8 +93,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Rate limiting for expensive endpoints (added first so CORS headers wrap 429s)
+from api.middleware.rate_limit import RateLimitMiddleware
+app.add_middleware(RateLimitMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,20 +110,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# GZip Middleware for response compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Keep a caller's reads on the primary right after they write
+if getattr(settings, "DATABASE_REPLICA_URL", None):
+    from api.middleware.read_your_writes import ReadYourWritesMiddleware
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Response compression (zstd / Brotli / gzip; event streams are left alone)
+from api.middleware.compression import CompressionMiddleware
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+# Query counts and N+1 detection; X-Query-Count is only sent in debug mode
+from api.middleware.query_count import QueryCountMiddleware
+app.add_middleware(QueryCountMiddleware, header=settings.DEBUG)
+
+# Per-route latency histograms (outermost, so it times every other layer);
+# Server-Timing breakdowns are only sent in debug mode
+from api.middleware.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware, server_timing=settings.DEBUG)
 
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["Health"])
+app.include_router(readiness.router, prefix="/api/v1", tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
+
+# Request sessions come from the container's pool; routes outside this
+# package that still depend on db.postgres.get_db get the same sessions
+from api.dependencies.database import get_db
+from db.postgres import get_db as legacy_get_db
+app.dependency_overrides[legacy_get_db] = get_db
+
+# Authenticated users come from the principal cache, so a request only
+# reads the users table on a cache miss
+from api.dependencies.principal import get_current_user
+from api.dependencies.auth import get_current_user as legacy_get_current_user
+app.dependency_overrides[legacy_get_current_user] = get_current_user
 
 # Import routes
-from api.routes import auth, oauth, tasks, projects, notes, chat
+from api.routes import auth, oauth, tasks, task_bulk, task_ordering, task_occurrences, projects, notes, chat, export, changes, profiling
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(oauth.router, prefix="/api/v1/oauth", tags=["OAuth"])
+app.include_router(task_bulk.router, prefix="/api/v1/tasks", tags=["Tasks"])
+app.include_router(task_ordering.router, prefix="/api/v1/tasks", tags=["Tasks"])
+app.include_router(task_occurrences.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["Projects"])
 app.include_router(notes.router, prefix="/api/v1/notes", tags=["Notes"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["Export"])
+app.include_router(changes.router, prefix="/api/v1/changes", tags=["Changes"])
+app.include_router(profiling.router, prefix="/api/v1/admin/profile", tags=["Admin"])
+
+# Streams started while draining for shutdown
+@app.exception_handler(ShuttingDown)
+async def shutting_down_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": {
+                "code": "SERVICE_UNAVAILABLE",
+                "message": "Server is shutting down, please retry",
+                "details": None
+            }
+        },
+        headers={"Retry-After": "1"}
+    )
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -66,47 +190,6 @@ async def global_exception_handler(request, exc):
         }
     )
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting Vectal.ai Clone API...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
-    
-    # Initialize database connections
-    from db.mongodb import connect_mongodb
-    from db.redis_client import connect_redis
-    from db.vector_db import connect_qdrant
-    
-    try:
-        await connect_mongodb()
-        await connect_redis()
-        await connect_qdrant()
-        logger.info("All database connections initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize databases: {e}")
-        raise
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down Vectal.ai Clone API...")
-    
-    # Close database connections
-    from db.mongodb import close_mongodb
-    from db.redis_client import close_redis
-    from db.vector_db import close_qdrant
-    from db.postgres import close_db
-    
-    try:
-        await close_mongodb()
-        await close_redis()
-        await close_qdrant()
-        await close_db()
-        logger.info("All database connections closed successfully")
-    except Exception as e:
-        logger.error(f"Error closing databases: {e}")
-
 # Root endpoint
 @app.get("/")
 async def root():
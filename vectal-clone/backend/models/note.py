@@ -40,6 +40,7 @@ class Note(BaseModel):
     # Version history
     versions: List[NoteVersion] = Field(default_factory=list)
     current_version: int = 1
+    history_revision: int = 0  # Bumped when compaction removes versions
     
     # Metadata
     is_pinned: bool = False
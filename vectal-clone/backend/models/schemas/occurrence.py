@@ -0,0 +1,24 @@
+"""
+Task occurrence Pydantic schemas
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+import uuid
+
+
+class TaskOccurrenceResponse(BaseModel):
+    """Occurrence of a recurring task"""
+    task_id: uuid.UUID
+    occurs_at: datetime
+    title: str
+    status: str
+    project_id: Optional[uuid.UUID] = None
+
+
+class TaskOccurrenceListResponse(BaseModel):
+    """Occurrences in a date range"""
+    items: List[TaskOccurrenceResponse]
+    total: int
+    start: datetime
+    end: datetime
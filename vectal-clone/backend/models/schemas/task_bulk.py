@@ -0,0 +1,73 @@
+"""
+Bulk task Pydantic schemas
+"""
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Union, Literal
+from datetime import datetime
+import uuid
+
+
+class TaskImportRow(BaseModel):
+    """A single task row in a bulk import"""
+    ref: Optional[str] = Field(None, max_length=100)  # Client-side ID, unique within the import
+    title: str = Field(..., min_length=1, max_length=500)
+    description: Optional[str] = None
+    status: str = Field(default='pending', pattern=r'^(pending|in_progress|completed|cancelled)$')
+    priority: int = Field(default=0, ge=0, le=4)
+    due_date: Optional[datetime] = None
+    recurrence_rule: Optional[str] = None
+    project_id: Optional[uuid.UUID] = None
+    parent_ref: Optional[str] = None  # ref of another row in the same import
+    parent_task_id: Optional[uuid.UUID] = None  # Existing task
+    labels: List[str] = []
+
+    @field_validator('labels', mode='before')
+    @classmethod
+    def split_labels(cls, value: Union[str, List[str], None]) -> List[str]:
+        """Accept CSV-style 'a;b;c' label lists"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [label.strip() for label in value.split(';') if label.strip()]
+        return value
+
+
+class TaskImportError(BaseModel):
+    """Validation or resolution error for one import row"""
+    row: int  # 1-based row number in the uploaded file
+    ref: Optional[str] = None
+    errors: List[str]
+
+
+class TaskImportResponse(BaseModel):
+    """Bulk import result"""
+    imported: int
+    failed: int
+    labels_imported: int
+    errors: List[TaskImportError] = []
+
+
+class TaskBatchOperation(BaseModel):
+    """A single operation in a batched task mutation"""
+    op: Literal['complete', 'uncomplete', 'move', 'reprioritize', 'reorder']
+    task_id: uuid.UUID
+    project_id: Optional[uuid.UUID] = None  # move
+    parent_task_id: Optional[uuid.UUID] = None  # move
+    priority: Optional[int] = Field(None, ge=0, le=4)  # reprioritize
+    position: Optional[int] = Field(None, ge=0)  # reorder
+
+    @model_validator(mode='after')
+    def check_operation_fields(self):
+        """Require the field each operation sets"""
+        if self.op == 'reprioritize' and self.priority is None:
+            raise ValueError("reprioritize requires priority")
+        if self.op == 'reorder' and self.position is None:
+            raise ValueError("reorder requires position")
+        if self.op == 'move' and self.parent_task_id == self.task_id:
+            raise ValueError("A task cannot be its own parent")
+        return self
+
+
+class TaskBatchRequest(BaseModel):
+    """Batched task mutations applied in one transaction"""
+    operations: List[TaskBatchOperation] = Field(..., min_length=1, max_length=1000)
@@ -0,0 +1,12 @@
+"""
+Task ordering Pydantic schemas
+"""
+from pydantic import BaseModel
+from typing import Optional
+import uuid
+
+
+class TaskPositionUpdate(BaseModel):
+    """Place a task between two siblings (both omitted moves it to the end)"""
+    after_task_id: Optional[uuid.UUID] = None
+    before_task_id: Optional[uuid.UUID] = None
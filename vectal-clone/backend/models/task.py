@@ -34,6 +34,7 @@ class Task(Base):
     # Hierarchy
     parent_task_id = Column(UUID(as_uuid=True), ForeignKey('tasks.id', ondelete='CASCADE'), nullable=True)
     position = Column(Integer, default=0)  # For ordering
+    position_key = Column(String(255, collation='C'), nullable=True)  # Fractional index, see utils.fractional_index
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -45,12 +46,50 @@ class Task(Base):
         Index('idx_task_due_date', 'due_date'),
         Index('idx_task_project', 'project_id'),
         Index('idx_task_parent', 'parent_task_id'),
+        Index('idx_task_position_key', 'user_id', 'project_id', 'parent_task_id', 'position_key'),
     )
 
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
 
 
+class TaskOccurrence(Base):
+    """Materialized occurrence of a recurring task"""
+    __tablename__ = "task_occurrences"
+
+    task_id = Column(UUID(as_uuid=True), ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True)
+    occurs_at = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_occurrence_user_time', 'user_id', 'occurs_at'),
+    )
+
+    def __repr__(self):
+        return f"<TaskOccurrence(task_id={self.task_id}, occurs_at={self.occurs_at})>"
+
+
+class TaskRecurrenceExpansion(Base):
+    """Rule and window a recurring task's occurrences were materialized from"""
+    __tablename__ = "task_recurrence_expansions"
+
+    task_id = Column(UUID(as_uuid=True), ForeignKey('tasks.id', ondelete='CASCADE'), primary_key=True)
+    recurrence_rule = Column(Text, nullable=False)
+    dtstart = Column(DateTime(timezone=True), nullable=False)
+    expanded_from = Column(DateTime(timezone=True), nullable=False)
+    expanded_until = Column(DateTime(timezone=True), nullable=False)
+    
+    # Timestamps
+    expanded_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_expansion_until', 'expanded_until'),
+    )
+
+    def __repr__(self):
+        return f"<TaskRecurrenceExpansion(task_id={self.task_id}, expanded_until={self.expanded_until})>"
+
+
 class TaskLabel(Base):
     """Task label model for categorization"""
     __tablename__ = "task_labels"
@@ -0,0 +1,253 @@
+"""
+Per-user change feed
+
+Writes to tasks, notes, projects and collaborators append a small delta to
+the Redis stream of every affected user (changes:{user_id}). Stream entry
+IDs are the sequence numbers: clients resume from the last ID they applied
+and receive everything after it, or a 'reset' event when that point has
+been trimmed away and they must refetch.
+
+Each worker runs a single XREAD loop over the streams of its connected
+users and fans entries out to their subscriptions, so open feeds do not
+hold a Redis connection each.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+import asyncio
+import logging
+
+import orjson
+
+from utils.resources import get_resources
+
+logger = logging.getLogger(__name__)
+
+CHANGE_STREAM_PREFIX = "changes"
+
+# Entries kept per user (approximate trimming) and idle stream lifetime
+CHANGE_STREAM_MAXLEN = 1000
+CHANGE_STREAM_TTL = 7 * 24 * 3600
+
+# Reader loop: longest XREAD block, so new subscribers join within this delay
+CHANGE_FEED_BLOCK_MS = 1000
+CHANGE_FEED_READ_COUNT = 500
+
+# Seconds between keepalives on an idle subscription
+CHANGE_FEED_HEARTBEAT = 15
+
+# Undelivered events a subscription may queue before it is closed; the
+# client reconnects and resumes from its last event
+CHANGE_FEED_MAX_PENDING = 1000
+
+# Task columns sent on the change feed
+TASK_CHANGE_FIELDS = (
+    "project_id", "parent_task_id", "title", "status", "priority", "due_date",
+    "completed_at", "position", "position_key", "updated_at",
+)
+
+
+def task_change_data(task) -> Dict[str, Any]:
+    """Change feed delta for a task row"""
+    return {field: getattr(task, field) for field in TASK_CHANGE_FIELDS}
+
+
+def stream_key(user_id: Any) -> str:
+    return f"{CHANGE_STREAM_PREFIX}:{user_id}"
+
+
+def parse_stream_id(stream_id: str) -> Tuple[int, int]:
+    """Sortable (milliseconds, sequence) for a stream entry ID"""
+    ms, _, seq = str(stream_id).partition("-")
+    try:
+        return int(ms), int(seq or 0)
+    except ValueError:
+        raise ValueError(f"Invalid change sequence: {stream_id}")
+
+
+class ChangeEvent(NamedTuple):
+    """One change, identified by its stream entry ID"""
+    id: str
+    entity: str
+    action: str
+    entity_id: Optional[str]
+    data: Dict[str, Any]
+
+    @classmethod
+    def from_entry(cls, entry_id: str, fields: Dict[str, str]) -> "ChangeEvent":
+        return cls(
+            id=entry_id,
+            entity=fields.get("entity", ""),
+            action=fields.get("action", ""),
+            entity_id=fields.get("entity_id") or None,
+            data=orjson.loads(fields["data"]) if fields.get("data") else {}
+        )
+
+    @classmethod
+    def reset(cls, entry_id: str) -> "ChangeEvent":
+        """Tells the client its resume point is gone and it should refetch"""
+        return cls(id=entry_id, entity="feed", action="reset", entity_id=None, data={})
+
+    def to_sse(self) -> str:
+        payload = orjson.dumps({
+            "entity": self.entity,
+            "action": self.action,
+            "entity_id": self.entity_id,
+            "data": self.data,
+        }).decode()
+        event = "reset" if self.action == "reset" else "change"
+        return f"id: {self.id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class _Subscription:
+    def __init__(self):
+        self.queue: "asyncio.Queue[Optional[ChangeEvent]]" = asyncio.Queue()
+        self.closed = False
+
+    def deliver(self, event: Optional[ChangeEvent]):
+        if self.closed:
+            return
+        if event is None or self.queue.qsize() >= CHANGE_FEED_MAX_PENDING:
+            self.closed = True
+            event = None
+        self.queue.put_nowait(event)
+
+
+def _default_redis():
+    return get_resources().redis
+
+
+class ChangeFeed:
+    """Publishes changes and fans them out to subscriptions on this worker"""
+
+    def __init__(self, redis_getter: Callable = _default_redis):
+        self._redis_getter = redis_getter
+        self._subscriptions: Dict[str, Set[_Subscription]] = {}
+        self._cursors: Dict[str, str] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(
+        self,
+        user_ids: Iterable[Any],
+        entity: str,
+        action: str,
+        entity_id: Any = None,
+        data: Optional[Dict[str, Any]] = None
+    ):
+        """Append a change to the feed of every user in user_ids"""
+        fields = {
+            "entity": entity,
+            "action": action,
+            "entity_id": "" if entity_id is None else str(entity_id),
+            "data": orjson.dumps(data or {}, option=orjson.OPT_NON_STR_KEYS),
+        }
+        try:
+            async with self._redis_getter().pipeline(transaction=False) as pipe:
+                for user_id in dict.fromkeys(str(u) for u in user_ids):
+                    pipe.xadd(stream_key(user_id), fields, maxlen=CHANGE_STREAM_MAXLEN, approximate=True)
+                    pipe.expire(stream_key(user_id), CHANGE_STREAM_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Change feed publish failed ({entity} {action}): {e}")
+
+    async def subscribe(self, user_id: Any, since: Optional[str] = None) -> AsyncIterator[Optional[ChangeEvent]]:
+        """Changes for a user after since (or from now); yields None as a keepalive"""
+        if since is not None:
+            parse_stream_id(since)
+
+        key = stream_key(user_id)
+        redis = self._redis_getter()
+        latest = await redis.xrevrange(key, count=1)
+        tail = latest[0][0] if latest else "0-0"
+
+        # Registered without awaiting, so the reader loop delivers exactly
+        # the entries after cursor and the backlog covers the rest
+        subscription = _Subscription()
+        cursor = self._cursors.setdefault(key, tail)
+        self._subscriptions.setdefault(key, set()).add(subscription)
+        self._ensure_reader()
+
+        try:
+            if since is not None:
+                backlog = await self._backlog(redis, key, since, cursor)
+                if backlog is None:
+                    yield ChangeEvent.reset(cursor)
+                else:
+                    for event in backlog:
+                        yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=CHANGE_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            subscribers = self._subscriptions.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[key]
+                    self._cursors.pop(key, None)
+
+    async def _backlog(self, redis, key: str, since: str, cursor: str):
+        """Entries in (since, cursor], or None if part of that range was trimmed"""
+        since_id = parse_stream_id(since)
+        if since_id == (0, 0):
+            start = "-"
+        else:
+            if since_id > parse_stream_id(cursor):
+                return None
+            oldest = await redis.xrange(key, count=1)
+            if not oldest or parse_stream_id(oldest[0][0]) > since_id:
+                return None
+            start = f"{since_id[0]}-{since_id[1] + 1}"
+
+        if cursor == "0-0":
+            return []
+        entries = await redis.xrange(key, min=start, max=cursor)
+        return [ChangeEvent.from_entry(entry_id, fields) for entry_id, fields in entries]
+
+    def _ensure_reader(self):
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        """Single XREAD over every subscribed stream on this worker"""
+        redis = self._redis_getter()
+        while self._subscriptions:
+            streams = {key: self._cursors[key] for key in self._subscriptions}
+            try:
+                response = await redis.xread(streams, count=CHANGE_FEED_READ_COUNT, block=CHANGE_FEED_BLOCK_MS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for key, entries in response or []:
+                if key not in self._subscriptions:
+                    continue
+                for entry_id, fields in entries:
+                    self._cursors[key] = entry_id
+                    event = ChangeEvent.from_entry(entry_id, fields)
+                    for subscription in list(self._subscriptions.get(key, ())):
+                        subscription.deliver(event)
+
+    async def close(self):
+        """End every subscription on this worker and stop the reader"""
+        for subscribers in self._subscriptions.values():
+            for subscription in subscribers:
+                subscription.deliver(None)
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+
+
+change_feed = ChangeFeed()
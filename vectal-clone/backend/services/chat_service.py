@@ -9,7 +9,13 @@ import json
 
 from models.conversation import Conversation, Message
 from services.openai_service import OpenAIService
-from db.mongodb import get_collection, Collections
+from db.mongodb import Collections
+from utils.resources import get_collection
+from utils.mongo_profiles import DURABLE_WRITE, FAST_READ, with_mongo_profile
+from services.job_queue import job_queue
+from services.change_feed import change_feed
+from services.read_cache import CONVERSATIONS, read_cache
+from utils.single_flight import coalesce
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,9 +31,7 @@ class ChatService:
         
         collection = get_collection(Collections.CONVERSATIONS)
         await collection.insert_one(conversation.model_dump())
-        
-        # Create indexes
-        await ChatService._ensure_indexes()
+        await read_cache.invalidate([user_id], CONVERSATIONS)
         
         logger.info(f"Conversation created: {conversation.id} for user {user_id}")
         return conversation
@@ -50,6 +54,21 @@ class ChatService:
         return None
     
     @staticmethod
+    @coalesce()
+    async def get_conversation_stamp(
+        conversation_id: str,
+        user_id: str
+    ) -> Optional[dict]:
+        """Version stamp of a conversation (updated_at) without loading its messages"""
+        collection = get_collection(Collections.CONVERSATIONS)
+        
+        return await collection.find_one(
+            {"id": conversation_id, "user_id": user_id},
+            {"_id": 0, "updated_at": 1}
+        )
+    
+    @staticmethod
+    @with_mongo_profile(FAST_READ)
     async def get_conversations(
         user_id: str,
         is_archived: bool = False,
@@ -128,7 +147,7 @@ class ChatService:
                 tokens=tokens_used
             )
             
-            # Extract tasks if mentioned
+            # The response carries the extracted tasks, so extract them here
             extracted_tasks = await ChatService._extract_tasks(assistant_content)
             if extracted_tasks:
                 assistant_message.extracted_tasks = extracted_tasks
@@ -137,10 +156,7 @@ class ChatService:
             conversation.total_tokens += tokens_used
             conversation.updated_at = datetime.utcnow()
             conversation.last_message_at = datetime.utcnow()
-            
-            # Auto-generate title from first message
-            if not conversation.title and len(conversation.messages) >= 2:
-                conversation.title = ChatService._generate_title(content)
+            ChatService._set_title(conversation)
             
             # Save conversation
             await ChatService._save_conversation(conversation)
@@ -176,11 +192,53 @@ class ChatService:
         conversation.messages.append(assistant_message)
         conversation.updated_at = datetime.utcnow()
         conversation.last_message_at = datetime.utcnow()
-        
-        if not conversation.title and len(conversation.messages) >= 2:
-            conversation.title = ChatService._generate_title(conversation.messages[0].content)
+        ChatService._set_title(conversation)
         
         await ChatService._save_conversation(conversation)
+        
+        # Extracted tasks arrive on the change feed
+        await ChatService._enqueue_enrichment(conversation.id, user_id, assistant_message.id)
+    
+    @staticmethod
+    async def _enqueue_enrichment(conversation_id: str, user_id: str, message_id: str):
+        """Queue task extraction for an assistant message, or run it here if it cannot be queued"""
+        from tasks.chat_tasks import enrich_chat_turn
+        
+        task_id = await job_queue.enqueue(
+            enrich_chat_turn,
+            args=[conversation_id, user_id, message_id],
+            idempotency_key=f"chat.enrich:{message_id}"
+        )
+        if task_id is None:
+            await ChatService.enrich_turn(conversation_id, user_id, message_id)
+    
+    @staticmethod
+    async def enrich_turn(
+        conversation_id: str,
+        user_id: str,
+        message_id: str
+    ) -> Optional[dict]:
+        """Extract tasks from an assistant message (background job)"""
+        conversation = await ChatService.get_conversation(conversation_id, user_id)
+        if not conversation:
+            return None
+        
+        message = next((m for m in conversation.messages if m.id == message_id), None)
+        if message is None:
+            return None
+        
+        extracted_tasks = await ChatService._extract_tasks(message.content)
+        
+        collection = get_collection(Collections.CONVERSATIONS)
+        await collection.update_one(
+            {"id": conversation_id, "user_id": user_id, "messages.id": message_id},
+            {"$set": {"messages.$.extracted_tasks": extracted_tasks, "updated_at": datetime.utcnow()}}
+        )
+        await read_cache.invalidate([user_id], CONVERSATIONS)
+        
+        result = {"message_id": message_id, "extracted_tasks": extracted_tasks, "title": conversation.title}
+        await change_feed.publish([user_id], "conversation", "enriched", conversation_id, result)
+        return result
     
     @staticmethod
     async def delete_conversation(
@@ -196,6 +254,7 @@ class ChatService:
         })
         
         if result.deleted_count > 0:
+            await read_cache.invalidate([user_id], CONVERSATIONS)
             logger.info(f"Conversation deleted: {conversation_id}")
             return True
         return False
@@ -256,6 +315,12 @@ class ChatService:
         
         return tasks
     
+    @staticmethod
+    def _set_title(conversation: Conversation):
+        """Title a conversation from its first message once it has a reply"""
+        if not conversation.title and len(conversation.messages) >= 2:
+            conversation.title = ChatService._generate_title(conversation.messages[0].content)
+    
     @staticmethod
     def _generate_title(first_message: str) -> str:
         """Generate conversation title from first message"""
@@ -266,6 +331,7 @@ class ChatService:
         return title
     
     @staticmethod
+    @with_mongo_profile(DURABLE_WRITE)
     async def _save_conversation(conversation: Conversation):
         """Save conversation to database"""
         collection = get_collection(Collections.CONVERSATIONS)
@@ -275,10 +341,11 @@ class ChatService:
             {"$set": conversation.model_dump()},
             upsert=True
         )
+        await read_cache.invalidate([conversation.user_id], CONVERSATIONS)
     
     @staticmethod
-    async def _ensure_indexes():
-        """Ensure MongoDB indexes exist"""
+    async def ensure_indexes():
+        """Ensure MongoDB indexes exist (run once at startup)"""
         collection = get_collection(Collections.CONVERSATIONS)
         
         await collection.create_index("user_id")
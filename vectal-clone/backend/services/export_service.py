@@ -0,0 +1,129 @@
+"""
+Export service layer
+"""
+from typing import AsyncGenerator, AsyncIterator, Tuple, Dict, Any
+from datetime import datetime, date
+from decimal import Decimal
+import json
+import uuid
+
+from sqlalchemy import select
+
+from db.mongodb import Collections
+from utils.resources import get_resources, get_collection
+from models.task import Task, TaskLabel
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+# Encoded bytes buffered before a chunk is handed to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(value: Any):
+    """Encode values the stdlib JSON encoder does not know about"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ExportService:
+    """Streaming export of all user data"""
+
+    @staticmethod
+    async def iter_records(user_id: uuid.UUID) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        """Yield (record_type, record) pairs for everything the user owns.
+
+        Records are read through server-side cursors, so only one batch is
+        held in memory at a time regardless of account size.
+        """
+        async with get_resources().session() as session:
+            tasks = await session.stream(
+                select(Task.__table__)
+                .where(Task.user_id == user_id)
+                .order_by(Task.created_at)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for row in tasks.mappings():
+                yield "task", dict(row)
+
+            labels = await session.stream(
+                select(TaskLabel.__table__)
+                .join(Task, Task.id == TaskLabel.task_id)
+                .where(Task.user_id == user_id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for row in labels.mappings():
+                yield "task_label", dict(row)
+
+        for record_type, collection_name in (
+            ("note", Collections.NOTES),
+            ("conversation", Collections.CONVERSATIONS),
+        ):
+            cursor = get_collection(collection_name).find(
+                {"user_id": str(user_id)},
+                {"_id": 0}
+            ).batch_size(EXPORT_BATCH_SIZE)
+            async for document in cursor:
+                yield record_type, document
+
+    @staticmethod
+    async def stream_ndjson(user_id: uuid.UUID) -> AsyncGenerator[bytes, None]:
+        """Encode the export as newline-delimited JSON"""
+        async def lines():
+            async for record_type, record in ExportService.iter_records(user_id):
+                yield json.dumps(
+                    {"type": record_type, "data": record},
+                    default=_json_default
+                ) + "\n"
+
+        async for chunk in ExportService._buffer(lines()):
+            yield chunk
+
+    @staticmethod
+    async def stream_json(user_id: uuid.UUID) -> AsyncGenerator[bytes, None]:
+        """Encode the export as a single JSON object keyed by record type"""
+        async def parts():
+            current_type = None
+            first = True
+            yield "{"
+            async for record_type, record in ExportService.iter_records(user_id):
+                if record_type != current_type:
+                    if current_type is not None:
+                        yield "],"
+                    yield json.dumps(f"{record_type}s") + ":["
+                    current_type = record_type
+                    first = True
+                if not first:
+                    yield ","
+                yield json.dumps(record, default=_json_default)
+                first = False
+            if current_type is not None:
+                yield "]"
+            yield "}"
+
+        async for chunk in ExportService._buffer(parts()):
+            yield chunk
+
+    @staticmethod
+    async def _buffer(parts: AsyncIterator[str]) -> AsyncGenerator[bytes, None]:
+        """Coalesce small string parts into chunks of roughly EXPORT_CHUNK_SIZE bytes"""
+        buffer = []
+        size = 0
+        async for part in parts:
+            encoded = part.encode("utf-8")
+            buffer.append(encoded)
+            size += len(encoded)
+            if size >= EXPORT_CHUNK_SIZE:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b"".join(buffer)
@@ -0,0 +1,189 @@
+"""
+Background job bookkeeping
+
+Request handlers enqueue Celery jobs (see tasks/) through JobQueue.enqueue
+instead of doing slow side effects inline. Every job carries an
+idempotency key tracked in Redis:
+
+    queued   enqueued, not started; duplicate enqueues are dropped
+    running  a worker claimed it; redeliveries retry later
+    done     finished; redeliveries and re-enqueues are no-ops until expiry
+
+A failed attempt puts its key back to 'queued' so only the retry can
+claim it. Jobs that exhaust their retries land in the dead-letter list
+with their arguments and error, and their key is dropped so they can be
+enqueued again or replayed.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from datetime import datetime, timezone
+import json
+import logging
+import uuid
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.resources import get_resources
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_PREFIX = "job"
+
+# Seconds a key stays 'done' (duplicates dropped) and 'running' (claim lease)
+JOB_IDEMPOTENCY_TTL = 24 * 3600
+JOB_RUNNING_TTL = 15 * 60
+
+DEAD_LETTER_KEY = "jobs:dead_letter"
+DEAD_LETTER_MAXLEN = 10_000
+
+JOB_CLAIMED = "claimed"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+
+# Moves a key to 'running' unless a worker holds it or it already finished
+CLAIM_SCRIPT = """
+local state = redis.call('GET', KEYS[1])
+if state == 'running' or state == 'done' then
+    return state
+end
+redis.call('SET', KEYS[1], 'running', 'EX', ARGV[1])
+return 'claimed'
+"""
+
+
+class RetryableJobError(Exception):
+    """Transient failure: the job is retried with backoff"""
+
+
+def _default_redis():
+    return get_resources().redis
+
+
+class JobQueue:
+    """Idempotency keys and dead letters for background jobs"""
+
+    def __init__(self, redis_getter: Callable = _default_redis):
+        self._redis_getter = redis_getter
+        self._claim_script = None
+
+    @staticmethod
+    def _key(idempotency_key: str) -> str:
+        return f"{JOB_KEY_PREFIX}:{idempotency_key}"
+
+    async def enqueue(
+        self,
+        task,
+        args: Sequence[Any] = (),
+        idempotency_key: Optional[str] = None,
+        countdown: Optional[float] = None
+    ) -> Optional[str]:
+        """Send a Celery task unless the same idempotency key is queued, running or done.
+
+        Returns the task ID, which for a duplicate is the ID of the job
+        already queued, running or done; None only if the job could not be
+        enqueued. Never raises: a side effect must not fail the request.
+        """
+        task_id = str(uuid.uuid5(uuid.NAMESPACE_URL, idempotency_key)) if idempotency_key else None
+        redis = None
+        if idempotency_key:
+            try:
+                redis = self._redis_getter()
+                acquired = await redis.set(self._key(idempotency_key), "queued", nx=True, ex=JOB_IDEMPOTENCY_TTL)
+            except Exception as e:
+                logger.warning(f"Job idempotency check failed for {task.name}: {e}")
+                acquired = True
+            if not acquired:
+                return task_id
+
+        try:
+            await run_in_threadpool(
+                task.apply_async,
+                args=list(args),
+                kwargs={"idempotency_key": idempotency_key},
+                task_id=task_id,
+                countdown=countdown
+            )
+        except Exception as e:
+            logger.error(f"Failed to enqueue {task.name}: {e}")
+            if redis is not None:
+                await self._delete(redis, idempotency_key)
+            return None
+        return task_id
+
+    async def claim(self, idempotency_key: str) -> str:
+        """JOB_CLAIMED if this attempt should run, else JOB_RUNNING or JOB_DONE"""
+        redis = self._redis_getter()
+        if self._claim_script is None or self._claim_script[0] is not redis:
+            self._claim_script = (redis, redis.register_script(CLAIM_SCRIPT))
+        state = await self._claim_script[1](keys=[self._key(idempotency_key)], args=[JOB_RUNNING_TTL])
+        return state.decode() if isinstance(state, bytes) else state
+
+    async def complete(self, idempotency_key: str):
+        await self._redis_getter().set(self._key(idempotency_key), JOB_DONE, ex=JOB_IDEMPOTENCY_TTL)
+
+    async def release(self, idempotency_key: str):
+        """Hand the key back after a failed attempt so the retry can claim it"""
+        await self._redis_getter().set(self._key(idempotency_key), "queued", ex=JOB_IDEMPOTENCY_TTL)
+
+    async def forget(self, idempotency_key: str):
+        """Drop the key so the job can be enqueued again"""
+        await self._delete(self._redis_getter(), idempotency_key)
+
+    async def _delete(self, redis, idempotency_key: str):
+        try:
+            await redis.delete(self._key(idempotency_key))
+        except Exception as e:
+            logger.warning(f"Failed to release job key {idempotency_key}: {e}")
+
+    async def dead_letter(
+        self,
+        task_name: str,
+        task_id: Optional[str],
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+        error: BaseException,
+        retries: int = 0
+    ):
+        """Record a job that will not be retried again"""
+        record = {
+            "task": task_name,
+            "task_id": task_id,
+            "args": list(args),
+            "kwargs": kwargs,
+            "error": f"{type(error).__name__}: {error}",
+            "retries": retries,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        redis = self._redis_getter()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(DEAD_LETTER_KEY, json.dumps(record, default=str))
+            pipe.ltrim(DEAD_LETTER_KEY, 0, DEAD_LETTER_MAXLEN - 1)
+            await pipe.execute()
+        logger.error(f"Job {task_name} ({task_id}) dead-lettered after {retries} retries: {record['error']}")
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered jobs"""
+        raw = await self._redis_getter().lrange(DEAD_LETTER_KEY, 0, limit - 1)
+        return [json.loads(item) for item in raw]
+
+    async def replay_dead_letters(self, send_task: Callable, limit: int = 100) -> int:
+        """Re-send the oldest dead-lettered jobs through send_task(name, args, kwargs)"""
+        redis = self._redis_getter()
+        replayed = 0
+        for _ in range(limit):
+            raw = await redis.rpop(DEAD_LETTER_KEY)
+            if raw is None:
+                break
+            record = json.loads(raw)
+            idempotency_key = record["kwargs"].get("idempotency_key")
+            if idempotency_key:
+                await self._delete(redis, idempotency_key)
+            try:
+                await run_in_threadpool(send_task, record["task"], args=record["args"], kwargs=record["kwargs"])
+            except Exception:
+                await redis.rpush(DEAD_LETTER_KEY, raw)
+                raise
+            replayed += 1
+        return replayed
+
+
+job_queue = JobQueue()
@@ -5,16 +5,30 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional, List, Tuple
 from datetime import datetime
 import re
-import markdown
-from bs4 import BeautifulSoup
 
 from models.note import Note, NoteVersion
 from models.schemas.note import NoteCreate, NoteUpdate
-from db.mongodb import get_collection, Collections
+from db.mongodb import Collections
+from utils.resources import get_collection
+from utils.mongo_profiles import DURABLE_WRITE, FAST_READ, mongo_profile, with_mongo_profile
+from services.change_feed import change_feed
+from services.job_queue import job_queue, RetryableJobError
+from services.read_cache import NOTES, read_cache
+from utils.single_flight import coalesce
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Qdrant collection holding one embedding per note
+NOTE_VECTOR_COLLECTION = "notes"
+NOTE_EMBEDDING_MAX_CHARS = 8000
+
+# Version compaction: once a note has more than NOTE_VERSIONS_COMPACT_AT
+# archived versions, the newest NOTE_VERSIONS_KEEP_RECENT are kept as-is
+# and older ones are thinned to the last version of each day
+NOTE_VERSIONS_COMPACT_AT = 50
+NOTE_VERSIONS_KEEP_RECENT = 20
+
 
 class NoteService:
     """Note service"""
@@ -37,11 +51,12 @@ class NoteService:
             versions=[]
         )
         
-        collection = get_collection(Collections.NOTES)
-        await collection.insert_one(note.model_dump())
+        with mongo_profile(DURABLE_WRITE):
+            await get_collection(Collections.NOTES).insert_one(note.model_dump())
         
-        # Create indexes if not exists
-        await NoteService._ensure_indexes()
+        await change_feed.publish([user_id], "note", "created", note.id, NoteService._change_data(note))
+        await read_cache.invalidate([user_id], NOTES)
+        await NoteService._enqueue_reindex(note)
         
         logger.info(f"Note created: {note.id} by user {user_id}")
         return note
@@ -63,6 +78,27 @@ class NoteService:
             return Note(**note_dict)
         return None
     
+    @staticmethod
+    @coalesce()
+    async def get_note_stamp(
+        note_id: str,
+        user_id: str,
+        version: Optional[int] = None
+    ) -> Optional[dict]:
+        """Version stamp of a note (updated_at, current_version, history_revision) without loading its content
+
+        With a version, None unless that archived version still exists.
+        """
+        collection = get_collection(Collections.NOTES)
+        
+        query = {"id": note_id, "user_id": user_id}
+        if version is not None:
+            query["versions.version"] = version
+        return await collection.find_one(
+            query,
+            {"_id": 0, "updated_at": 1, "current_version": 1, "history_revision": 1}
+        )
+    
     @staticmethod
     async def get_notes(
         user_id: str,
@@ -110,8 +146,6 @@ class NoteService:
         note_data: NoteUpdate
     ) -> Optional[Note]:
         """Update a note and save version history"""
-        collection = get_collection(Collections.NOTES)
-        
         # Get existing note
         note = await NoteService.get_note(note_id, user_id)
         if not note:
@@ -136,10 +170,23 @@ class NoteService:
         note.updated_at = datetime.utcnow()
         
         # Update in database
-        await collection.update_one(
-            {"id": note_id, "user_id": user_id},
-            {"$set": note.model_dump()}
-        )
+        with mongo_profile(DURABLE_WRITE):
+            await get_collection(Collections.NOTES).update_one(
+                {"id": note_id, "user_id": user_id},
+                {"$set": note.model_dump()}
+            )
+        
+        await change_feed.publish([user_id], "note", "updated", note_id, NoteService._change_data(note))
+        await read_cache.invalidate([user_id], NOTES)
+        if "title" in update_data or "content" in update_data:
+            await NoteService._enqueue_reindex(note)
+        if len(note.versions) > NOTE_VERSIONS_COMPACT_AT:
+            from tasks.note_tasks import compact_note_versions
+            await job_queue.enqueue(
+                compact_note_versions,
+                args=[note_id, user_id],
+                idempotency_key=f"notes.compact:{note_id}:{note.current_version}"
+            )
         
         logger.info(f"Note updated: {note_id}")
         return note
@@ -158,6 +205,10 @@ class NoteService:
         })
         
         if result.deleted_count > 0:
+            await change_feed.publish([user_id], "note", "deleted", note_id)
+            await read_cache.invalidate([user_id], NOTES)
+            from tasks.note_tasks import reindex_note
+            await job_queue.enqueue(reindex_note, args=[note_id, user_id], idempotency_key=f"notes.reindex:{note_id}:deleted")
             logger.info(f"Note deleted: {note_id}")
             return True
         return False
@@ -174,6 +225,24 @@ class NoteService:
         
         return note.versions
     
+    @staticmethod
+    async def get_note_version(
+        note_id: str,
+        user_id: str,
+        version: int
+    ) -> Optional[NoteVersion]:
+        """Get one archived version of a note"""
+        collection = get_collection(Collections.NOTES)
+        
+        note_dict = await collection.find_one(
+            {"id": note_id, "user_id": user_id, "versions.version": version},
+            {"_id": 0, "versions": {"$elemMatch": {"version": version}}}
+        )
+        
+        if note_dict and note_dict.get("versions"):
+            return NoteVersion(**note_dict["versions"][0])
+        return None
+    
     @staticmethod
     async def get_linked_entities(
         note_id: str,
@@ -204,6 +273,7 @@ class NoteService:
         }
     
     @staticmethod
+    @with_mongo_profile(FAST_READ)
     async def search_notes(
         user_id: str,
         query: str,
@@ -213,9 +283,6 @@ class NoteService:
         """Full-text search for notes"""
         collection = get_collection(Collections.NOTES)
         
-        # Ensure text index exists
-        await NoteService._ensure_indexes()
-        
         # Build search query
         search_query = {
             "user_id": user_id,
@@ -255,12 +322,121 @@ class NoteService:
     @staticmethod
     def render_markdown(content: str) -> str:
         """Render markdown to HTML"""
+        import markdown  # imported on first render to keep startup fast
+
         html = markdown.markdown(
             content,
             extensions=['fenced_code', 'codehilite', 'tables', 'nl2br']
         )
         return html
     
+    @staticmethod
+    async def _enqueue_reindex(note: Note):
+        """Queue re-embedding of a note's current title and content"""
+        from tasks.note_tasks import reindex_note
+        
+        await job_queue.enqueue(
+            reindex_note,
+            args=[note.id, note.user_id],
+            idempotency_key=f"notes.reindex:{note.id}:{note.updated_at.isoformat()}"
+        )
+    
+    @staticmethod
+    async def reindex_note(note_id: str, user_id: str) -> bool:
+        """Upsert (or remove) a note's embedding in the vector index (background job)"""
+        from utils.resources import get_resources
+        resources = get_resources()
+        if not resources.qdrant_url:
+            return False
+        
+        from qdrant_client.models import Distance, PointStruct, PointIdsList, VectorParams
+        from services.openai_service import OpenAIService
+        
+        note = await NoteService.get_note(note_id, user_id)
+        qdrant = resources.qdrant
+        
+        if note is None:
+            try:
+                await qdrant.delete(NOTE_VECTOR_COLLECTION, points_selector=PointIdsList(points=[note_id]))
+            except Exception as e:
+                logger.info(f"No vector to remove for note {note_id}: {e}")
+            return False
+        
+        text = f"{note.title}\n\n{note.content}"[:NOTE_EMBEDDING_MAX_CHARS]
+        vector = await OpenAIService.create_embedding(text)
+        
+        collections = await qdrant.get_collections()
+        if NOTE_VECTOR_COLLECTION not in {c.name for c in collections.collections}:
+            await qdrant.create_collection(
+                NOTE_VECTOR_COLLECTION,
+                vectors_config=VectorParams(size=len(vector), distance=Distance.COSINE)
+            )
+        
+        await qdrant.upsert(
+            NOTE_VECTOR_COLLECTION,
+            points=[PointStruct(
+                id=note.id,
+                vector=vector,
+                payload={
+                    "user_id": note.user_id,
+                    "project_id": note.project_id,
+                    "title": note.title,
+                    "tags": note.tags,
+                    "updated_at": note.updated_at.isoformat()
+                }
+            )]
+        )
+        return True
+    
+    @staticmethod
+    def _compacted_versions(versions: List[NoteVersion]) -> List[NoteVersion]:
+        """Keep the newest versions, and the last version of each day before them"""
+        if len(versions) <= NOTE_VERSIONS_KEEP_RECENT:
+            return versions
+        
+        older = versions[:-NOTE_VERSIONS_KEEP_RECENT]
+        last_of_day = {}
+        for version in older:
+            last_of_day[version.updated_at.date()] = version
+        kept = sorted(last_of_day.values(), key=lambda v: v.version)
+        return kept + versions[-NOTE_VERSIONS_KEEP_RECENT:]
+    
+    @staticmethod
+    async def compact_versions(note_id: str, user_id: str) -> int:
+        """Thin out old versions of a note; returns how many were removed (background job)"""
+        note = await NoteService.get_note(note_id, user_id)
+        if not note:
+            return 0
+        
+        kept = NoteService._compacted_versions(note.versions)
+        removed = len(note.versions) - len(kept)
+        if not removed:
+            return 0
+        
+        # Only applies if no edit landed since the note was read
+        collection = get_collection(Collections.NOTES)
+        result = await collection.update_one(
+            {"id": note_id, "user_id": user_id, "current_version": note.current_version},
+            {
+                "$set": {"versions": [v.model_dump() for v in kept]},
+                # History ETags include the revision, so clients refetch
+                "$inc": {"history_revision": 1}
+            }
+        )
+        if result.modified_count == 0:
+            raise RetryableJobError(f"Note {note_id} changed during compaction")
+        
+        logger.info(f"Compacted {removed} versions of note {note_id}")
+        return removed
+    
+    @staticmethod
+    def _change_data(note: Note) -> dict:
+        """List-level fields sent on the change feed (content is fetched on open)"""
+        return note.model_dump(
+            mode="json",
+            include={"project_id", "title", "tags", "current_version", "is_pinned", "is_archived", "updated_at"}
+        )
+    
     @staticmethod
     def _generate_preview(content: str, query: str = "", max_length: int = 200) -> str:
         """Generate preview text with query context"""
@@ -305,8 +481,8 @@ class NoteService:
         return highlights
     
     @staticmethod
-    async def _ensure_indexes():
-        """Ensure MongoDB indexes exist"""
+    async def ensure_indexes():
+        """Ensure MongoDB indexes exist (run once at startup)"""
         collection = get_collection(Collections.NOTES)
         
         # Create indexes
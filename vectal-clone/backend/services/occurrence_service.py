@@ -0,0 +1,243 @@
+"""
+Recurring task occurrence service layer
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
+import asyncio
+import uuid
+
+from models.task import Task, TaskOccurrence, TaskRecurrenceExpansion
+from utils.rrule_cache import as_utc
+from utils.recurrence_batch import expand_batch
+from utils.resources import get_resources
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Occurrences are materialized for [now - LOOKBACK, now + HORIZON]
+OCCURRENCE_LOOKBACK = timedelta(days=30)
+OCCURRENCE_HORIZON = timedelta(days=120)
+
+# Windows are extended once less than this much of the horizon remains
+OCCURRENCE_REFRESH_MARGIN = timedelta(days=60)
+
+# Tasks expanded per materializer pass
+MATERIALIZE_BATCH_SIZE = 500
+
+# Seconds between background materializer runs
+MATERIALIZE_INTERVAL = 300
+
+
+class OccurrenceService:
+    """Materialized occurrence index for recurring tasks"""
+
+    @staticmethod
+    def _dtstart():
+        """Start date a task's rule is anchored to"""
+        return func.coalesce(Task.due_date, Task.created_at)
+
+    @staticmethod
+    async def materialize_due(
+        db: AsyncSession,
+        user_id: Optional[uuid.UUID] = None,
+        limit: int = MATERIALIZE_BATCH_SIZE
+    ) -> int:
+        """Expand tasks that are new, changed, or close to the end of their window.
+
+        Returns the number of tasks expanded. Rows are claimed with
+        SKIP LOCKED so several workers can run the materializer at once.
+        """
+        now = datetime.now(timezone.utc)
+        dtstart = OccurrenceService._dtstart()
+
+        query = (
+            select(Task.id, Task.user_id, Task.recurrence_rule, dtstart.label('dtstart'))
+            .outerjoin(TaskRecurrenceExpansion, TaskRecurrenceExpansion.task_id == Task.id)
+            .where(
+                and_(
+                    Task.recurrence_rule.is_not(None),
+                    or_(
+                        TaskRecurrenceExpansion.task_id.is_(None),
+                        TaskRecurrenceExpansion.recurrence_rule != Task.recurrence_rule,
+                        TaskRecurrenceExpansion.dtstart != dtstart,
+                        TaskRecurrenceExpansion.expanded_until < now + OCCURRENCE_REFRESH_MARGIN
+                    )
+                )
+            )
+            .limit(limit)
+            .with_for_update(of=Task, skip_locked=True)
+        )
+        if user_id is not None:
+            query = query.where(Task.user_id == user_id)
+
+        result = await db.execute(query)
+        tasks = result.all()
+        if not tasks:
+            await db.rollback()
+            return 0
+
+        window_end = now + OCCURRENCE_HORIZON
+        batch = expand_batch(
+            [(task.dtstart, task.recurrence_rule) for task in tasks],
+            now - OCCURRENCE_LOOKBACK,
+            window_end
+        )
+        occurrences: List[Dict[str, Any]] = [
+            {"task_id": tasks[i].id, "occurs_at": occurs_at, "user_id": tasks[i].user_id}
+            for i, occurs_at in zip(batch.item_index.tolist(), batch.to_datetimes())
+        ]
+        expansions: List[Dict[str, Any]] = [
+            {
+                "task_id": task.id,
+                "recurrence_rule": task.recurrence_rule,
+                "dtstart": task.dtstart,
+                "expanded_from": max(as_utc(task.dtstart), now - OCCURRENCE_LOOKBACK),
+                "expanded_until": window_end,
+            }
+            for task in tasks
+        ]
+
+        task_ids = [task.id for task in tasks]
+        await db.execute(delete(TaskOccurrence).where(TaskOccurrence.task_id.in_(task_ids)))
+        if occurrences:
+            await db.execute(insert(TaskOccurrence), occurrences)
+
+        upsert = pg_insert(TaskRecurrenceExpansion).values(expansions)
+        await db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[TaskRecurrenceExpansion.task_id],
+                set_={
+                    "recurrence_rule": upsert.excluded.recurrence_rule,
+                    "dtstart": upsert.excluded.dtstart,
+                    "expanded_from": upsert.excluded.expanded_from,
+                    "expanded_until": upsert.excluded.expanded_until,
+                    "expanded_at": func.now(),
+                }
+            )
+        )
+        await db.commit()
+
+        logger.info(f"Materialized {len(occurrences)} occurrences for {len(tasks)} recurring tasks")
+        return len(tasks)
+
+    @staticmethod
+    async def purge_stale(db: AsyncSession, user_id: Optional[uuid.UUID] = None) -> int:
+        """Drop occurrences of tasks whose recurrence rule was removed"""
+        stale = (
+            select(TaskRecurrenceExpansion.task_id)
+            .join(Task, Task.id == TaskRecurrenceExpansion.task_id)
+            .where(Task.recurrence_rule.is_(None))
+        )
+        if user_id is not None:
+            stale = stale.where(Task.user_id == user_id)
+
+        result = await db.execute(stale)
+        task_ids = list(result.scalars().all())
+        if not task_ids:
+            return 0
+
+        await db.execute(delete(TaskOccurrence).where(TaskOccurrence.task_id.in_(task_ids)))
+        await db.execute(delete(TaskRecurrenceExpansion).where(TaskRecurrenceExpansion.task_id.in_(task_ids)))
+        await db.commit()
+        return len(task_ids)
+
+    @staticmethod
+    async def get_occurrences(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        start: datetime,
+        end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Occurrences of the user's recurring tasks in [start, end)
+
+        Read-only: the background materializer keeps the index current.
+        Tasks it has not caught up with yet (new or changed rules) are
+        expanded on demand, as are ranges outside the materialized window.
+        """
+        start, end = as_utc(start), as_utc(end)
+        now = datetime.now(timezone.utc)
+        dtstart = OccurrenceService._dtstart()
+        recurring = and_(Task.user_id == user_id, Task.recurrence_rule.is_not(None))
+
+        if not (start >= now - OCCURRENCE_LOOKBACK and end <= now + OCCURRENCE_REFRESH_MARGIN):
+            return await OccurrenceService._expand(db, recurring, start, end)
+
+        # Expansions that match the task's current rule and cover the range
+        current = and_(
+            TaskRecurrenceExpansion.task_id == Task.id,
+            TaskRecurrenceExpansion.recurrence_rule == Task.recurrence_rule,
+            TaskRecurrenceExpansion.dtstart == dtstart,
+            TaskRecurrenceExpansion.expanded_until >= end
+        )
+        result = await db.execute(
+            select(
+                TaskOccurrence.task_id,
+                TaskOccurrence.occurs_at,
+                Task.title,
+                Task.status,
+                Task.project_id
+            )
+            .join(Task, Task.id == TaskOccurrence.task_id)
+            .join(TaskRecurrenceExpansion, current)
+            .where(
+                and_(
+                    recurring,
+                    TaskOccurrence.occurs_at >= start,
+                    TaskOccurrence.occurs_at < end
+                )
+            )
+        )
+        occurrences = [dict(row) for row in result.mappings().all()]
+
+        pending = and_(recurring, ~select(TaskRecurrenceExpansion.task_id).where(current).exists())
+        occurrences.extend(await OccurrenceService._expand(db, pending, start, end))
+        occurrences.sort(key=lambda occurrence: occurrence["occurs_at"])
+        return occurrences
+
+    @staticmethod
+    async def _expand(db: AsyncSession, where, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Expand matching tasks' rules over [start, end) with cached rules"""
+        result = await db.execute(
+            select(
+                Task.id,
+                Task.recurrence_rule,
+                OccurrenceService._dtstart().label('dtstart'),
+                Task.title,
+                Task.status,
+                Task.project_id
+            )
+            .where(where)
+        )
+        tasks = result.all()
+        if not tasks:
+            return []
+        batch = expand_batch([(task.dtstart, task.recurrence_rule) for task in tasks], start, end)
+        return [
+            {
+                "task_id": tasks[i].id,
+                "occurs_at": occurs_at,
+                "title": tasks[i].title,
+                "status": tasks[i].status,
+                "project_id": tasks[i].project_id,
+            }
+            for i, occurs_at in zip(batch.item_index.tolist(), batch.to_datetimes())
+        ]
+
+    @staticmethod
+    async def run_materializer(interval: int = MATERIALIZE_INTERVAL):
+        """Background loop keeping the occurrence index up to date"""
+        while True:
+            try:
+                async with get_resources().session() as session:
+                    while await OccurrenceService.materialize_due(session) == MATERIALIZE_BATCH_SIZE:
+                        pass
+                    await OccurrenceService.purge_stale(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Occurrence materializer error: {e}")
+
+            await asyncio.sleep(interval)
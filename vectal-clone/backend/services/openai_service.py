@@ -1,16 +1,18 @@
 """
 OpenAI service for GPT-4 integration
 """
-from openai import AsyncOpenAI
 from typing import List, Dict, AsyncGenerator
 import logging
 
-from utils.config import settings
+from utils.metrics import OpenAITimer
+from utils.resources import get_resources
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+def get_openai_client():
+    """Shared OpenAI client (the openai package is imported on first use)"""
+    return get_resources().openai
 
 
 class OpenAIService:
@@ -25,19 +27,24 @@ class OpenAIService:
         stream: bool = False
     ):
         """Create a chat completion"""
+        timer = OpenAITimer("chat", model)
         try:
-            response = await openai_client.chat.completions.create(
+            response = await get_openai_client().chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=stream
             )
-            
-            return response
         except Exception as e:
+            timer.finish("error")
             logger.error(f"OpenAI API error: {e}")
             raise
+        
+        if not stream:
+            timer.usage(response.usage)
+        timer.finish()
+        return response
     
     @staticmethod
     async def create_streaming_completion(
@@ -47,8 +54,11 @@ class OpenAIService:
         max_tokens: int = 1000
     ) -> AsyncGenerator[str, None]:
         """Create a streaming chat completion"""
+        timer = OpenAITimer("chat_stream", model)
+        status = "cancelled"
+        chunks = 0
         try:
-            stream = await openai_client.chat.completions.create(
+            stream = await get_openai_client().chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -58,25 +68,37 @@ class OpenAIService:
             
             async for chunk in stream:
                 if chunk.choices[0].delta.content:
+                    timer.first_token()
+                    chunks += 1
                     yield chunk.choices[0].delta.content
+            status = "ok"
                     
         except Exception as e:
+            status = "error"
             logger.error(f"OpenAI streaming error: {e}")
             raise
+        finally:
+            # Streams carry no usage block; each content chunk is about one token
+            timer.tokens("completion", chunks)
+            timer.finish(status)
     
     @staticmethod
     async def create_embedding(text: str, model: str = "text-embedding-ada-002") -> List[float]:
         """Create text embedding"""
+        timer = OpenAITimer("embedding", model)
         try:
-            response = await openai_client.embeddings.create(
+            response = await get_openai_client().embeddings.create(
                 model=model,
                 input=text
             )
-            
-            return response.data[0].embedding
         except Exception as e:
+            timer.finish("error")
             logger.error(f"OpenAI embedding error: {e}")
             raise
+        
+        timer.tokens("prompt", getattr(response.usage, "prompt_tokens", None))
+        timer.finish()
+        return response.data[0].embedding
     
     @staticmethod
     def count_tokens(text: str) -> int:
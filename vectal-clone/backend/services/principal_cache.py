@@ -0,0 +1,254 @@
+"""
+Authenticated user (principal) cache
+
+Two tiers keyed by user ID and token jti: a short-lived in-process LRU in
+front of Redis. Entries are dropped on logout (one token) and on
+deactivation or password change (every token of the user). Other workers
+may keep serving their local copy for up to PRINCIPAL_LOCAL_TTL seconds.
+
+Logout also revokes the token: its jti is recorded locally and in Redis
+until the token expires, and checked whenever the principal is looked up
+in Redis, so a logged-out token is not reloaded from the database.
+
+Verified JWT payloads are memoized per token until the token expires, so
+the signature is checked once per worker rather than on every request.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional, Dict, Any, Callable, Tuple
+from datetime import datetime, date
+import hashlib
+import json
+import time
+import uuid
+
+from models.user import User
+from utils.ttl_cache import TTLCache
+from utils.resources import get_resources
+import logging
+
+logger = logging.getLogger(__name__)
+
+# In-process tier
+PRINCIPAL_LOCAL_TTL = 5
+PRINCIPAL_LOCAL_MAXSIZE = 10_000
+
+# Redis tier
+PRINCIPAL_REDIS_TTL = 300
+PRINCIPAL_KEY_PREFIX = "principal"
+
+# Verified token payloads kept per worker
+TOKEN_MEMO_MAXSIZE = 10_000
+
+# Revoked tokens are remembered until they expire, or this long if the
+# expiry is not known (longer than any access token lives)
+PRINCIPAL_REVOKED_TTL = 86400
+REVOKED_LOCAL_MAXSIZE = 10_000
+
+# Never copied into the cache
+PRINCIPAL_EXCLUDED_COLUMNS = {"password_hash"}
+
+
+def _token_digest(token: str) -> str:
+    """Stable identifier for a token without storing the token itself"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _dump_user(user: User) -> Dict[str, Any]:
+    """Column values of a user, JSON-serializable"""
+    data = {}
+    for column in User.__table__.columns:
+        if column.key in PRINCIPAL_EXCLUDED_COLUMNS:
+            continue
+        value = getattr(user, column.key)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        data[column.key] = value
+    return data
+
+
+def _load_user(data: Dict[str, Any]) -> User:
+    """Detached User rebuilt from cached column values"""
+    values = {}
+    for column in User.__table__.columns:
+        if column.key not in data:
+            continue
+        value = data[column.key]
+        if value is not None:
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                python_type = None
+            if python_type is uuid.UUID:
+                value = uuid.UUID(value)
+            elif python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+        values[column.key] = value
+    return User(**values)
+
+
+def _default_redis():
+    return get_resources().redis
+
+
+class PrincipalCache:
+    """Two-tier cache of authenticated users"""
+
+    def __init__(self, redis_getter: Callable = _default_redis):
+        self._redis_getter = redis_getter
+        self._local = TTLCache(PRINCIPAL_LOCAL_MAXSIZE, PRINCIPAL_LOCAL_TTL)
+        self._tokens = TTLCache(TOKEN_MEMO_MAXSIZE, 0)
+        self._revoked = TTLCache(REVOKED_LOCAL_MAXSIZE, 0)
+
+    @staticmethod
+    def _key(user_id: str, jti: str) -> str:
+        return f"{PRINCIPAL_KEY_PREFIX}:{user_id}:{jti}"
+
+    @staticmethod
+    def _revoked_key(jti: str) -> str:
+        return f"{PRINCIPAL_KEY_PREFIX}:revoked:{jti}"
+
+    @staticmethod
+    def _index_key(user_id: str) -> str:
+        return f"{PRINCIPAL_KEY_PREFIX}:{user_id}:tokens"
+
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verified access token payload, memoized until the token expires"""
+        digest = _token_digest(token)
+        payload = self._tokens.get(digest)
+        if payload is not None:
+            if (payload.get("jti") or digest) in self._revoked:
+                self._tokens.pop(digest)
+                return None
+            return payload
+
+        from utils.jwt import verify_access_token
+        try:
+            payload = verify_access_token(token)
+        except Exception:
+            return None
+        if not payload:
+            return None
+
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            self._tokens.set(digest, payload, ttl)
+        return payload
+
+    async def lookup(self, user_id: str, jti: str) -> Tuple[Optional[User], bool]:
+        """Cached user for a token and whether the token was revoked
+
+        The local tier answers without Redis; otherwise the entry and the
+        revocation mark are read in one round trip.
+        """
+        if jti in self._revoked:
+            return None, True
+        data = self._local.get((user_id, jti))
+        if data is None:
+            try:
+                raw, revoked = await self._redis_getter().mget(self._key(user_id, jti), self._revoked_key(jti))
+            except Exception as e:
+                logger.warning(f"Principal cache read failed: {e}")
+                return None, False
+            if revoked is not None:
+                self._revoked.set(jti, True, PRINCIPAL_REDIS_TTL)
+                return None, True
+            if raw is None:
+                return None, False
+            data = json.loads(raw)
+            self._local.set((user_id, jti), data)
+        return _load_user(data), False
+
+    async def get(self, user_id: str, jti: str) -> Optional[User]:
+        """Cached user for a token, checking the local tier then Redis"""
+        user, _ = await self.lookup(user_id, jti)
+        return user
+
+    async def set(self, user: User, jti: str):
+        """Cache a user loaded from the database"""
+        user_id = str(user.id)
+        data = _dump_user(user)
+        self._local.set((user_id, jti), data)
+        try:
+            pipe = self._redis_getter().pipeline(transaction=False)
+            pipe.set(self._key(user_id, jti), json.dumps(data), ex=PRINCIPAL_REDIS_TTL)
+            pipe.sadd(self._index_key(user_id), jti)
+            pipe.expire(self._index_key(user_id), PRINCIPAL_REDIS_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {e}")
+
+    async def invalidate_token(self, user_id: Any, jti: str, expires_at: Optional[float] = None):
+        """Drop one token's entry and revoke the token until it expires (logout)"""
+        user_id = str(user_id)
+        ttl = max(1, int(expires_at - time.time())) if expires_at else PRINCIPAL_REVOKED_TTL
+        self._local.pop((user_id, jti))
+        self._revoked.set(jti, True, ttl)
+        try:
+            pipe = self._redis_getter().pipeline(transaction=False)
+            pipe.set(self._revoked_key(jti), 1, ex=ttl)
+            pipe.delete(self._key(user_id, jti))
+            pipe.srem(self._index_key(user_id), jti)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+    async def invalidate_user(self, user_id: Any):
+        """Drop every entry of a user (deactivation, password change)"""
+        user_id = str(user_id)
+        self._local.discard_where(lambda key: key[0] == user_id)
+        try:
+            redis = self._redis_getter()
+            jtis = await redis.smembers(self._index_key(user_id))
+            keys = [
+                self._key(user_id, jti.decode() if isinstance(jti, bytes) else jti)
+                for jti in jtis
+            ]
+            await redis.delete(*keys, self._index_key(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+    def clear_local(self):
+        """Drop the in-process tier"""
+        self._local.clear()
+        self._tokens.clear()
+        self._revoked.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+async def resolve_user(db: AsyncSession, token: str) -> Optional[User]:
+    """User for a bearer token, or None if the token is invalid or revoked
+    or the user is missing or deactivated.
+
+    Backs api.dependencies.principal.get_current_user. Cached users are detached and omit
+    password_hash; reload the row before checking credentials.
+    """
+    payload = principal_cache.verify_token(token)
+    if not payload or payload.get("type", "access") != "access" or not payload.get("sub"):
+        return None
+
+    user_id = str(payload["sub"])
+    jti = payload.get("jti") or _token_digest(token)
+
+    user, revoked = await principal_cache.lookup(user_id, jti)
+    if revoked:
+        return None
+    if user is not None:
+        return user if user.is_active else None
+
+    try:
+        user_uuid = uuid.UUID(user_id)
+    except ValueError:
+        return None
+    result = await db.execute(select(User).where(User.id == user_uuid))
+    user = result.scalar_one_or_none()
+    if user is None or not user.is_active:
+        return None
+    await principal_cache.set(user, jti)
+    return user
@@ -4,13 +4,16 @@ Project service layer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, or_, Integer
 import sqlalchemy as sa
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Optional, List, Tuple
 from datetime import datetime
 import uuid
 
-from models.task import Project, ProjectCollaborator, Task
+from models.task import Project, ProjectCollaborator, Task, TaskLabel
 from models.user import User
 from models.schemas.project import ProjectCreate, ProjectUpdate
+from services.change_feed import change_feed
+from services.read_cache import PROJECTS, read_cache
+from utils.single_flight import coalesce
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,6 +54,9 @@ class ProjectService:
         await db.commit()
         await db.refresh(project)
         
+        await change_feed.publish([user_id], "project", "created", project.id, ProjectService._change_data(project))
+        await read_cache.invalidate([user_id], PROJECTS)
+        
         logger.info(f"Project created: {project.id} by user {user_id}")
         return project
     
@@ -75,6 +81,55 @@ class ProjectService:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    @coalesce()
+    async def get_project_stamp(
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        user_id: uuid.UUID
+    ) -> Optional[tuple]:
+        """Version stamp covering a project, its task counts and collaborators (with access check)"""
+        tasks = (
+            select(
+                func.count(Task.id).label('count'),
+                func.sum(func.cast(Task.status == 'completed', sa.Integer)).label('completed'),
+                func.max(Task.updated_at).label('changed')
+            )
+            .where(Task.project_id == project_id)
+            .subquery()
+        )
+        collaborators = (
+            select(
+                func.count().label('count'),
+                func.max(ProjectCollaborator.updated_at).label('changed')
+            )
+            .where(ProjectCollaborator.project_id == project_id)
+            .subquery()
+        )
+        
+        result = await db.execute(
+            select(
+                Project.updated_at,
+                tasks.c.count,
+                tasks.c.completed,
+                tasks.c.changed,
+                collaborators.c.count,
+                collaborators.c.changed
+            )
+            .join(ProjectCollaborator, Project.id == ProjectCollaborator.project_id)
+            .join(tasks, sa.true())
+            .join(collaborators, sa.true())
+            .where(
+                and_(
+                    Project.id == project_id,
+                    ProjectCollaborator.user_id == user_id,
+                    ProjectCollaborator.status == 'accepted'
+                )
+            )
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+    
     @staticmethod
     async def get_projects(
         db: AsyncSession,
@@ -145,6 +200,10 @@ class ProjectService:
         await db.commit()
         await db.refresh(project)
         
+        members = await ProjectService.get_member_ids(db, project.id)
+        await change_feed.publish(members, "project", "updated", project.id, ProjectService._change_data(project))
+        await read_cache.invalidate(members, PROJECTS)
+        
         logger.info(f"Project updated: {project.id}")
         return project
     
@@ -163,9 +222,15 @@ class ProjectService:
         if not project:
             return False
         
+        # Collaborator rows are deleted with the project
+        members = await ProjectService.get_member_ids(db, project_id)
+        
         await db.delete(project)
         await db.commit()
         
+        await change_feed.publish(members, "project", "deleted", project_id)
+        await read_cache.invalidate(members, PROJECTS)
+        
         logger.info(f"Project deleted: {project_id}")
         return True
     
@@ -190,10 +255,15 @@ class ProjectService:
         await db.commit()
         await db.refresh(project)
         
+        members = await ProjectService.get_member_ids(db, project_id)
+        await change_feed.publish(members, "project", "updated", project_id, ProjectService._change_data(project))
+        await read_cache.invalidate(members, PROJECTS)
+        
         logger.info(f"Project {'archived' if archived else 'unarchived'}: {project_id}")
         return project
     
     @staticmethod
+    @coalesce()
     async def get_project_progress(
         db: AsyncSession,
         project_id: uuid.UUID,
@@ -205,9 +275,21 @@ class ProjectService:
         if not project:
             return None
         
-        # Get task counts
+        progress = await ProjectService.get_projects_progress(db, [project_id])
+        return progress[project_id]
+    
+    @staticmethod
+    async def get_projects_progress(
+        db: AsyncSession,
+        project_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, dict]:
+        """Progress of several projects in one grouped query (callers check access)"""
+        if not project_ids:
+            return {}
+        
         result = await db.execute(
             select(
+                Task.project_id,
                 func.count(Task.id).label('total'),
                 func.sum(func.cast(Task.status == 'completed', sa.Integer)).label('completed'),
                 func.sum(func.cast(Task.status == 'in_progress', sa.Integer)).label('in_progress'),
@@ -220,24 +302,48 @@ class ProjectService:
                     sa.Integer
                 )).label('overdue')
             )
-            .where(Task.project_id == project_id)
+            .where(Task.project_id.in_(project_ids))
+            .group_by(Task.project_id)
         )
+        stats_by_project = {row.project_id: row for row in result}
+        
+        progress = {}
+        for project_id in project_ids:
+            stats = stats_by_project.get(project_id)
+            total = stats.total if stats else 0
+            completed = (stats.completed or 0) if stats else 0
+            
+            progress_percentage = (completed / total * 100) if total > 0 else 0.0
+            
+            progress[project_id] = {
+                'project_id': project_id,
+                'total_tasks': total,
+                'completed_tasks': completed,
+                'in_progress_tasks': (stats.in_progress or 0) if stats else 0,
+                'pending_tasks': (stats.pending or 0) if stats else 0,
+                'overdue_tasks': (stats.overdue or 0) if stats else 0,
+                'progress_percentage': round(progress_percentage, 2)
+            }
+        return progress
+    
+    @staticmethod
+    async def get_labels_by_task(
+        db: AsyncSession,
+        task_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, List[str]]:
+        """Labels of several tasks in one query"""
+        labels: Dict[uuid.UUID, List[str]] = {task_id: [] for task_id in task_ids}
+        if not task_ids:
+            return labels
         
-        stats = result.one()
-        total = stats.total or 0
-        completed = stats.completed or 0
-        
-        progress_percentage = (completed / total * 100) if total > 0 else 0.0
-        
-        return {
-            'project_id': project_id,
-            'total_tasks': total,
-            'completed_tasks': completed,
-            'in_progress_tasks': stats.in_progress or 0,
-            'pending_tasks': stats.pending or 0,
-            'overdue_tasks': stats.overdue or 0,
-            'progress_percentage': round(progress_percentage, 2)
-        }
+        result = await db.execute(
+            select(TaskLabel.task_id, TaskLabel.label)
+            .where(TaskLabel.task_id.in_(task_ids))
+            .order_by(TaskLabel.task_id, TaskLabel.label)
+        )
+        for task_id, label in result:
+            labels[task_id].append(label)
+        return labels
     
     @staticmethod
     async def get_child_projects(
@@ -331,6 +437,12 @@ class ProjectService:
         await db.commit()
         await db.refresh(collaborator)
         
+        members = await ProjectService.get_member_ids(db, project_id)
+        await change_feed.publish(
+            members, "collaborator", "created", invitee.id, ProjectService._collaborator_change_data(collaborator)
+        )
+        await read_cache.invalidate(members, PROJECTS)
+        
         logger.info(f"Collaborator added to project {project_id}: {invitee.id}")
         return collaborator
     
@@ -364,6 +476,12 @@ class ProjectService:
         await db.commit()
         await db.refresh(collaborator)
         
+        members = await ProjectService.get_member_ids(db, project_id)
+        await change_feed.publish(
+            members, "collaborator", "updated", collaborator_id, ProjectService._collaborator_change_data(collaborator)
+        )
+        await read_cache.invalidate(members, PROJECTS)
+        
         return collaborator
     
     @staticmethod
@@ -393,12 +511,70 @@ class ProjectService:
         if collaborator.role == 'owner':
             return False
         
+        # The removed user is notified too
+        members = await ProjectService.get_member_ids(db, project_id)
+        
         await db.delete(collaborator)
         await db.commit()
         
+        await change_feed.publish(
+            members, "collaborator", "deleted", collaborator_id,
+            {"project_id": str(project_id), "user_id": str(collaborator_id)}
+        )
+        await read_cache.invalidate(members, PROJECTS)
+        
         logger.info(f"Collaborator removed from project {project_id}: {collaborator_id}")
         return True
     
+    @staticmethod
+    async def get_member_ids(
+        db: AsyncSession,
+        project_id: uuid.UUID
+    ) -> List[uuid.UUID]:
+        """IDs of every collaborator of a project, including pending invitees"""
+        result = await db.execute(
+            select(ProjectCollaborator.user_id).where(ProjectCollaborator.project_id == project_id)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_members_of(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        project_ids: Iterable[Optional[uuid.UUID]]
+    ) -> List[uuid.UUID]:
+        """The acting user plus every collaborator of the given projects"""
+        project_ids = {project_id for project_id in project_ids if project_id is not None}
+        members = {user_id}
+        if project_ids:
+            result = await db.execute(
+                select(ProjectCollaborator.user_id).where(ProjectCollaborator.project_id.in_(project_ids))
+            )
+            members.update(result.scalars().all())
+        return list(members)
+    
+    @staticmethod
+    def _change_data(project: Project) -> dict:
+        """Project fields sent on the change feed"""
+        return {
+            "name": project.name,
+            "description": project.description,
+            "color": project.color,
+            "parent_project_id": project.parent_project_id,
+            "is_archived": project.is_archived,
+            "updated_at": project.updated_at,
+        }
+    
+    @staticmethod
+    def _collaborator_change_data(collaborator: ProjectCollaborator) -> dict:
+        """Collaborator fields sent on the change feed"""
+        return {
+            "project_id": collaborator.project_id,
+            "user_id": collaborator.user_id,
+            "role": collaborator.role,
+            "status": collaborator.status,
+        }
+    
     @staticmethod
     async def get_collaborators(
         db: AsyncSession,
@@ -0,0 +1,199 @@
+"""
+Read-through cache for hot read endpoints
+
+Serialized response bodies live in Redis under
+(user_id, resource, hash of the query parameters). Every (user, resource)
+pair has a generation counter; entries are tagged with the generation
+they were loaded under and only served while it is still current. Writes
+bump the counter (invalidate), which drops every cached query of that
+resource for that user in O(1) without scanning keys.
+
+Misses are single-flight: concurrent lookups of the same key on a worker
+share one load (utils.single_flight), and a short Redis lock makes other workers wait briefly
+for it instead of loading too. If Redis is unavailable the loader is
+called directly.
+
+Fills read MongoDB from the primary (utils.mongo_profiles.primary_reads):
+a body loaded from a lagging secondary right after a write would be
+stored under the new generation and served until it expires.
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+import asyncio
+import hashlib
+import logging
+import time
+
+import orjson
+
+from utils.metrics import READ_CACHE_LOAD_DURATION, READ_CACHE_REQUESTS, TIMING_CACHE, record_timing
+from utils.mongo_profiles import primary_reads
+from utils.resources import get_resources
+from utils.responses import dump_json
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+READ_CACHE_PREFIX = "rc"
+READ_CACHE_TTL = 60
+
+# Generation counters outlive every entry tagged with them
+READ_CACHE_GENERATION_TTL = 86400
+
+# Larger bodies are served but not cached
+READ_CACHE_MAX_BYTES = 1024 * 1024
+
+# Cross-worker fill lock
+READ_CACHE_LOCK_TTL_MS = 5000
+READ_CACHE_LOCK_WAIT = 1.0
+READ_CACHE_LOCK_POLL = 0.05
+
+# Resources
+NOTES = "notes"
+PROJECTS = "projects"
+TASKS = "tasks"
+CONVERSATIONS = "conversations"
+
+
+def _default_redis():
+    return get_resources().redis
+
+
+def query_hash(params: Dict[str, Any]) -> str:
+    """Stable digest of query parameters (order-insensitive)"""
+    raw = orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _text(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ReadCache:
+    """Per-user read-through cache with generation-based invalidation"""
+
+    def __init__(self, redis_getter: Callable = _default_redis, ttl: int = READ_CACHE_TTL):
+        self._redis_getter = redis_getter
+        self.ttl = ttl
+        self._flights = SingleFlight()
+
+    @staticmethod
+    def _key(user_id: str, resource: str, digest: str) -> str:
+        return f"{READ_CACHE_PREFIX}:{user_id}:{resource}:{digest}"
+
+    @staticmethod
+    def _generation_key(user_id: str, resource: str) -> str:
+        return f"{READ_CACHE_PREFIX}:{user_id}:{resource}:gen"
+
+    async def _start_generation(self, redis, key: str) -> str:
+        # Start from the clock, so a counter that expired never repeats old values
+        await redis.set(key, time.time_ns() // 1_000_000, nx=True, ex=READ_CACHE_GENERATION_TTL)
+        return _text(await redis.get(key))
+
+    async def fetch(
+        self,
+        user_id: Any,
+        resource: str,
+        params: Dict[str, Any],
+        loader: Callable[[], Awaitable[Any]]
+    ) -> bytes:
+        """Cached JSON body for a query, calling loader on a miss
+
+        loader returns a Pydantic model or JSON-serializable content.
+        """
+        user_id = str(user_id)
+        key = self._key(user_id, resource, query_hash(params))
+        generation_key = self._generation_key(user_id, resource)
+
+        started = time.perf_counter()
+        try:
+            redis = self._redis_getter()
+            generation, cached = await redis.mget(generation_key, key)
+            generation = _text(generation)
+            if generation is None:
+                generation = await self._start_generation(redis, generation_key)
+        except Exception as e:
+            logger.warning(f"Read cache unavailable: {e}")
+            READ_CACHE_REQUESTS.labels(resource, "bypass").inc()
+            return dump_json(await loader())
+        finally:
+            record_timing(TIMING_CACHE, time.perf_counter() - started)
+
+        if cached is not None:
+            tag, _, body = _text(cached).partition(":")
+            if tag == generation:
+                READ_CACHE_REQUESTS.labels(resource, "hit").inc()
+                return body.encode()
+
+        flight = (key, generation)
+        READ_CACHE_REQUESTS.labels(resource, "coalesced" if flight in self._flights else "miss").inc()
+        return await self._flights.do(
+            flight, lambda: self._fill(redis, key, generation, resource, loader), f"read_cache.{resource}"
+        )
+
+    async def _fill(self, redis, key: str, generation: str, resource: str, loader) -> bytes:
+        lock_key = f"{key}:lock"
+        try:
+            locked = bool(await redis.set(lock_key, generation, nx=True, px=READ_CACHE_LOCK_TTL_MS))
+        except Exception as e:
+            logger.warning(f"Read cache lock failed: {e}")
+            locked = None
+
+        # Another worker is filling this key
+        if locked is False:
+            body = await self._wait_for_fill(redis, key, generation)
+            if body is not None:
+                return body
+
+        try:
+            started = time.perf_counter()
+            with primary_reads():
+                body = dump_json(await loader())
+            READ_CACHE_LOAD_DURATION.labels(resource).observe(time.perf_counter() - started)
+
+            try:
+                if len(body) <= READ_CACHE_MAX_BYTES:
+                    await redis.set(key, f"{generation}:{body.decode()}", ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Read cache write failed: {e}")
+            return body
+        finally:
+            # Also after a failed or cancelled load, so others need not wait it out
+            if locked:
+                try:
+                    await redis.delete(lock_key)
+                except Exception as e:
+                    logger.warning(f"Read cache unlock failed: {e}")
+
+    async def _wait_for_fill(self, redis, key: str, generation: str) -> Optional[bytes]:
+        """Body stored by the worker holding the fill lock, if it arrives in time"""
+        deadline = time.monotonic() + READ_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(READ_CACHE_LOCK_POLL)
+            try:
+                cached = await redis.get(key)
+            except Exception:
+                return None
+            if cached is not None:
+                tag, _, body = _text(cached).partition(":")
+                if tag == generation:
+                    return body.encode()
+        return None
+
+    async def invalidate(self, user_ids: Iterable[Any], *resources: str):
+        """Bump the generation of each resource for each user"""
+        keys = {self._generation_key(str(user_id), resource) for user_id in user_ids for resource in resources}
+        if not keys:
+            return
+        now_ms = time.time_ns() // 1_000_000
+        try:
+            pipe = self._redis_getter().pipeline(transaction=False)
+            for key in keys:
+                pipe.set(key, now_ms, nx=True, ex=READ_CACHE_GENERATION_TTL)
+                pipe.incr(key)
+                pipe.expire(key, READ_CACHE_GENERATION_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Read cache invalidation failed: {e}")
+
+
+read_cache = ReadCache()
@@ -0,0 +1,510 @@
+"""
+Bulk task service layer
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, and_, func, cast, values, column, Integer, String, Table
+from sqlalchemy.dialects.postgresql import UUID
+from pydantic import ValidationError
+from typing import Optional, List, Tuple, Dict, Any, Iterator, Sequence
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import uuid
+
+from models.task import Task, TaskLabel, ProjectCollaborator
+from models.schemas.task_bulk import TaskImportRow, TaskImportError, TaskBatchOperation
+from services.project_service import ProjectService
+from services.task_ordering_service import TaskOrderingService
+from services.change_feed import change_feed, task_change_data
+from services.read_cache import PROJECTS, TASKS, read_cache
+from utils.fractional_index import generate_n_keys_between
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows validated per pass, and per multi-row INSERT when COPY is unavailable
+IMPORT_CHUNK_SIZE = 1000
+
+# Hard cap on rows accepted by a single import request
+MAX_IMPORT_ROWS = 100_000
+
+TASK_IMPORT_COLUMNS = [
+    'id', 'user_id', 'project_id', 'title', 'description', 'status', 'priority',
+    'due_date', 'completed_at', 'recurrence_rule', 'parent_task_id', 'position', 'position_key'
+]
+
+
+class TaskBulkService:
+    """Bulk task operations"""
+
+    @staticmethod
+    def parse_rows(body: bytes, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (row_number, raw_row) pairs from a CSV or NDJSON upload"""
+        text = body.decode('utf-8-sig')
+
+        if fmt == 'csv':
+            reader = csv.DictReader(io.StringIO(text))
+            for row_number, row in enumerate(reader, start=1):
+                # Empty cells mean "not provided" so schema defaults apply
+                yield row_number, {k: v for k, v in row.items() if k and v not in ('', None)}
+        else:
+            for row_number, line in enumerate(text.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = e
+                yield row_number, row
+
+    @staticmethod
+    def validate_rows(
+        raw_rows: Iterator[Tuple[int, Any]]
+    ) -> Tuple[List[Tuple[int, TaskImportRow]], List[TaskImportError]]:
+        """Validate raw rows chunk by chunk, collecting per-row errors"""
+        valid: List[Tuple[int, TaskImportRow]] = []
+        errors: List[TaskImportError] = []
+
+        chunk: List[Tuple[int, Any]] = []
+
+        def flush():
+            for row_number, raw in chunk:
+                if isinstance(raw, Exception):
+                    errors.append(TaskImportError(row=row_number, errors=[f"Invalid JSON: {raw}"]))
+                    continue
+                if not isinstance(raw, dict):
+                    errors.append(TaskImportError(row=row_number, errors=["Row must be an object"]))
+                    continue
+                try:
+                    valid.append((row_number, TaskImportRow.model_validate(raw)))
+                except ValidationError as e:
+                    errors.append(TaskImportError(
+                        row=row_number,
+                        ref=raw.get('ref'),
+                        errors=[f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+                    ))
+            chunk.clear()
+
+        for row_number, raw in raw_rows:
+            if len(valid) + len(errors) + len(chunk) >= MAX_IMPORT_ROWS:
+                raise ValueError(f"Import exceeds the maximum of {MAX_IMPORT_ROWS} rows")
+            chunk.append((row_number, raw))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                flush()
+        flush()
+
+        return valid, errors
+
+    @staticmethod
+    def resolve_hierarchy(
+        rows: List[Tuple[int, TaskImportRow]]
+    ) -> Tuple[List[Tuple[int, TaskImportRow, uuid.UUID, Optional[uuid.UUID]]], List[TaskImportError]]:
+        """Assign IDs and resolve parent_ref references inside the batch.
+
+        Returns rows ordered so that every parent precedes its children,
+        as (row_number, row, task_id, parent_task_id) tuples.
+        """
+        errors: List[TaskImportError] = []
+        by_ref: Dict[str, Tuple[int, TaskImportRow]] = {}
+        candidates: List[Tuple[int, TaskImportRow]] = []
+
+        for row_number, row in rows:
+            if row.ref is not None:
+                if row.ref in by_ref:
+                    errors.append(TaskImportError(
+                        row=row_number, ref=row.ref, errors=[f"Duplicate ref '{row.ref}'"]
+                    ))
+                    continue
+                by_ref[row.ref] = (row_number, row)
+            if row.parent_ref is not None and row.parent_task_id is not None:
+                errors.append(TaskImportError(
+                    row=row_number, ref=row.ref,
+                    errors=["Only one of parent_ref and parent_task_id may be set"]
+                ))
+                continue
+            candidates.append((row_number, row))
+
+        ids: Dict[str, uuid.UUID] = {}
+        resolved: List[Tuple[int, TaskImportRow, uuid.UUID, Optional[uuid.UUID]]] = []
+        pending = candidates
+
+        # Each pass places the rows whose parent has already been placed
+        while pending:
+            remaining = []
+            for row_number, row in pending:
+                if row.parent_ref is not None and row.parent_ref not in ids:
+                    remaining.append((row_number, row))
+                    continue
+                task_id = uuid.uuid4()
+                parent_id = ids[row.parent_ref] if row.parent_ref is not None else row.parent_task_id
+                if row.ref is not None:
+                    ids[row.ref] = task_id
+                resolved.append((row_number, row, task_id, parent_id))
+            if len(remaining) == len(pending):
+                break
+            pending = remaining
+        else:
+            pending = []
+
+        stuck_refs = {row.ref for _, row in pending}
+        for row_number, row in pending:
+            reason = (
+                f"Parent ref '{row.parent_ref}' is part of a cycle"
+                if row.parent_ref in stuck_refs
+                else f"Parent ref '{row.parent_ref}' not found or invalid"
+            )
+            errors.append(TaskImportError(row=row_number, ref=row.ref, errors=[reason]))
+
+        return resolved, errors
+
+    @staticmethod
+    async def import_tasks(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        body: bytes,
+        fmt: str,
+        atomic: bool = False
+    ) -> dict:
+        """Validate and bulk-load tasks and labels from a CSV or NDJSON upload"""
+        rows, errors = TaskBulkService.validate_rows(TaskBulkService.parse_rows(body, fmt))
+        resolved, hierarchy_errors = TaskBulkService.resolve_hierarchy(rows)
+        errors.extend(hierarchy_errors)
+
+        # Check referenced existing tasks and projects in one query each
+        parent_ids = {row.parent_task_id for _, row, _, _ in resolved if row.parent_task_id}
+        project_ids = {row.project_id for _, row, _, _ in resolved if row.project_id}
+
+        known_parents = set()
+        if parent_ids:
+            result = await db.execute(
+                select(Task.id).where(and_(Task.id.in_(parent_ids), Task.user_id == user_id))
+            )
+            known_parents = set(result.scalars().all())
+
+        writable_projects = set()
+        if project_ids:
+            result = await db.execute(
+                select(ProjectCollaborator.project_id).where(
+                    and_(
+                        ProjectCollaborator.project_id.in_(project_ids),
+                        ProjectCollaborator.user_id == user_id,
+                        ProjectCollaborator.status == 'accepted',
+                        ProjectCollaborator.role.in_(['owner', 'editor'])
+                    )
+                )
+            )
+            writable_projects = set(result.scalars().all())
+
+        task_records = []
+        label_records = []
+        failed_ids = set()
+        groups: Dict[Tuple[Optional[uuid.UUID], Optional[uuid.UUID]], List[int]] = {}
+        now = datetime.now(timezone.utc)
+
+        for row_number, row, task_id, parent_id in resolved:
+            row_errors = []
+            if row.parent_task_id and row.parent_task_id not in known_parents:
+                row_errors.append(f"Parent task {row.parent_task_id} not found")
+            if row.project_id and row.project_id not in writable_projects:
+                row_errors.append(f"Project {row.project_id} not found or insufficient permissions")
+            if parent_id in failed_ids:
+                row_errors.append(f"Parent ref '{row.parent_ref}' failed to import")
+
+            if row_errors:
+                failed_ids.add(task_id)
+                errors.append(TaskImportError(row=row_number, ref=row.ref, errors=row_errors))
+                continue
+
+            siblings = groups.setdefault((row.project_id, parent_id), [])
+            siblings.append(len(task_records))
+
+            task_records.append([
+                task_id, user_id, row.project_id, row.title, row.description, row.status,
+                row.priority, row.due_date, now if row.status == 'completed' else None,
+                row.recurrence_rule, parent_id
+            ])
+            label_records.extend((task_id, label) for label in dict.fromkeys(row.labels))
+
+        errors.sort(key=lambda e: e.row)
+
+        if atomic and errors:
+            return {
+                "imported": 0,
+                "failed": len(errors),
+                "labels_imported": 0,
+                "errors": errors
+            }
+
+        # Imported tasks are appended after any existing siblings, in file order
+        new_ids = {record[0] for record in task_records}
+        for (project_id, parent_id), indexes in groups.items():
+            last_key, position = None, 0
+            if parent_id not in new_ids:
+                last_key, position = await TaskOrderingService.get_group_end(db, user_id, project_id, parent_id)
+            keys = generate_n_keys_between(last_key, None, len(indexes))
+            for offset, (index, key) in enumerate(zip(indexes, keys)):
+                task_records[index].extend((position + offset, key))
+
+        if task_records:
+            await TaskBulkService._copy_records(db, Task.__table__, TASK_IMPORT_COLUMNS, task_records)
+        if label_records:
+            await TaskBulkService._copy_records(db, TaskLabel.__table__, ['task_id', 'label'], label_records)
+        await db.commit()
+
+        # Too many rows to send as deltas; clients refetch their task lists
+        if task_records:
+            await change_feed.publish([user_id], "task", "imported", None, {"imported": len(task_records)})
+            await read_cache.invalidate([user_id], TASKS)
+            members = await ProjectService.get_members_of(db, user_id, {record[2] for record in task_records})
+            await read_cache.invalidate(members, PROJECTS)
+
+        logger.info(f"Imported {len(task_records)} tasks for user {user_id} ({len(errors)} rows failed)")
+        return {
+            "imported": len(task_records),
+            "failed": len(errors),
+            "labels_imported": len(label_records),
+            "errors": errors
+        }
+
+    @staticmethod
+    async def _copy_records(
+        db: AsyncSession,
+        table: Table,
+        columns: List[str],
+        records: Sequence[tuple]
+    ):
+        """Load records with COPY on asyncpg, falling back to multi-row INSERTs"""
+        connection = await db.connection()
+
+        if connection.dialect.driver == 'asyncpg':
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=columns
+            )
+            return
+
+        for start in range(0, len(records), IMPORT_CHUNK_SIZE):
+            chunk = records[start:start + IMPORT_CHUNK_SIZE]
+            await connection.execute(insert(table), [dict(zip(columns, record)) for record in chunk])
+
+    @staticmethod
+    async def apply_batch(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        operations: List[TaskBatchOperation]
+    ) -> Tuple[List[Task], Dict[uuid.UUID, List[str]]]:
+        """Apply batched task mutations in one transaction.
+
+        Issues a single UPDATE per operation type and returns the final
+        state of every touched task together with its labels.
+        """
+        # Last operation wins when a task appears twice for the same type
+        by_type: Dict[str, Dict[uuid.UUID, TaskBatchOperation]] = {}
+        for operation in operations:
+            by_type.setdefault(operation.op, {})[operation.task_id] = operation
+
+        conflicting = set(by_type.get('complete', {})) & set(by_type.get('uncomplete', {}))
+        if conflicting:
+            raise ValueError(f"Tasks both completed and uncompleted: {', '.join(map(str, conflicting))}")
+
+        touched = {operation.task_id for operation in operations}
+        result = await db.execute(
+            select(Task.id, Task.project_id).where(and_(Task.id.in_(touched), Task.user_id == user_id))
+        )
+        previous_projects = dict(result.all())
+        missing = touched - set(previous_projects)
+        if missing:
+            raise ValueError(f"Tasks not found: {', '.join(map(str, missing))}")
+
+        moves = by_type.get('move', {})
+        if moves:
+            await TaskBulkService._check_moves(db, user_id, moves)
+
+        tasks = Task.__table__
+
+        for op, status_value, completed_at in (
+            ('complete', 'completed', func.now()),
+            ('uncomplete', 'pending', None),
+        ):
+            if op in by_type:
+                await db.execute(
+                    update(tasks)
+                    .where(and_(tasks.c.id.in_(by_type[op]), tasks.c.user_id == user_id))
+                    .values(status=status_value, completed_at=completed_at, updated_at=func.now())
+                )
+
+        if 'reprioritize' in by_type:
+            rows = values(
+                column('id', UUID(as_uuid=True)), column('priority', Integer), name='batch'
+            ).data([(task_id, op.priority) for task_id, op in by_type['reprioritize'].items()])
+            await db.execute(
+                update(tasks)
+                .where(and_(tasks.c.id == rows.c.id, tasks.c.user_id == user_id))
+                .values(priority=rows.c.priority, updated_at=func.now())
+            )
+
+        # Moves first, so a task can be moved and placed in its new group in one batch
+        if moves:
+            await TaskBulkService._apply_moves(db, user_id, moves)
+
+        if 'reorder' in by_type:
+            await TaskBulkService._apply_reorders(db, user_id, by_type['reorder'])
+
+        await db.commit()
+
+        result = await db.execute(
+            select(Task)
+            .where(Task.id.in_(touched))
+            .order_by(Task.parent_task_id, Task.position)
+            .execution_options(populate_existing=True)
+        )
+        updated = list(result.scalars().all())
+
+        labels: Dict[uuid.UUID, List[str]] = {task_id: [] for task_id in touched}
+        result = await db.execute(
+            select(TaskLabel.task_id, TaskLabel.label).where(TaskLabel.task_id.in_(touched))
+        )
+        for task_id, label in result.all():
+            labels[task_id].append(label)
+
+        await change_feed.publish([user_id], "task", "batch_updated", None, {
+            "tasks": [{"id": task.id, **task_change_data(task), "labels": labels[task.id]} for task in updated]
+        })
+        # Status changes and moves change progress of the old and new projects
+        await read_cache.invalidate([user_id], TASKS)
+        members = await ProjectService.get_members_of(
+            db, user_id, {*previous_projects.values(), *(task.project_id for task in updated)}
+        )
+        await read_cache.invalidate(members, PROJECTS)
+
+        logger.info(f"Applied {len(operations)} batched operations to {len(touched)} tasks for user {user_id}")
+        return updated, labels
+
+    @staticmethod
+    async def _apply_moves(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        moves: Dict[uuid.UUID, TaskBatchOperation]
+    ):
+        """Append moved tasks to the end of their new groups, in request order"""
+        targets: Dict[Tuple[Optional[uuid.UUID], Optional[uuid.UUID]], List[uuid.UUID]] = {}
+        for task_id, op in moves.items():
+            targets.setdefault((op.project_id, op.parent_task_id), []).append(task_id)
+
+        records = []
+        for (project_id, parent_id), task_ids in targets.items():
+            last_key, position = await TaskOrderingService.get_group_end(db, user_id, project_id, parent_id)
+            keys = generate_n_keys_between(last_key, None, len(task_ids))
+            records.extend(
+                (task_id, project_id, parent_id, key, position + offset)
+                for offset, (task_id, key) in enumerate(zip(task_ids, keys))
+            )
+
+        tasks = Task.__table__
+        rows = values(
+            column('id', UUID(as_uuid=True)),
+            column('project_id', UUID(as_uuid=True)),
+            column('parent_task_id', UUID(as_uuid=True)),
+            column('position_key', String),
+            column('position', Integer),
+            name='batch'
+        ).data(records)
+        await db.execute(
+            update(tasks)
+            .where(and_(tasks.c.id == rows.c.id, tasks.c.user_id == user_id))
+            .values(
+                # Casts keep all-NULL columns from being inferred as text
+                project_id=cast(rows.c.project_id, UUID(as_uuid=True)),
+                parent_task_id=cast(rows.c.parent_task_id, UUID(as_uuid=True)),
+                position_key=rows.c.position_key,
+                position=rows.c.position,
+                updated_at=func.now()
+            )
+        )
+
+    @staticmethod
+    async def _apply_reorders(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        reorders: Dict[uuid.UUID, TaskBatchOperation]
+    ):
+        """Place tasks at their requested index within their sibling group"""
+        result = await db.execute(
+            select(Task.id, Task.project_id, Task.parent_task_id).where(Task.id.in_(reorders))
+        )
+        groups: Dict[Tuple[Optional[uuid.UUID], Optional[uuid.UUID]], Dict[uuid.UUID, int]] = {}
+        for task_id, project_id, parent_id in result.all():
+            groups.setdefault((project_id, parent_id), {})[task_id] = reorders[task_id].position
+
+        records = []
+        for (project_id, parent_id), targets in groups.items():
+            # Same order as rebalance_group, so keyless groups keep their order
+            result = await db.execute(
+                select(Task.id, Task.position_key, Task.position)
+                .where(TaskOrderingService._sibling_filter(user_id, project_id, parent_id))
+                .order_by(
+                    Task.position_key.asc().nulls_last(),
+                    Task.position.asc(),
+                    Task.created_at.asc(),
+                    Task.id.asc()
+                )
+            )
+            records.extend(TaskOrderingService.plan_reorder(result.all(), targets))
+
+        if not records:
+            return
+
+        tasks = Task.__table__
+        rows = values(
+            column('id', UUID(as_uuid=True)),
+            column('position_key', String),
+            column('position', Integer),
+            name='batch'
+        ).data(records)
+        await db.execute(
+            update(tasks)
+            .where(and_(tasks.c.id == rows.c.id, tasks.c.user_id == user_id))
+            .values(position_key=rows.c.position_key, position=rows.c.position, updated_at=func.now())
+        )
+
+    @staticmethod
+    async def _check_moves(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        moves: Dict[uuid.UUID, TaskBatchOperation]
+    ):
+        """Validate move targets and reject moves that would create parent cycles"""
+        project_ids = {op.project_id for op in moves.values() if op.project_id}
+        if project_ids:
+            result = await db.execute(
+                select(ProjectCollaborator.project_id).where(
+                    and_(
+                        ProjectCollaborator.project_id.in_(project_ids),
+                        ProjectCollaborator.user_id == user_id,
+                        ProjectCollaborator.status == 'accepted',
+                        ProjectCollaborator.role.in_(['owner', 'editor'])
+                    )
+                )
+            )
+            denied = project_ids - set(result.scalars().all())
+            if denied:
+                raise ValueError(f"Projects not found or insufficient permissions: {', '.join(map(str, denied))}")
+
+        parent_ids = {op.parent_task_id for op in moves.values() if op.parent_task_id}
+        if not parent_ids:
+            return
+
+        # Current ancestor chains of the new parents
+        parent_of = await TaskOrderingService.get_ancestors(db, user_id, parent_ids)
+
+        missing = parent_ids - set(parent_of)
+        if missing:
+            raise ValueError(f"Parent tasks not found: {', '.join(map(str, missing))}")
+
+        parent_of.update({task_id: op.parent_task_id for task_id, op in moves.items()})
+        for task_id in moves:
+            if TaskOrderingService.creates_cycle(parent_of, task_id):
+                raise ValueError(f"Moving task {task_id} would create a cycle")
@@ -0,0 +1,334 @@
+"""
+Task ordering service layer
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, func, values, column, String, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional, Tuple, List, Dict, Sequence, Set
+from datetime import datetime
+import uuid
+
+from models.task import Task
+from utils.fractional_index import generate_key_between, generate_n_keys_between
+from utils.resources import get_resources
+from services.change_feed import change_feed, task_change_data
+from services.project_service import ProjectService
+from services.read_cache import PROJECTS, TASKS, read_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sibling groups are rebalanced in the background once a key grows past this
+REBALANCE_KEY_LENGTH = 32
+
+
+class TaskOrderingService:
+    """Fractional-index ordering of sibling tasks"""
+
+    @staticmethod
+    def _sibling_filter(
+        user_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        parent_task_id: Optional[uuid.UUID]
+    ):
+        """Filter for tasks sharing one ordering group (matches idx_task_position_key)"""
+        return and_(
+            Task.user_id == user_id,
+            Task.project_id == project_id,
+            Task.parent_task_id == parent_task_id
+        )
+
+    @staticmethod
+    async def get_group_end(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        parent_task_id: Optional[uuid.UUID]
+    ) -> Tuple[Optional[str], int]:
+        """Largest position key in a sibling group and the next free integer position"""
+        result = await db.execute(
+            select(func.max(Task.position_key), func.max(Task.position))
+            .where(TaskOrderingService._sibling_filter(user_id, project_id, parent_task_id))
+        )
+        last_key, last_position = result.one()
+        return last_key, 0 if last_position is None else last_position + 1
+
+    @staticmethod
+    async def get_ancestors(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        task_ids: Set[uuid.UUID]
+    ) -> Dict[uuid.UUID, Optional[uuid.UUID]]:
+        """Parent of each task and of all its ancestors, in one recursive query"""
+        ancestors = (
+            select(Task.id, Task.parent_task_id)
+            .where(and_(Task.id.in_(task_ids), Task.user_id == user_id))
+            .cte('ancestors', recursive=True)
+        )
+        ancestors = ancestors.union(
+            select(Task.id, Task.parent_task_id)
+            .join(ancestors, Task.id == ancestors.c.parent_task_id)
+        )
+        result = await db.execute(select(ancestors.c.id, ancestors.c.parent_task_id))
+        return dict(result.all())
+
+    @staticmethod
+    def creates_cycle(parent_of: Dict[uuid.UUID, Optional[uuid.UUID]], task_id: uuid.UUID) -> bool:
+        """Whether task_id is its own ancestor in parent_of"""
+        seen = set()
+        current = parent_of.get(task_id)
+        while current is not None and current not in seen:
+            if current == task_id:
+                return True
+            seen.add(current)
+            current = parent_of.get(current)
+        return False
+
+    @staticmethod
+    def plan_reorder(
+        siblings: Sequence[Tuple[uuid.UUID, Optional[str], Optional[int]]],
+        targets: Dict[uuid.UUID, int]
+    ) -> List[Tuple[uuid.UUID, str, int]]:
+        """Place tasks at target indexes in a sibling group.
+
+        siblings are (id, position_key, position) in their current order.
+        Tasks that are not moved keep their keys; the group's integer
+        positions are renumbered to match. Returns the (id, key, position)
+        rows that changed.
+        """
+        order = [task_id for task_id, _, _ in siblings if task_id not in targets]
+        for task_id, index in sorted(targets.items(), key=lambda item: item[1]):
+            order.insert(min(index, len(order)), task_id)
+
+        keys = {task_id: key for task_id, key, _ in siblings}
+        try:
+            if any(keys[task_id] is None for task_id in order):
+                raise ValueError("Sibling group has tasks without keys")
+            new_keys = dict(keys)
+            run: List[uuid.UUID] = []
+            previous = None
+            for task_id in order + [None]:
+                if task_id in targets:
+                    run.append(task_id)
+                    continue
+                following = keys[task_id] if task_id is not None else None
+                new_keys.update(zip(run, generate_n_keys_between(previous, following, len(run))))
+                run = []
+                previous = following
+        except ValueError:
+            # Keyless or duplicate keys: key the whole group in its new order
+            new_keys = dict(zip(order, generate_n_keys_between(None, None, len(order))))
+
+        positions = {task_id: position for task_id, _, position in siblings}
+        return [
+            (task_id, new_keys[task_id], index)
+            for index, task_id in enumerate(order)
+            if new_keys[task_id] != keys[task_id] or positions[task_id] != index
+        ]
+
+    @staticmethod
+    async def move_task(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        task_id: uuid.UUID,
+        after_task_id: Optional[uuid.UUID] = None,
+        before_task_id: Optional[uuid.UUID] = None
+    ) -> Tuple[Optional[Task], bool]:
+        """Place a task between two siblings by giving it a key between theirs.
+
+        The neighbors define the target group, so a task can be moved to
+        another project or parent in the same call. With no neighbors the
+        task is moved to the end of its current group. Returns the task and
+        whether its group should be rebalanced.
+        """
+        result = await db.execute(
+            select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))
+        )
+        task = result.scalar_one_or_none()
+        if not task:
+            return None, False
+
+        neighbor_ids = [i for i in (after_task_id, before_task_id) if i is not None]
+        if task_id in neighbor_ids:
+            raise ValueError("A task cannot be placed next to itself")
+
+        neighbors = {}
+        if neighbor_ids:
+            result = await db.execute(
+                select(Task).where(and_(Task.id.in_(neighbor_ids), Task.user_id == user_id))
+            )
+            neighbors = {n.id: n for n in result.scalars().all()}
+            missing = set(neighbor_ids) - set(neighbors)
+            if missing:
+                raise ValueError(f"Tasks not found: {', '.join(map(str, missing))}")
+
+            groups = {(n.project_id, n.parent_task_id) for n in neighbors.values()}
+            if len(groups) > 1:
+                raise ValueError("Neighbor tasks must share the same project and parent")
+            project_id, parent_task_id = groups.pop()
+
+            if parent_task_id is not None and parent_task_id != task.parent_task_id:
+                parent_of = await TaskOrderingService.get_ancestors(db, user_id, {parent_task_id})
+                parent_of[task_id] = parent_task_id
+                if TaskOrderingService.creates_cycle(parent_of, task_id):
+                    raise ValueError(f"Moving task {task_id} would create a cycle")
+        else:
+            project_id, parent_task_id = task.project_id, task.parent_task_id
+
+        # Legacy rows without keys get keys assigned once for the whole group
+        await TaskOrderingService.ensure_keys(db, user_id, project_id, parent_task_id)
+        for neighbor in neighbors.values():
+            await db.refresh(neighbor, ['position_key', 'position'])
+
+        siblings = and_(
+            TaskOrderingService._sibling_filter(user_id, project_id, parent_task_id),
+            Task.id != task_id
+        )
+        after = before = None
+        if after_task_id:
+            after = (neighbors[after_task_id].position_key, neighbors[after_task_id].position)
+        if before_task_id:
+            before = (neighbors[before_task_id].position_key, neighbors[before_task_id].position)
+
+        if after is not None and before is not None:
+            if after[0] >= before[0]:
+                raise ValueError("after_task_id must be ordered before before_task_id")
+        elif after is not None:
+            # Next sibling after the anchor, so the task lands directly behind it
+            result = await db.execute(
+                select(Task.position_key, Task.position)
+                .where(and_(siblings, Task.position_key > after[0]))
+                .order_by(Task.position_key.asc())
+                .limit(1)
+            )
+            before = result.first()
+        elif before is not None:
+            result = await db.execute(
+                select(Task.position_key, Task.position)
+                .where(and_(siblings, Task.position_key < before[0]))
+                .order_by(Task.position_key.desc())
+                .limit(1)
+            )
+            after = result.first()
+        else:
+            result = await db.execute(
+                select(Task.position_key, Task.position)
+                .where(and_(siblings, Task.position_key.is_not(None)))
+                .order_by(Task.position_key.desc())
+                .limit(1)
+            )
+            after = result.first()
+
+        # Concurrent movers can produce equal neighbor keys; fall back to a rebalance
+        if after is not None and before is not None and after[0] >= before[0]:
+            await TaskOrderingService.rebalance_group(db, user_id, project_id, parent_task_id)
+            return await TaskOrderingService.move_task(db, user_id, task_id, after_task_id, before_task_id)
+
+        key = generate_key_between(
+            after[0] if after is not None else None,
+            before[0] if before is not None else None
+        )
+
+        # position_key is the order; the integer position is only a hint taken
+        # from the neighbors, so a move writes the moved row alone
+        if after is not None and after[1] is not None:
+            position = after[1] + 1
+        elif before is not None and before[1] is not None:
+            position = max(0, before[1] - 1)
+        else:
+            position = 0
+
+        previous_project_id = task.project_id
+        task.position_key = key
+        task.position = position
+        task.project_id = project_id
+        task.parent_task_id = parent_task_id
+        task.updated_at = datetime.utcnow()
+
+        await db.commit()
+        await db.refresh(task)
+
+        await change_feed.publish([user_id], "task", "updated", task.id, task_change_data(task))
+        await read_cache.invalidate([user_id], TASKS)
+        if project_id != previous_project_id:
+            # Progress of both projects changed, for every member
+            members = await ProjectService.get_members_of(db, user_id, (previous_project_id, project_id))
+            await read_cache.invalidate(members, PROJECTS)
+
+        return task, len(key) > REBALANCE_KEY_LENGTH
+
+    @staticmethod
+    async def ensure_keys(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        parent_task_id: Optional[uuid.UUID]
+    ):
+        """Assign keys to a sibling group if any task is still missing one"""
+        result = await db.execute(
+            select(Task.id)
+            .where(
+                and_(
+                    TaskOrderingService._sibling_filter(user_id, project_id, parent_task_id),
+                    Task.position_key.is_(None)
+                )
+            )
+            .limit(1)
+        )
+        if result.scalar_one_or_none() is not None:
+            await TaskOrderingService.rebalance_group(db, user_id, project_id, parent_task_id)
+
+    @staticmethod
+    async def rebalance_group(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        parent_task_id: Optional[uuid.UUID]
+    ) -> int:
+        """Rewrite a sibling group with short, evenly spaced keys in its current order"""
+        result = await db.execute(
+            select(Task.id)
+            .where(TaskOrderingService._sibling_filter(user_id, project_id, parent_task_id))
+            .order_by(
+                Task.position_key.asc().nulls_last(),
+                Task.position.asc(),
+                Task.created_at.asc(),
+                Task.id.asc()
+            )
+            .with_for_update()
+        )
+        task_ids = list(result.scalars().all())
+        if not task_ids:
+            return 0
+
+        keys = generate_n_keys_between(None, None, len(task_ids))
+        rows = values(
+            column('id', UUID(as_uuid=True)),
+            column('position_key', String),
+            column('position', Integer),
+            name='ordering'
+        ).data([(task_id, key, i) for i, (task_id, key) in enumerate(zip(task_ids, keys))])
+
+        tasks = Task.__table__
+        await db.execute(
+            update(tasks)
+            .where(tasks.c.id == rows.c.id)
+            .values(position_key=rows.c.position_key, position=rows.c.position)
+        )
+        await db.commit()
+
+        logger.info(f"Rebalanced {len(task_ids)} task keys for user {user_id}")
+        return len(task_ids)
+
+    @staticmethod
+    async def rebalance_in_background(
+        user_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        parent_task_id: Optional[uuid.UUID]
+    ):
+        """Rebalance a group outside the request that triggered it"""
+        try:
+            async with get_resources().session() as session:
+                await TaskOrderingService.rebalance_group(session, user_id, project_id, parent_task_id)
+        except Exception as e:
+            logger.error(f"Error rebalancing task keys for user {user_id}: {e}")
@@ -0,0 +1,63 @@
+"""
+Base class for background jobs: retries, idempotency and dead letters
+"""
+from typing import Any, Awaitable, Callable, Optional
+import logging
+
+from celery import Task
+
+from services.job_queue import JOB_CLAIMED, JOB_DONE, JOB_RUNNING_TTL, RetryableJobError, job_queue
+from tasks.celery_app import run_async
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying; anything else is dead-lettered on the first attempt
+RETRYABLE_ERRORS = (RetryableJobError, ConnectionError, TimeoutError, OSError)
+
+
+class JobTask(Task):
+    """Celery task retried with exponential backoff, then dead-lettered"""
+
+    abstract = True
+    autoretry_for = RETRYABLE_ERRORS
+    max_retries = 5
+    retry_backoff = 5
+    retry_backoff_max = 600
+    retry_jitter = True
+
+    def run_job(self, idempotency_key: Optional[str], job: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an async job body once per idempotency key"""
+        return run_async(self._run_job(idempotency_key, job))
+
+    async def _run_job(self, idempotency_key: Optional[str], job: Callable[[], Awaitable[Any]]) -> Any:
+        if idempotency_key:
+            state = await job_queue.claim(idempotency_key)
+            if state == JOB_DONE:
+                logger.info(f"Skipping {self.name}: {idempotency_key} already done")
+                return None
+            if state != JOB_CLAIMED:
+                # Another delivery holds the lease (or crashed holding it); try again once it lapses
+                raise self.retry(
+                    exc=RetryableJobError(f"{idempotency_key} is running on another worker"),
+                    countdown=JOB_RUNNING_TTL
+                )
+
+        try:
+            result = await job()
+        except Exception:
+            if idempotency_key:
+                await job_queue.release(idempotency_key)
+            raise
+
+        if idempotency_key:
+            await job_queue.complete(idempotency_key)
+        return result
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Called once retries are exhausted or the error is not retryable"""
+        try:
+            run_async(job_queue.dead_letter(self.name, task_id, args, kwargs, exc, self.request.retries))
+            if kwargs.get("idempotency_key"):
+                run_async(job_queue.forget(kwargs["idempotency_key"]))
+        except Exception as e:
+            logger.error(f"Failed to dead-letter {self.name} ({task_id}): {e}")
@@ -0,0 +1,79 @@
+"""
+Celery application
+
+Run a worker from backend/:
+    celery -A tasks.celery_app worker -Q default,enrichment,indexing --concurrency 4
+Monitor with:
+    celery -A tasks.celery_app flower
+
+Jobs are thin wrappers around async service methods. Each worker process
+keeps one event loop and one AppResources container, so pooled clients
+are reused across jobs rather than reconnected per job.
+"""
+from typing import Awaitable, Optional, TypeVar
+import asyncio
+import logging
+
+from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+celery_app = Celery(
+    "vectal",
+    broker=settings.REDIS_URL,
+    include=["tasks.chat_tasks", "tasks.note_tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    # Redelivered if a worker dies mid-job; idempotency keys make that safe
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    broker_transport_options={"visibility_timeout": 3600},
+    task_default_queue="default",
+    task_routes={
+        "chat.*": {"queue": "enrichment"},
+        "notes.*": {"queue": "indexing"},
+    },
+)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine on this worker process's event loop"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    from utils.resources import AppResources, set_resources
+
+    # Forked children must not reuse the parent's sockets
+    set_resources(AppResources())
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    from utils.resources import get_resources, set_resources
+
+    try:
+        run_async(get_resources().shutdown())
+    except Exception as e:
+        logger.warning(f"Worker resource shutdown failed: {e}")
+    finally:
+        set_resources(None)
+        if _loop is not None:
+            _loop.close()
@@ -0,0 +1,15 @@
+"""
+Chat background jobs
+"""
+from typing import Optional
+
+from tasks.base import JobTask
+from tasks.celery_app import celery_app
+
+
+@celery_app.task(base=JobTask, bind=True, name="chat.enrich_turn")
+def enrich_chat_turn(self, conversation_id: str, user_id: str, message_id: str, idempotency_key: Optional[str] = None):
+    """Task extraction and titling after an assistant reply"""
+    from services.chat_service import ChatService
+
+    return self.run_job(idempotency_key, lambda: ChatService.enrich_turn(conversation_id, user_id, message_id))
@@ -0,0 +1,23 @@
+"""
+Note background jobs
+"""
+from typing import Optional
+
+from tasks.base import JobTask
+from tasks.celery_app import celery_app
+
+
+@celery_app.task(base=JobTask, bind=True, name="notes.reindex")
+def reindex_note(self, note_id: str, user_id: str, idempotency_key: Optional[str] = None):
+    """Re-embed a note into the vector index (or drop it once deleted)"""
+    from services.note_service import NoteService
+
+    return self.run_job(idempotency_key, lambda: NoteService.reindex_note(note_id, user_id))
+
+
+@celery_app.task(base=JobTask, bind=True, name="notes.compact_versions")
+def compact_note_versions(self, note_id: str, user_id: str, idempotency_key: Optional[str] = None):
+    """Thin out a note's old versions"""
+    from services.note_service import NoteService
+
+    return self.run_job(idempotency_key, lambda: NoteService.compact_versions(note_id, user_id))
@@ -215,3 +215,19 @@ class TestInactiveUser:
         
         assert response.status_code == 401
         assert "disabled" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+class TestPrincipalCache:
+    """Test authenticated users are served from the principal cache"""
+    
+    async def test_repeat_request_skips_user_lookup(self, client: AsyncClient, test_user: User, auth_headers: dict, query_budget):
+        """Test a second request with the same token does not load the user again"""
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        
+        with query_budget(sql=0):
+            response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["id"] == str(test_user.id)
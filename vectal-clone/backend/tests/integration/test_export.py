@@ -0,0 +1,110 @@
+"""
+Integration tests for data export
+"""
+import pytest
+import json
+import uuid
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+from models.task import Task, TaskLabel
+
+
+@pytest.mark.asyncio
+class TestExport:
+    """Test streaming export endpoint"""
+    
+    async def test_export_ndjson(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test NDJSON export contains the user's tasks and labels"""
+        task = Task(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            title="Exported Task",
+            status="pending"
+        )
+        db_session.add(task)
+        await db_session.flush()
+        db_session.add(TaskLabel(task_id=task.id, label="work"))
+        await db_session.commit()
+        
+        response = await client.get(
+            "/api/v1/export?format=ndjson",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        records = [json.loads(line) for line in response.text.splitlines() if line]
+        tasks = [r["data"] for r in records if r["type"] == "task"]
+        labels = [r["data"] for r in records if r["type"] == "task_label"]
+        
+        assert len(tasks) == 1
+        assert tasks[0]["title"] == "Exported Task"
+        assert labels[0]["label"] == "work"
+    
+    async def test_export_json(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test JSON export is a single document grouped by record type"""
+        for i in range(3):
+            db_session.add(Task(
+                id=uuid.uuid4(),
+                user_id=test_user.id,
+                title=f"Task {i}",
+                status="pending"
+            ))
+        await db_session.commit()
+        
+        response = await client.get(
+            "/api/v1/export?format=json",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["tasks"]) == 3
+    
+    async def test_export_gzip(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test export is gzip-encoded when the client accepts it"""
+        response = await client.get(
+            "/api/v1/export",
+            headers={**auth_headers, "Accept-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+    
+    async def test_export_invalid_format(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test unsupported export format"""
+        response = await client.get(
+            "/api/v1/export?format=xml",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 422
+    
+    async def test_export_without_auth(self, client: AsyncClient):
+        """Test export requires authentication"""
+        response = await client.get("/api/v1/export")
+        
+        assert response.status_code == 403
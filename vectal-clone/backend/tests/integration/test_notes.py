@@ -4,15 +4,15 @@ Integration tests for notes management
 import pytest
 from httpx import AsyncClient
 from models.user import User
-from db.mongodb import get_collection, Collections
+from services.note_service import NoteService, NOTE_VERSIONS_KEEP_RECENT
 
 
 @pytest.fixture
-async def cleanup_notes():
-    """Cleanup notes collection after tests"""
+async def cleanup_notes(mongo_db):
+    """Empty notes collection (mongo_db is reset after each test)"""
+    # Indexes (including the text index) are normally created at startup
+    await NoteService.ensure_indexes()
     yield
-    collection = get_collection(Collections.NOTES)
-    await collection.delete_many({})
 
 
 @pytest.mark.asyncio
@@ -381,6 +381,7 @@ class TestNoteDeletion:
 
 
 @pytest.mark.asyncio
+@pytest.mark.mongodb
 class TestNoteSearch:
     """Test note search functionality"""
     
@@ -499,3 +500,119 @@ class TestMarkdownRendering:
         assert "html" in data
         assert "<h1>" in data["html"]
         assert "<strong>" in data["html"] or "<b>" in data["html"]
+
+
+@pytest.mark.asyncio
+class TestConditionalGet:
+    """Test ETags and 304 responses"""
+    
+    async def test_note_not_modified(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        cleanup_notes
+    ):
+        """Test a matching If-None-Match gets 304 until the note changes"""
+        create_response = await client.post(
+            "/api/v1/notes",
+            json={"title": "ETag Test", "content": "Original content"},
+            headers=auth_headers
+        )
+        note_id = create_response.json()["id"]
+        
+        first = await client.get(f"/api/v1/notes/{note_id}", headers=auth_headers)
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+        
+        cached = await client.get(
+            f"/api/v1/notes/{note_id}",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        
+        await client.patch(
+            f"/api/v1/notes/{note_id}",
+            json={"content": "Updated content"},
+            headers=auth_headers
+        )
+        changed = await client.get(
+            f"/api/v1/notes/{note_id}",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+    
+    async def test_note_version_immutable(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        cleanup_notes
+    ):
+        """Test archived versions are served as immutable"""
+        create_response = await client.post(
+            "/api/v1/notes",
+            json={"title": "Version Cache", "content": "Original content"},
+            headers=auth_headers
+        )
+        note_id = create_response.json()["id"]
+        await client.patch(
+            f"/api/v1/notes/{note_id}",
+            json={"content": "Updated content"},
+            headers=auth_headers
+        )
+        
+        response = await client.get(f"/api/v1/notes/{note_id}/versions/1", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["content"] == "Original content"
+        assert "immutable" in response.headers["cache-control"]
+        
+        cached = await client.get(
+            f"/api/v1/notes/{note_id}/versions/1",
+            headers={**auth_headers, "If-None-Match": response.headers["etag"]}
+        )
+        assert cached.status_code == 304
+        
+        current = await client.get(f"/api/v1/notes/{note_id}/versions/2", headers=auth_headers)
+        assert current.status_code == 404
+    
+    async def test_compaction_changes_history_etags(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        cleanup_notes
+    ):
+        """Test compacted history is refetched and removed versions are not answered with 304"""
+        create_response = await client.post(
+            "/api/v1/notes",
+            json={"title": "Compacted", "content": "Edit 0"},
+            headers=auth_headers
+        )
+        note_id = create_response.json()["id"]
+        for i in range(1, NOTE_VERSIONS_KEEP_RECENT + 3):
+            await client.patch(
+                f"/api/v1/notes/{note_id}",
+                json={"content": f"Edit {i}"},
+                headers=auth_headers
+            )
+        
+        history = await client.get(f"/api/v1/notes/{note_id}/versions", headers=auth_headers)
+        first = await client.get(f"/api/v1/notes/{note_id}/versions/1", headers=auth_headers)
+        assert first.status_code == 200
+        
+        # Same day: version 1 is not the last of its day, so it is removed
+        assert await NoteService.compact_versions(note_id, str(test_user.id)) == 1
+        
+        removed = await client.get(
+            f"/api/v1/notes/{note_id}/versions/1",
+            headers={**auth_headers, "If-None-Match": first.headers["etag"]}
+        )
+        assert removed.status_code == 404
+        
+        refreshed = await client.get(
+            f"/api/v1/notes/{note_id}/versions",
+            headers={**auth_headers, "If-None-Match": history.headers["etag"]}
+        )
+        assert refreshed.status_code == 200
+        assert len(refreshed.json()) == len(history.json()) - 1
@@ -8,6 +8,7 @@ from sqlalchemy import select
 
 from models.user import User
 from models.task import Project, ProjectCollaborator
+from services.read_cache import PROJECTS, read_cache
 
 
 @pytest.mark.asyncio
@@ -152,6 +153,77 @@ class TestProjectRetrieval:
         assert data["total"] >= 3
         assert len(data["items"]) >= 3
     
+    async def test_get_projects_query_budget(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        query_budget
+    ):
+        """Test listing projects runs a fixed number of queries however many there are"""
+        import uuid
+        
+        for i in range(10):
+            project = Project(id=uuid.uuid4(), user_id=test_user.id, name=f"Project {i}")
+            db_session.add(project)
+            await db_session.flush()
+            db_session.add(ProjectCollaborator(
+                project_id=project.id,
+                user_id=test_user.id,
+                role='owner',
+                status='accepted'
+            ))
+        await db_session.commit()
+        
+        # Warm the principal cache so only the listing itself is counted, then
+        # drop the cached page so the listing queries are measured too
+        await client.get("/api/v1/projects", headers=auth_headers)
+        await read_cache.invalidate([test_user.id], PROJECTS)
+        
+        with query_budget(sql=3):
+            response = await client.get("/api/v1/projects", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 10
+    
+    async def test_get_projects_progress_is_fresh(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test a cached project list still reports current task counts"""
+        import uuid
+        from models.task import Task
+        
+        project = Project(id=uuid.uuid4(), user_id=test_user.id, name="Listed Project")
+        db_session.add(project)
+        await db_session.flush()
+        db_session.add(ProjectCollaborator(
+            project_id=project.id,
+            user_id=test_user.id,
+            role='owner',
+            status='accepted'
+        ))
+        await db_session.commit()
+        
+        first = await client.get("/api/v1/projects", headers=auth_headers)
+        assert first.json()["items"][0]["task_count"] == 0
+        
+        # Written without invalidating the read cache, like single-task edits
+        db_session.add(Task(
+            id=uuid.uuid4(), user_id=test_user.id, project_id=project.id, title="Done", status="completed"
+        ))
+        await db_session.commit()
+        
+        second = await client.get("/api/v1/projects", headers=auth_headers)
+        item = second.json()["items"][0]
+        assert item["task_count"] == 1
+        assert item["completed_task_count"] == 1
+        assert item["progress_percentage"] == 100.0
+    
     async def test_get_project_by_id(
         self,
         client: AsyncClient,
@@ -189,6 +261,47 @@ class TestProjectRetrieval:
         assert data["id"] == str(project.id)
         assert data["name"] == "Specific Project"
     
+    async def test_get_project_not_modified(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test If-None-Match gets 304 until the project's tasks change"""
+        import uuid
+        from models.task import Task
+        
+        project = Project(id=uuid.uuid4(), user_id=test_user.id, name="Cached Project")
+        db_session.add(project)
+        await db_session.flush()
+        db_session.add(ProjectCollaborator(
+            project_id=project.id,
+            user_id=test_user.id,
+            role='owner',
+            status='accepted'
+        ))
+        await db_session.commit()
+        
+        first = await client.get(f"/api/v1/projects/{project.id}", headers=auth_headers)
+        etag = first.headers["etag"]
+        
+        cached = await client.get(
+            f"/api/v1/projects/{project.id}",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        
+        db_session.add(Task(id=uuid.uuid4(), user_id=test_user.id, project_id=project.id, title="New task"))
+        await db_session.commit()
+        
+        changed = await client.get(
+            f"/api/v1/projects/{project.id}",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.json()["task_count"] == 1
+    
     async def test_get_nonexistent_project(
         self,
         client: AsyncClient,
@@ -0,0 +1,336 @@
+"""
+Integration tests for bulk task operations
+"""
+import pytest
+import json
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from models.user import User
+from models.task import Project, ProjectCollaborator, Task, TaskLabel
+
+
+@pytest.mark.asyncio
+class TestTaskImport:
+    """Test bulk task import endpoint"""
+    
+    async def test_import_csv(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test importing tasks with subtasks and labels from CSV"""
+        body = (
+            "ref,title,parent_ref,labels,priority\n"
+            "p,Parent,,work;home,2\n"
+            "c,Child,p,,\n"
+        )
+        
+        response = await client.post(
+            "/api/v1/tasks/import",
+            content=body,
+            headers={**auth_headers, "Content-Type": "text/csv"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["failed"] == 0
+        assert data["labels_imported"] == 2
+        
+        result = await db_session.execute(select(Task).where(Task.user_id == test_user.id))
+        tasks = {t.title: t for t in result.scalars().all()}
+        assert tasks["Child"].parent_task_id == tasks["Parent"].id
+        
+        result = await db_session.execute(select(TaskLabel).where(TaskLabel.task_id == tasks["Parent"].id))
+        assert {l.label for l in result.scalars().all()} == {"work", "home"}
+    
+    async def test_import_ndjson_reports_row_errors(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test invalid rows are reported and valid rows still imported"""
+        body = "\n".join([
+            json.dumps({"title": "Good"}),
+            json.dumps({"title": "Bad", "priority": 10}),
+        ])
+        
+        response = await client.post(
+            "/api/v1/tasks/import?format=ndjson",
+            content=body,
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["failed"] == 1
+        assert data["errors"][0]["row"] == 2
+    
+    async def test_import_atomic(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test atomic import inserts nothing when any row fails"""
+        body = "\n".join([
+            json.dumps({"title": "Good"}),
+            json.dumps({"title": ""}),
+        ])
+        
+        response = await client.post(
+            "/api/v1/tasks/import?format=ndjson&atomic=true",
+            content=body,
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["imported"] == 0
+        
+        result = await db_session.execute(select(Task).where(Task.user_id == test_user.id))
+        assert result.scalars().all() == []
+    
+    async def test_import_without_auth(self, client: AsyncClient):
+        """Test import requires authentication"""
+        response = await client.post("/api/v1/tasks/import", content="{}")
+        
+        assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+class TestTaskBatch:
+    """Test batched task mutations"""
+    
+    async def _create_tasks(self, db_session: AsyncSession, user: User, count: int):
+        import uuid
+        tasks = [
+            Task(id=uuid.uuid4(), user_id=user.id, title=f"Task {i}", status="pending", position=i)
+            for i in range(count)
+        ]
+        db_session.add_all(tasks)
+        await db_session.commit()
+        return tasks
+    
+    async def test_batch_mixed_operations(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test completing, reprioritizing and reordering in one request"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "complete", "task_id": str(tasks[0].id)},
+                {"op": "reprioritize", "task_id": str(tasks[1].id), "priority": 4},
+                {"op": "reorder", "task_id": str(tasks[2].id), "position": 0},
+                {"op": "reorder", "task_id": str(tasks[0].id), "position": 2},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        
+        items = {item["id"]: item for item in data["items"]}
+        assert items[str(tasks[0].id)]["status"] == "completed"
+        assert items[str(tasks[0].id)]["completed_at"] is not None
+        assert items[str(tasks[0].id)]["position"] == 2
+        assert items[str(tasks[1].id)]["priority"] == 4
+        assert items[str(tasks[2].id)]["position"] == 0
+    
+    async def test_batch_move(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test moving tasks under a new parent"""
+        parent, child = await self._create_tasks(db_session, test_user, 2)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "move", "task_id": str(child.id), "parent_task_id": str(parent.id)},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["items"][0]["parent_task_id"] == str(parent.id)
+    
+    async def test_batch_reorder_updates_key_order(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test batch reorders move tasks in key order, not only their positions"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "reorder", "task_id": str(tasks[2].id), "position": 0},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(Task.title, Task.position)
+            .where(Task.user_id == test_user.id)
+            .order_by(Task.position_key)
+            .execution_options(populate_existing=True)
+        )
+        assert result.all() == [("Task 2", 0), ("Task 0", 1), ("Task 1", 2)]
+    
+    async def test_batch_move_appends_to_group(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test moved tasks get keys after their new siblings"""
+        parent, first, second, moved = await self._create_tasks(db_session, test_user, 4)
+        for position, task in enumerate((first, second)):
+            task.parent_task_id = parent.id
+            task.position_key = f"a{position}"
+            task.position = position
+        await db_session.commit()
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "move", "task_id": str(moved.id), "parent_task_id": str(parent.id)},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(Task.title, Task.position)
+            .where(Task.parent_task_id == parent.id)
+            .order_by(Task.position_key)
+            .execution_options(populate_existing=True)
+        )
+        assert result.all() == [("Task 1", 0), ("Task 2", 1), ("Task 3", 2)]
+    
+    async def test_batch_invalidates_project_members(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        test_user_unverified: User,
+        auth_headers: dict,
+        db_session: AsyncSession,
+        monkeypatch
+    ):
+        """Test cached project progress is invalidated for every collaborator"""
+        import uuid
+        from services.read_cache import PROJECTS, read_cache
+        
+        project = Project(id=uuid.uuid4(), user_id=test_user.id, name="Shared")
+        db_session.add(project)
+        await db_session.flush()
+        db_session.add_all([
+            ProjectCollaborator(project_id=project.id, user_id=test_user.id, role='owner', status='accepted'),
+            ProjectCollaborator(
+                project_id=project.id, user_id=test_user_unverified.id, role='viewer', status='accepted'
+            ),
+        ])
+        await db_session.commit()
+        task, = await self._create_tasks(db_session, test_user, 1)
+        
+        invalidated = []
+        
+        async def record(user_ids, *resources):
+            invalidated.extend((user_id, resource) for user_id in user_ids for resource in resources)
+        
+        monkeypatch.setattr(read_cache, "invalidate", record)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "move", "task_id": str(task.id), "project_id": str(project.id)},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert (test_user.id, PROJECTS) in invalidated
+        assert (test_user_unverified.id, PROJECTS) in invalidated
+    
+    async def test_batch_move_cycle_rejected(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test moves that would create a parent cycle are rejected"""
+        first, second = await self._create_tasks(db_session, test_user, 2)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "move", "task_id": str(first.id), "parent_task_id": str(second.id)},
+                {"op": "move", "task_id": str(second.id), "parent_task_id": str(first.id)},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+        assert "cycle" in response.json()["detail"]
+    
+    async def test_batch_unknown_task_rolls_back(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test the whole batch fails when any task is not found"""
+        import uuid
+        tasks = await self._create_tasks(db_session, test_user, 1)
+        
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [
+                {"op": "complete", "task_id": str(tasks[0].id)},
+                {"op": "complete", "task_id": str(uuid.uuid4())},
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+        
+        await db_session.refresh(tasks[0])
+        assert tasks[0].status == "pending"
+    
+    async def test_batch_requires_operation_fields(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test reprioritize without a priority is rejected"""
+        import uuid
+        response = await client.post(
+            "/api/v1/tasks/batch",
+            json={"operations": [{"op": "reprioritize", "task_id": str(uuid.uuid4())}]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 422
@@ -0,0 +1,164 @@
+"""
+Integration tests for recurring task occurrences
+"""
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from models.user import User
+from models.task import Task, TaskOccurrence
+from services.occurrence_service import OccurrenceService
+
+
+@pytest.mark.asyncio
+class TestTaskOccurrences:
+    """Test occurrence range queries"""
+    
+    async def test_get_occurrences_materialized(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test occurrences materialized in the background are returned for a range"""
+        start = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+        task = Task(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            title="Daily standup",
+            status="pending",
+            due_date=start,
+            recurrence_rule="FREQ=DAILY;INTERVAL=1"
+        )
+        db_session.add(task)
+        await db_session.commit()
+        await OccurrenceService.materialize_due(db_session, test_user.id)
+        
+        result = await db_session.execute(
+            select(TaskOccurrence).where(TaskOccurrence.task_id == task.id)
+        )
+        assert len(result.scalars().all()) > 7
+        
+        response = await client.get(
+            "/api/v1/tasks/occurrences",
+            params={
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=7)).isoformat()
+            },
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 7
+        assert all(item["title"] == "Daily standup" for item in data["items"])
+    
+    async def test_get_occurrences_does_not_write(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test tasks not yet materialized are expanded without writing the index"""
+        start = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+        task = Task(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            title="New habit",
+            status="pending",
+            due_date=start,
+            recurrence_rule="FREQ=DAILY;INTERVAL=1"
+        )
+        db_session.add(task)
+        await db_session.commit()
+        
+        response = await client.get(
+            "/api/v1/tasks/occurrences",
+            params={"start": start.isoformat(), "end": (start + timedelta(days=7)).isoformat()},
+            headers=auth_headers
+        )
+        
+        assert response.json()["total"] == 7
+        result = await db_session.execute(
+            select(TaskOccurrence).where(TaskOccurrence.task_id == task.id)
+        )
+        assert result.scalars().all() == []
+    
+    async def test_rule_change_re_expands(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test changing a rule replaces its occurrences"""
+        start = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+        task = Task(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            title="Review",
+            status="pending",
+            due_date=start,
+            recurrence_rule="FREQ=DAILY;INTERVAL=1"
+        )
+        db_session.add(task)
+        await db_session.commit()
+        
+        await OccurrenceService.materialize_due(db_session, test_user.id)
+        
+        params = {"start": start.isoformat(), "end": (start + timedelta(days=14)).isoformat()}
+        response = await client.get("/api/v1/tasks/occurrences", params=params, headers=auth_headers)
+        assert response.json()["total"] == 14
+        
+        # Served before the materializer catches up with the change
+        task.recurrence_rule = "FREQ=WEEKLY;INTERVAL=1"
+        await db_session.commit()
+        
+        response = await client.get("/api/v1/tasks/occurrences", params=params, headers=auth_headers)
+        assert response.json()["total"] == 2
+    
+    async def test_get_occurrences_outside_window(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test ranges beyond the materialized horizon are expanded on demand"""
+        db_session.add(Task(
+            id=uuid.uuid4(),
+            user_id=test_user.id,
+            title="Monthly report",
+            status="pending",
+            due_date=datetime(2024, 1, 15, 9, 0, 0, tzinfo=timezone.utc),
+            recurrence_rule="FREQ=MONTHLY;INTERVAL=1"
+        ))
+        await db_session.commit()
+        
+        response = await client.get(
+            "/api/v1/tasks/occurrences",
+            params={"start": "2024-01-01T00:00:00Z", "end": "2024-07-01T00:00:00Z"},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["total"] == 6
+    
+    async def test_get_occurrences_invalid_range(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test end before start is rejected"""
+        response = await client.get(
+            "/api/v1/tasks/occurrences",
+            params={"start": "2024-02-01T00:00:00Z", "end": "2024-01-01T00:00:00Z"},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
@@ -0,0 +1,187 @@
+"""
+Integration tests for task ordering
+"""
+import pytest
+import uuid
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from models.user import User
+from models.task import Task
+
+
+async def _ordered_titles(db_session: AsyncSession, user: User):
+    result = await db_session.execute(
+        select(Task.title)
+        .where(Task.user_id == user.id, Task.parent_task_id.is_(None))
+        .order_by(Task.position_key)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestTaskPosition:
+    """Test moving tasks with fractional ordering keys"""
+    
+    async def _create_tasks(self, db_session: AsyncSession, user: User, count: int):
+        tasks = [
+            Task(id=uuid.uuid4(), user_id=user.id, title=f"Task {i}", status="pending", position=i)
+            for i in range(count)
+        ]
+        db_session.add_all(tasks)
+        await db_session.commit()
+        return tasks
+    
+    async def test_move_between_siblings(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test placing a task between two others"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            f"/api/v1/tasks/{tasks[2].id}/position",
+            json={"after_task_id": str(tasks[0].id), "before_task_id": str(tasks[1].id)},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert await _ordered_titles(db_session, test_user) == ["Task 0", "Task 2", "Task 1"]
+    
+    async def test_move_after_only(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test placing a task directly after an anchor"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            f"/api/v1/tasks/{tasks[0].id}/position",
+            json={"after_task_id": str(tasks[1].id)},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert await _ordered_titles(db_session, test_user) == ["Task 1", "Task 0", "Task 2"]
+    
+    async def test_move_to_end(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test moving a task to the end of its group"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            f"/api/v1/tasks/{tasks[0].id}/position",
+            json={},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert await _ordered_titles(db_session, test_user) == ["Task 1", "Task 2", "Task 0"]
+    
+    async def test_move_writes_only_the_moved_task(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test siblings keep their keys and positions when a task moves"""
+        tasks = await self._create_tasks(db_session, test_user, 4)
+        await client.post(f"/api/v1/tasks/{tasks[0].id}/position", json={}, headers=auth_headers)
+        result = await db_session.execute(
+            select(Task.id, Task.position_key, Task.position)
+            .where(Task.user_id == test_user.id, Task.id != tasks[3].id)
+            .execution_options(populate_existing=True)
+        )
+        before = set(result.all())
+        
+        response = await client.post(
+            f"/api/v1/tasks/{tasks[3].id}/position",
+            json={"before_task_id": str(tasks[1].id)},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        result = await db_session.execute(
+            select(Task.id, Task.position_key, Task.position)
+            .where(Task.user_id == test_user.id, Task.id != tasks[3].id)
+            .execution_options(populate_existing=True)
+        )
+        assert set(result.all()) == before
+        assert await _ordered_titles(db_session, test_user) == ["Task 3", "Task 1", "Task 2", "Task 0"]
+    
+    async def test_move_under_own_descendant(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test a task cannot be placed next to its own child or grandchild"""
+        parent = Task(id=uuid.uuid4(), user_id=test_user.id, title="Parent", status="pending")
+        child = Task(id=uuid.uuid4(), user_id=test_user.id, title="Child", status="pending", parent_task_id=parent.id)
+        grandchild = Task(
+            id=uuid.uuid4(), user_id=test_user.id, title="Grandchild", status="pending", parent_task_id=child.id
+        )
+        db_session.add(parent)
+        await db_session.commit()
+        db_session.add(child)
+        await db_session.commit()
+        db_session.add(grandchild)
+        await db_session.commit()
+        
+        for neighbor in (child, grandchild):
+            response = await client.post(
+                f"/api/v1/tasks/{parent.id}/position",
+                json={"after_task_id": str(neighbor.id)},
+                headers=auth_headers
+            )
+            assert response.status_code == 400
+        
+        await db_session.refresh(parent)
+        assert parent.parent_task_id is None
+    
+    async def test_move_invalid_neighbor_order(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        db_session: AsyncSession
+    ):
+        """Test neighbors given in the wrong order are rejected"""
+        tasks = await self._create_tasks(db_session, test_user, 3)
+        
+        response = await client.post(
+            f"/api/v1/tasks/{tasks[2].id}/position",
+            json={"after_task_id": str(tasks[1].id), "before_task_id": str(tasks[0].id)},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+    
+    async def test_move_nonexistent_task(
+        self,
+        client: AsyncClient,
+        auth_headers: dict
+    ):
+        """Test moving a task that does not exist"""
+        response = await client.post(
+            f"/api/v1/tasks/{uuid.uuid4()}/position",
+            json={},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 404
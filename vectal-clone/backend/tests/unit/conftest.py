@@ -0,0 +1,22 @@
+"""
+Shared fixtures for unit tests
+
+Redis-backed helpers are tested against an in-process fakeredis client;
+tests using the redis fixture are skipped when fakeredis is not installed.
+"""
+import pytest
+
+
+@pytest.fixture
+def redis():
+    """Empty in-process Redis, decoding responses like the app's client"""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def unavailable_redis():
+    """redis_getter that fails as if Redis were down"""
+    def getter():
+        raise ConnectionError("redis down")
+    return getter
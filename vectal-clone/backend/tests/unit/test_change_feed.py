@@ -0,0 +1,114 @@
+"""
+Unit tests for the change feed
+"""
+import asyncio
+
+import pytest
+
+from services import change_feed as change_feed_module
+from services.change_feed import ChangeEvent, ChangeFeed, parse_stream_id
+
+
+@pytest.fixture
+def feed(monkeypatch, redis):
+    monkeypatch.setattr(change_feed_module, "CHANGE_FEED_BLOCK_MS", 20)
+    return ChangeFeed(redis_getter=lambda: redis)
+
+
+async def next_event(subscription):
+    return await asyncio.wait_for(subscription.__anext__(), timeout=2)
+
+
+class TestChangeEvent:
+    """Test sequence parsing and SSE framing"""
+
+    def test_parse_stream_id(self):
+        assert parse_stream_id("1700000000000-3") == (1700000000000, 3)
+        assert parse_stream_id("5") == (5, 0)
+        with pytest.raises(ValueError):
+            parse_stream_id("latest")
+
+    def test_to_sse(self):
+        event = ChangeEvent("1-0", "note", "deleted", "n1", {})
+
+        assert event.to_sse() == (
+            'id: 1-0\nevent: change\n'
+            'data: {"entity":"note","action":"deleted","entity_id":"n1","data":{}}\n\n'
+        )
+
+
+@pytest.mark.asyncio
+class TestChangeFeed:
+    """Test publishing, fan-out and resume"""
+
+    async def test_live_changes(self, feed):
+        """Test subscribers receive changes published after they connect"""
+        first = feed.subscribe("u1")
+        second = feed.subscribe("u1")
+        pending = [asyncio.ensure_future(next_event(s)) for s in (first, second)]
+        await asyncio.sleep(0.05)
+
+        await feed.publish(["u1"], "task", "updated", "t1", {"status": "completed"})
+        events = await asyncio.gather(*pending)
+
+        assert [e.entity_id for e in events] == ["t1", "t1"]
+        assert events[0].data == {"status": "completed"}
+        await first.aclose()
+        await second.aclose()
+        await feed.close()
+
+    async def test_users_isolated(self, feed):
+        """Test a user only sees changes published to them"""
+        subscription = feed.subscribe("u1")
+        pending = asyncio.ensure_future(next_event(subscription))
+        await asyncio.sleep(0.05)
+
+        await feed.publish(["u2"], "note", "created", "n2")
+        await feed.publish(["u1", "u2"], "project", "updated", "p1")
+
+        assert (await pending).entity_id == "p1"
+        await subscription.aclose()
+        await feed.close()
+
+    async def test_resume_after_sequence(self, feed):
+        """Test reconnecting with the last applied ID replays only later changes"""
+        for i in range(3):
+            await feed.publish(["u1"], "note", "updated", f"n{i}")
+        redis = feed._redis_getter()
+        entries = await redis.xrange("changes:u1")
+
+        subscription = feed.subscribe("u1", since=entries[0][0])
+        replayed = [await next_event(subscription), await next_event(subscription)]
+
+        assert [e.entity_id for e in replayed] == ["n1", "n2"]
+        await subscription.aclose()
+        await feed.close()
+
+    async def test_reset_when_resume_point_trimmed(self, feed):
+        """Test a resume point older than the stream yields a reset event"""
+        await feed.publish(["u1"], "note", "updated", "n1")
+
+        subscription = feed.subscribe("u1", since="1-0")
+        event = await next_event(subscription)
+
+        assert event.action == "reset"
+        assert event.to_sse().startswith("id: ")
+        await subscription.aclose()
+        await feed.close()
+
+    async def test_close_ends_subscriptions(self, feed):
+        """Test shutdown ends open subscriptions"""
+        subscription = feed.subscribe("u1")
+        pending = asyncio.ensure_future(next_event(subscription))
+        await asyncio.sleep(0.05)
+
+        await feed.close()
+
+        with pytest.raises(StopAsyncIteration):
+            await pending
+
+    async def test_publish_failure_is_logged(self, unavailable_redis):
+        """Test writes are not failed by an unavailable Redis"""
+        feed = ChangeFeed(redis_getter=unavailable_redis)
+
+        await feed.publish(["u1"], "note", "created", "n1")
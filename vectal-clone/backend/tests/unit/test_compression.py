@@ -0,0 +1,182 @@
+"""
+Unit tests for response compression
+"""
+import gzip
+import zlib
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from api.middleware.compression import CompressionMiddleware
+from utils.compression import StreamCompressor, brotli, compress, negotiate_encoding, zstandard
+
+PAYLOAD = {"items": [{"id": i, "title": f"Note {i}", "content": "lorem ipsum " * 20} for i in range(50)]}
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation"""
+
+    def test_prefers_server_order_on_ties(self):
+        """Test equally acceptable encodings follow the server preference"""
+        assert negotiate_encoding("gzip, br, zstd", ["br", "gzip"]) == "br"
+
+    def test_q_values(self):
+        """Test q-values outrank server preference and q=0 excludes"""
+        assert negotiate_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+        assert negotiate_encoding("gzip;q=0", ["gzip"]) is None
+        assert negotiate_encoding("*", ["gzip"]) == "gzip"
+
+    def test_identity(self):
+        """Test no header or unsupported encodings mean no compression"""
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("deflate, compress") is None
+
+
+class TestCompressors:
+    """Test each encoding round-trips"""
+
+    def test_gzip(self):
+        data = b"hello " * 1000
+        assert gzip.decompress(compress(data, "gzip")) == data
+
+    @pytest.mark.skipif(brotli is None, reason="brotli not installed")
+    def test_brotli(self):
+        data = b"hello " * 1000
+        assert brotli.decompress(compress(data, "br")) == data
+
+    @pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+    def test_zstd(self):
+        data = b"hello " * 1000
+        assert zstandard.ZstdDecompressor().decompress(compress(data, "zstd"), max_output_size=len(data)) == data
+
+    def test_stream_chunks_decodable_as_they_arrive(self):
+        """Test every flushed chunk can be decoded without the rest of the stream"""
+        stream = StreamCompressor("gzip")
+        decoder = zlib.decompressobj(31)
+
+        assert decoder.decompress(stream.compress(b"first chunk")) == b"first chunk"
+        assert decoder.decompress(stream.compress(b"second")) == b"second"
+        decoder.decompress(stream.finish())
+        assert decoder.eof
+
+
+def make_client(**options):
+    async def json_route(request):
+        return JSONResponse(PAYLOAD)
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def events(request):
+        async def body():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    async def ndjson(request):
+        async def body():
+            for i in range(3):
+                yield f'{{"i": {i}}}\n'.encode()
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    async def binary(request):
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    async def tagged(request):
+        return JSONResponse(PAYLOAD, headers={"ETag": '"v1"'})
+
+    app = Starlette(routes=[
+        Route("/json", json_route),
+        Route("/small", small),
+        Route("/events", events),
+        Route("/ndjson", ndjson),
+        Route("/binary", binary),
+        Route("/tagged", tagged),
+    ])
+    app.add_middleware(CompressionMiddleware, **options)
+    return AsyncClient(app=app, base_url="http://test")
+
+
+async def raw_get(client, path, encoding="gzip"):
+    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, raw
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    """Test which responses are compressed and how"""
+
+    async def test_compresses_json(self):
+        """Test JSON bodies are gzipped with a matching Content-Length"""
+        async with make_client() as client:
+            response, raw = await raw_get(client, "/json")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-length"] == str(len(raw))
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert gzip.decompress(raw).startswith(b'{"items"')
+
+    async def test_small_and_binary_bodies_untouched(self):
+        """Test bodies below the minimum size and binary types pass through"""
+        async with make_client() as client:
+            small, _ = await raw_get(client, "/small")
+            binary, _ = await raw_get(client, "/binary")
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in binary.headers
+
+    async def test_event_stream_untouched(self):
+        """Test server-sent events are never compressed"""
+        async with make_client() as client:
+            response, raw = await raw_get(client, "/events")
+
+        assert "content-encoding" not in response.headers
+        assert raw == b"data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+    async def test_streams_compressed_incrementally(self):
+        """Test streaming bodies are compressed without Content-Length"""
+        async with make_client() as client:
+            response, raw = await raw_get(client, "/ndjson")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == b'{"i": 0}\n{"i": 1}\n{"i": 2}\n'
+
+    async def test_thread_offload(self):
+        """Test bodies over the thread threshold compress to the same bytes"""
+        async with make_client(thread_threshold=1) as client:
+            response, raw = await raw_get(client, "/json")
+
+        assert gzip.decompress(raw).startswith(b'{"items"')
+
+    async def test_no_accept_encoding(self):
+        """Test clients that do not accept compression get identity"""
+        async with make_client() as client:
+            response, raw = await raw_get(client, "/json", encoding="identity")
+
+        assert "content-encoding" not in response.headers
+        assert raw.startswith(b'{"items"')
+
+    async def test_etag_responses_cached(self):
+        """Test compressed bodies of GETs with an ETag are reused"""
+        middleware_cache = {}
+
+        class Cache:
+            def get(self, key):
+                return middleware_cache.get(key)
+
+            def set(self, key, value):
+                middleware_cache[key] = value
+
+        async with make_client(cache=Cache()) as client:
+            first, first_raw = await raw_get(client, "/tagged")
+            second, second_raw = await raw_get(client, "/tagged")
+            await raw_get(client, "/json")
+
+        assert first_raw == second_raw
+        assert len(middleware_cache) == 1
+        assert next(iter(middleware_cache))[2:4] == ('"v1"', "gzip")
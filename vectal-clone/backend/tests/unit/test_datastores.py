@@ -0,0 +1,108 @@
+"""
+Unit tests for the datastore connection registry
+"""
+import asyncio
+import pytest
+from utils.datastores import DatastoreRegistry, DatastoreUnavailable
+
+
+def delayed(seconds: float, fail: bool = False):
+    async def connect():
+        await asyncio.sleep(seconds)
+        if fail:
+            raise ConnectionError("refused")
+    return connect
+
+
+@pytest.mark.asyncio
+class TestDatastoreRegistry:
+    """Test concurrent startup, timeouts and readiness"""
+
+    async def test_connects_concurrently(self):
+        """Test stores connect in parallel rather than one after another"""
+        registry = DatastoreRegistry()
+        for name in ("a", "b", "c"):
+            registry.register(name, delayed(0.1))
+
+        started = asyncio.get_running_loop().time()
+        await registry.connect_all()
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 0.25
+        state = registry.readiness()
+        assert state["ready"] is True
+        assert all(s["status"] == "ready" for s in state["stores"].values())
+        assert all(s["latency_ms"] >= 100 for s in state["stores"].values())
+
+    async def test_required_timeout_fails_startup(self):
+        """Test a required store exceeding its timeout fails startup"""
+        registry = DatastoreRegistry()
+        registry.register("fast", delayed(0))
+        registry.register("slow", delayed(1), timeout=0.05)
+
+        with pytest.raises(DatastoreUnavailable):
+            await registry.connect_all()
+
+        stores = registry.readiness()["stores"]
+        assert stores["fast"]["status"] == "ready"
+        assert stores["slow"]["status"] == "failed"
+        assert "Timed out" in stores["slow"]["error"]
+
+    async def test_optional_failure_does_not_block(self):
+        """Test optional store failures are reported but do not fail startup"""
+        registry = DatastoreRegistry()
+        registry.register("db", delayed(0))
+        registry.register("cache", delayed(0, fail=True), required=False)
+
+        await registry.connect_all()
+
+        state = registry.readiness()
+        assert state["ready"] is True
+        assert state["stores"]["cache"]["error"] == "refused"
+
+    async def test_lazy_store(self):
+        """Test lazy stores do not delay startup and are awaited by ensure()"""
+        registry = DatastoreRegistry()
+        registry.register("vectors", delayed(0.2), lazy=True)
+
+        started = asyncio.get_running_loop().time()
+        await registry.connect_all()
+        assert asyncio.get_running_loop().time() - started < 0.1
+        assert registry.readiness()["ready"] is True
+
+        await registry.ensure("vectors")
+        assert registry.stores["vectors"].status == "ready"
+
+    async def test_ensure_retries_failed_store(self):
+        """Test ensure() raises for a failed store and retries on the next call"""
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("refused")
+
+        registry = DatastoreRegistry()
+        registry.register("vectors", flaky, lazy=True)
+
+        with pytest.raises(DatastoreUnavailable):
+            await registry.ensure("vectors")
+        await registry.ensure("vectors")
+
+        assert len(attempts) == 2
+
+    async def test_close_all(self):
+        """Test connected stores are closed concurrently"""
+        closed = []
+
+        async def close():
+            closed.append(1)
+
+        registry = DatastoreRegistry()
+        registry.register("a", delayed(0), close)
+        registry.register("b", delayed(0), close)
+        await registry.connect_all()
+        await registry.close_all()
+
+        assert len(closed) == 2
+        assert registry.stores["a"].status == "pending"
@@ -0,0 +1,77 @@
+"""
+Unit tests for fractional index ordering keys
+"""
+import pytest
+import random
+from utils.fractional_index import (
+    generate_key_between,
+    generate_n_keys_between,
+    validate_key
+)
+
+
+class TestGenerateKeyBetween:
+    """Test generating a single key"""
+    
+    def test_initial_key(self):
+        """Test key for an empty list"""
+        assert generate_key_between(None, None) == "a0"
+    
+    def test_append_and_prepend(self):
+        """Test keys after the last and before the first item"""
+        assert generate_key_between("a0", None) == "a1"
+        assert generate_key_between(None, "a0") == "Zz"
+    
+    def test_between_adjacent_keys(self):
+        """Test key between two adjacent integer keys"""
+        key = generate_key_between("a0", "a1")
+        assert "a0" < key < "a1"
+    
+    def test_invalid_order(self):
+        """Test that a must sort before b"""
+        with pytest.raises(ValueError):
+            generate_key_between("a1", "a0")
+    
+    def test_invalid_key(self):
+        """Test malformed keys are rejected"""
+        with pytest.raises(ValueError):
+            validate_key("a00")
+        with pytest.raises(ValueError):
+            validate_key("!")
+    
+    def test_random_inserts_stay_ordered(self):
+        """Test repeated random inserts keep strict ordering"""
+        rng = random.Random(42)
+        keys = []
+        for _ in range(2000):
+            i = rng.randint(0, len(keys))
+            a = keys[i - 1] if i > 0 else None
+            b = keys[i] if i < len(keys) else None
+            key = generate_key_between(a, b)
+            assert (a is None or a < key) and (b is None or key < b)
+            keys.insert(i, key)
+        
+        assert keys == sorted(keys)
+
+
+class TestGenerateNKeysBetween:
+    """Test generating multiple keys"""
+    
+    def test_n_keys_unbounded(self):
+        """Test appended keys stay short"""
+        keys = generate_n_keys_between(None, None, 1000)
+        
+        assert keys == sorted(keys)
+        assert len(set(keys)) == 1000
+        assert max(len(k) for k in keys) <= 3
+    
+    def test_n_keys_between_bounds(self):
+        """Test keys between two existing keys"""
+        keys = generate_n_keys_between("a0", "a1", 50)
+        
+        assert keys == sorted(keys)
+        assert all("a0" < k < "a1" for k in keys)
+    
+    def test_zero_keys(self):
+        """Test requesting no keys"""
+        assert generate_n_keys_between(None, None, 0) == []
@@ -0,0 +1,28 @@
+"""
+Unit tests for ETag helpers
+"""
+from datetime import datetime
+
+from utils.http_cache import etag_matches, make_etag
+
+
+class TestETags:
+    """Test ETag generation and If-None-Match matching"""
+
+    def test_etag_changes_with_stamp(self):
+        """Test the same stamp gives the same ETag and any change a new one"""
+        updated = datetime(2024, 1, 1, 12, 0)
+
+        assert make_etag("note", "n1", updated, 1) == make_etag("note", "n1", updated, 1)
+        assert make_etag("note", "n1", updated, 1) != make_etag("note", "n1", updated, 2)
+        assert make_etag("note", "n1", updated, 1).startswith('"')
+
+    def test_if_none_match(self):
+        """Test lists, weak validators and the wildcard"""
+        etag = make_etag("note", "n1", 1)
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
@@ -0,0 +1,91 @@
+"""
+Unit tests for background job bookkeeping
+"""
+import pytest
+
+from services.job_queue import DEAD_LETTER_KEY, JOB_CLAIMED, JOB_DONE, JOB_RUNNING, JobQueue
+
+
+class FakeTask:
+    """Records apply_async calls like a Celery task"""
+
+    name = "tests.fake"
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, countdown=None):
+        if self.fail:
+            raise ConnectionError("broker down")
+        self.sent.append((args, kwargs, task_id))
+
+
+@pytest.fixture
+def queue(redis):
+    return JobQueue(redis_getter=lambda: redis)
+
+
+@pytest.mark.asyncio
+class TestEnqueue:
+    """Test idempotent enqueueing"""
+
+    async def test_duplicates_dropped(self, queue):
+        """Test the same idempotency key is only sent once"""
+        task = FakeTask()
+
+        first = await queue.enqueue(task, args=["n1"], idempotency_key="notes.reindex:n1:1")
+        second = await queue.enqueue(task, args=["n1"], idempotency_key="notes.reindex:n1:1")
+
+        assert first is not None
+        assert second == first
+        assert task.sent == [(["n1"], {"idempotency_key": "notes.reindex:n1:1"}, first)]
+
+    async def test_broker_failure_releases_key(self, queue):
+        """Test a failed send does not block a later enqueue"""
+        assert await queue.enqueue(FakeTask(fail=True), idempotency_key="k") is None
+        assert await queue.enqueue(FakeTask(), idempotency_key="k") is not None
+
+
+@pytest.mark.asyncio
+class TestClaim:
+    """Test execution-side idempotency"""
+
+    async def test_claim_lifecycle(self, queue):
+        """Test a key is claimed once, retried after release and skipped when done"""
+        await queue.enqueue(FakeTask(), idempotency_key="k")
+
+        assert await queue.claim("k") == JOB_CLAIMED
+        assert await queue.claim("k") == JOB_RUNNING
+
+        await queue.release("k")
+        assert await queue.claim("k") == JOB_CLAIMED
+
+        await queue.complete("k")
+        assert await queue.claim("k") == JOB_DONE
+        task = FakeTask()
+        assert await queue.enqueue(task, idempotency_key="k") is not None
+        assert task.sent == []
+
+
+@pytest.mark.asyncio
+class TestDeadLetters:
+    """Test dead-letter recording and replay"""
+
+    async def test_dead_letter_and_replay(self, queue, redis):
+        """Test exhausted jobs are recorded and can be re-sent"""
+        await queue.enqueue(FakeTask(), idempotency_key="k")
+        await queue.dead_letter("notes.reindex", "t1", ["n1", "u1"], {"idempotency_key": "k"}, ValueError("boom"), 5)
+
+        records = await queue.dead_letters()
+        assert records[0]["task"] == "notes.reindex"
+        assert records[0]["error"] == "ValueError: boom"
+        assert records[0]["retries"] == 5
+
+        sent = []
+        replayed = await queue.replay_dead_letters(lambda name, args, kwargs: sent.append((name, args, kwargs)))
+
+        assert replayed == 1
+        assert sent == [("notes.reindex", ["n1", "u1"], {"idempotency_key": "k"})]
+        assert await redis.llen(DEAD_LETTER_KEY) == 0
+        assert await queue.claim("k") == JOB_CLAIMED
@@ -0,0 +1,110 @@
+"""
+Unit tests for metrics and request timings
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from api.middleware.metrics import MetricsMiddleware
+from utils.metrics import (
+    RequestTimings, TIMING_POSTGRES, current_timings, instrument_sqlalchemy, record_timing, sql_operation
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def make_app(server_timing=True):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        record_timing(TIMING_POSTGRES, 0.004)
+        record_timing(TIMING_POSTGRES, 0.002)
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, server_timing=server_timing)
+    return app
+
+
+class TestRequestTimings:
+    """Test timing aggregation and header formatting"""
+
+    def test_server_timing(self):
+        timings = RequestTimings()
+        timings.add("pg", 0.003)
+        timings.add("pg", 0.002)
+        timings.add("mongo", 0.01)
+
+        header = timings.server_timing()
+
+        assert header.startswith('pg;dur=5.0;desc="2x", mongo;dur=10.0;desc="1x", app;dur=')
+
+    def test_record_outside_request_ignored(self):
+        assert current_timings() is None
+        record_timing("pg", 1.0)
+
+    def test_sql_operation(self):
+        assert sql_operation("  select * from tasks") == "SELECT"
+        assert sql_operation("INSERT INTO tasks VALUES (1)") == "INSERT"
+        assert sql_operation("VACUUM") == "OTHER"
+        assert sql_operation("") == "OTHER"
+
+
+@pytest.mark.asyncio
+class TestMetricsMiddleware:
+    """Test route histograms and Server-Timing headers"""
+
+    async def test_observes_route_template(self):
+        """Test requests are labelled by template rather than raw path"""
+        labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        async with AsyncClient(app=make_app(), base_url="http://test") as client:
+            await client.get("/items/a")
+            await client.get("/items/b")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+    async def test_server_timing_header(self):
+        async with AsyncClient(app=make_app(), base_url="http://test") as client:
+            response = await client.get("/items/a")
+
+        assert response.headers["server-timing"].startswith('pg;dur=6.0;desc="2x", app;dur=')
+
+    async def test_server_timing_disabled(self):
+        async with AsyncClient(app=make_app(server_timing=False), base_url="http://test") as client:
+            response = await client.get("/items/a")
+
+        assert "server-timing" not in response.headers
+
+    async def test_unmatched_routes_share_a_label(self):
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        async with AsyncClient(app=make_app(), base_url="http://test") as client:
+            await client.get("/nope/1")
+            await client.get("/nope/2")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+class TestSqlAlchemyInstrumentation:
+    """Test statement timing hooks"""
+
+    def test_statements_observed(self):
+        instrument_sqlalchemy()
+        instrument_sqlalchemy()
+        engine = create_engine("sqlite://")
+        before = sample("db_query_duration_seconds_count", operation="SELECT")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 2"))
+
+        assert sample("db_query_duration_seconds_count", operation="SELECT") == before + 2
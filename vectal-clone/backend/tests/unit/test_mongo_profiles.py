@@ -0,0 +1,102 @@
+"""
+Unit tests for MongoDB operation profiles
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo import ReadPreference, _csot
+
+from utils.datastores import DatastoreRegistry
+from utils.metrics import _mongo_command_listener
+from utils.mongo_profiles import (
+    DEFAULT,
+    DURABLE_WRITE,
+    FAST_READ,
+    MONGO_FAST_READ_TIMEOUT,
+    current_profile,
+    mongo_profile,
+    primary_reads,
+    with_mongo_profile,
+)
+from utils.resources import AppResources
+from tests.unit.test_metrics import sample
+
+
+def make_resources(**kwargs) -> AppResources:
+    return AppResources(
+        mongodb_url="mongodb://localhost:27017/vectal", registry=DatastoreRegistry(), **kwargs
+    )
+
+
+class TestProfiles:
+    """Test profile scoping and collection options"""
+
+    def test_nested_profiles_restore(self):
+        assert current_profile() is DEFAULT
+        with mongo_profile(FAST_READ):
+            with mongo_profile(DURABLE_WRITE):
+                assert current_profile() is DURABLE_WRITE
+            assert current_profile() is FAST_READ
+        assert current_profile() is DEFAULT
+
+    def test_fast_read_sets_time_budget(self):
+        assert _csot.get_timeout() is None
+        with mongo_profile(FAST_READ):
+            assert _csot.get_timeout() == MONGO_FAST_READ_TIMEOUT
+        with mongo_profile(DURABLE_WRITE):
+            assert _csot.get_timeout() is None
+
+    def test_primary_reads_override_read_preference(self):
+        with primary_reads():
+            with mongo_profile(FAST_READ) as profile:
+                assert profile is current_profile() is FAST_READ.primary
+                assert "read_preference" not in profile.options
+                assert _csot.get_timeout() == MONGO_FAST_READ_TIMEOUT
+            with mongo_profile(DURABLE_WRITE) as profile:
+                assert profile is DURABLE_WRITE
+        with mongo_profile(FAST_READ) as profile:
+            assert profile is FAST_READ
+
+    @pytest.mark.asyncio
+    async def test_decorator_scopes_coroutine(self):
+        @with_mongo_profile(FAST_READ)
+        async def read():
+            await asyncio.sleep(0)
+            return current_profile()
+
+        assert await read() is FAST_READ
+        assert current_profile() is DEFAULT
+
+    def test_collection_options(self):
+        resources = make_resources()
+
+        default = resources.collection("notes")
+        with mongo_profile(FAST_READ):
+            fast = resources.collection("notes")
+        with mongo_profile(DURABLE_WRITE):
+            durable = resources.collection("notes")
+
+        assert default.read_preference == ReadPreference.PRIMARY
+        assert fast.read_preference.mongos_mode == "secondaryPreferred"
+        assert fast.read_preference.max_staleness == 90
+        assert durable.write_concern.document == {"w": "majority", "j": True, "wtimeout": 5000}
+        resources.mongo_client.close()
+
+    def test_collection_options_disabled(self):
+        resources = make_resources(mongo_profiles=False)
+
+        with mongo_profile(FAST_READ):
+            assert resources.collection("notes").read_preference == ReadPreference.PRIMARY
+        resources.mongo_client.close()
+
+
+def test_latency_labelled_by_profile():
+    listener = _mongo_command_listener()
+    event = SimpleNamespace(command_name="find", duration_micros=1500)
+    before = sample("mongo_command_duration_seconds_count", profile="fast_read", command="find", status="ok")
+
+    with mongo_profile(FAST_READ):
+        listener.succeeded(event)
+
+    assert sample("mongo_command_duration_seconds_count", profile="fast_read", command="find", status="ok") == before + 1
@@ -2,7 +2,9 @@
 Unit tests for note service utilities
 """
 import pytest
-from services.note_service import NoteService
+from datetime import datetime, timedelta
+from models.note import NoteVersion
+from services.note_service import NoteService, NOTE_VERSIONS_KEEP_RECENT
 
 
 class TestMarkdownRendering:
@@ -103,3 +105,33 @@ class TestHighlightExtraction:
         
         assert len(highlights) >= 1
         assert any("python" in h.lower() for h in highlights)
+
+
+class TestVersionCompaction:
+    """Test thinning of old note versions"""
+    
+    def make_versions(self, count, per_day):
+        start = datetime(2024, 1, 1)
+        return [
+            NoteVersion(
+                version=i + 1,
+                content=f"v{i + 1}",
+                updated_at=start + timedelta(days=i // per_day, minutes=i),
+                updated_by="user-1"
+            )
+            for i in range(count)
+        ]
+    
+    def test_short_history_unchanged(self):
+        """Test histories within the recent window are kept whole"""
+        versions = self.make_versions(NOTE_VERSIONS_KEEP_RECENT, per_day=5)
+        
+        assert NoteService._compacted_versions(versions) == versions
+    
+    def test_keeps_recent_and_last_of_each_day(self):
+        """Test older versions are thinned to one per day"""
+        versions = self.make_versions(NOTE_VERSIONS_KEEP_RECENT + 30, per_day=10)
+        kept = NoteService._compacted_versions(versions)
+        
+        assert kept[-NOTE_VERSIONS_KEEP_RECENT:] == versions[-NOTE_VERSIONS_KEEP_RECENT:]
+        assert [v.version for v in kept[:-NOTE_VERSIONS_KEEP_RECENT]] == [10, 20, 30]
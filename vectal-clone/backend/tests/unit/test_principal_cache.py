@@ -0,0 +1,232 @@
+"""
+Unit tests for the authenticated user cache
+"""
+import pytest
+import uuid
+from datetime import datetime
+from models.user import User
+from services import principal_cache as principal_cache_module
+from services.principal_cache import PrincipalCache, resolve_user
+from utils.jwt import create_access_token
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands used by the cache"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def expire(self, key, ttl):
+        pass
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+
+class FakePipeline:
+    """Queues commands and runs them in one execute(), counting round trips"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips = getattr(self.redis, "round_trips", 0) + 1
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeSession:
+    """Answers the user query of resolve_user"""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="cached@example.com",
+        password_hash="secret-hash",
+        full_name="Cached User",
+        is_verified=True,
+        is_active=True,
+        created_at=datetime(2024, 1, 1, 12, 0)
+    )
+
+
+@pytest.mark.asyncio
+class TestPrincipalCache:
+    """Test the two cache tiers and invalidation"""
+
+    async def test_roundtrip_through_redis(self):
+        """Test a cached user is rebuilt from Redis after the local tier is cleared"""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis_getter=lambda: redis)
+        user = make_user()
+
+        await cache.set(user, "jti-1")
+        cache.clear_local()
+        cached = await cache.get(str(user.id), "jti-1")
+
+        assert cached.id == user.id
+        assert cached.email == user.email
+        assert cached.created_at == user.created_at
+        assert cached.password_hash is None
+
+    async def test_invalidate_token(self):
+        """Test logout drops only that token"""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis_getter=lambda: redis)
+        user = make_user()
+        await cache.set(user, "jti-1")
+        await cache.set(user, "jti-2")
+
+        await cache.invalidate_token(user.id, "jti-1")
+
+        assert await cache.get(str(user.id), "jti-1") is None
+        assert await cache.get(str(user.id), "jti-2") is not None
+
+    async def test_set_is_one_round_trip(self):
+        """Test caching a user sends its commands in one pipeline"""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis_getter=lambda: redis)
+
+        await cache.set(make_user(), "jti-1")
+
+        assert redis.round_trips == 1
+
+    async def test_revoked_token_seen_by_other_workers(self):
+        """Test logout on one worker is seen once another misses its local tier"""
+        redis = FakeRedis()
+        worker_a = PrincipalCache(redis_getter=lambda: redis)
+        worker_b = PrincipalCache(redis_getter=lambda: redis)
+        user = make_user()
+        await worker_b.set(user, "jti-1")
+        worker_b.clear_local()
+
+        await worker_a.invalidate_token(user.id, "jti-1")
+
+        assert await worker_a.lookup(str(user.id), "jti-1") == (None, True)
+        assert await worker_b.lookup(str(user.id), "jti-1") == (None, True)
+
+    async def test_invalidate_user(self):
+        """Test deactivation drops every token of the user in both tiers"""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis_getter=lambda: redis)
+        user = make_user()
+        await cache.set(user, "jti-1")
+        await cache.set(user, "jti-2")
+
+        await cache.invalidate_user(user.id)
+
+        assert await cache.get(str(user.id), "jti-1") is None
+        assert await cache.get(str(user.id), "jti-2") is None
+        assert redis.values == {}
+
+    async def test_redis_unavailable(self):
+        """Test Redis errors degrade to cache misses"""
+        def broken():
+            raise ConnectionError("redis down")
+
+        cache = PrincipalCache(redis_getter=broken)
+        user = make_user()
+        await cache.set(user, "jti-1")
+
+        assert (await cache.get(str(user.id), "jti-1")).id == user.id
+        assert await cache.get(str(user.id), "jti-2") is None
+
+
+class TestTokenMemo:
+    """Test memoized JWT verification"""
+
+    def test_verify_token_memoized(self):
+        """Test a verified payload is reused for the same token"""
+        cache = PrincipalCache(redis_getter=lambda: None)
+        token = create_access_token({"sub": "user123"})
+
+        first = cache.verify_token(token)
+        second = cache.verify_token(token)
+
+        assert first["sub"] == "user123"
+        assert first is second
+
+    def test_verify_invalid_token(self):
+        """Test invalid tokens are rejected and not memoized"""
+        cache = PrincipalCache(redis_getter=lambda: None)
+
+        assert cache.verify_token("invalid.token.here") is None
+
+
+@pytest.mark.asyncio
+class TestResolveUser:
+    """Test revocation and deactivation in resolve_user"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        redis = FakeRedis()
+        cache = PrincipalCache(redis_getter=lambda: redis)
+        monkeypatch.setattr(principal_cache_module, "principal_cache", cache)
+        return cache
+
+    async def test_logged_out_token_rejected(self, cache):
+        """Test a revoked token is neither served from the memo nor reloaded"""
+        user = make_user()
+        token = create_access_token({"sub": str(user.id)})
+        db = FakeSession(user)
+        assert (await resolve_user(db, token)).id == user.id
+
+        payload = cache.verify_token(token)
+        jti = payload.get("jti") or principal_cache_module._token_digest(token)
+        await cache.invalidate_token(user.id, jti)
+
+        assert await resolve_user(db, token) is None
+        assert db.queries == 1
+
+    async def test_deactivated_user_rejected(self, cache):
+        """Test inactive users are rejected whether cached or loaded"""
+        user = make_user()
+        user.is_active = False
+        token = create_access_token({"sub": str(user.id)})
+
+        assert await resolve_user(FakeSession(user), token) is None
+
+        payload = cache.verify_token(token)
+        await cache.set(user, payload.get("jti") or principal_cache_module._token_digest(token))
+        assert await resolve_user(FakeSession(None), token) is None
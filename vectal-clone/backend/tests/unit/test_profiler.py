@@ -0,0 +1,104 @@
+"""
+Unit tests for the on-demand profiler
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+
+from api.dependencies import admin
+from api.dependencies.admin import require_admin_token
+from utils.profiler import ProfilerBusy, collapse, profile_cpu, profile_memory, sample_stacks
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSampling:
+    """Test stack sampling and collapsed output"""
+
+    def test_samples_busy_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        worker.start()
+        try:
+            stacks, samples = sample_stacks(0.2, interval=0.005)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert samples > 0
+        busy = [stack for stack in stacks if "busy_loop" in stack]
+        assert busy
+        # Root first: thread name, then outermost to innermost frame
+        assert busy[0].startswith("busy;")
+        assert busy[0].rindex("run") < busy[0].index("busy_loop")
+
+    def test_collapse_orders_by_weight(self):
+        assert collapse([("main;a", 1), ("main;b", 5)]) == "main;b 5\nmain;a 1\n"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_profiles_are_refused(self):
+        running = asyncio.create_task(profile_cpu(0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ProfilerBusy):
+            await profile_memory(0.01)
+        await running
+
+
+class TestMemoryProfile:
+    """Test tracemalloc diffs"""
+
+    @pytest.mark.asyncio
+    async def test_captures_allocations_in_window(self):
+        retained = []
+
+        async def allocate():
+            await asyncio.sleep(0.02)
+            retained.append(bytearray(2 * 1024 * 1024))
+
+        task = asyncio.create_task(allocate())
+        collapsed = await profile_memory(0.1)
+        await task
+
+        top = collapsed.splitlines()[0]
+        stack, weight = top.rsplit(" ", 1)
+        assert int(weight) >= 2 * 1024 * 1024
+        assert "test_profiler.py" in stack.split(";")[-1]
+
+
+class TestAdminToken:
+    """Test the admin dependency guarding profiling routes"""
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+
+        @app.get("/admin", dependencies=[Depends(require_admin_token)])
+        async def endpoint():
+            return {"ok": True}
+
+        return app
+
+    async def get(self, app, headers=None):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get("/admin", headers=headers or {})
+
+    @pytest.mark.asyncio
+    async def test_hidden_unless_enabled(self, app, monkeypatch):
+        monkeypatch.setattr(admin.settings, "PROFILING_ENABLED", False, raising=False)
+        monkeypatch.setattr(admin.settings, "ADMIN_TOKEN", "secret", raising=False)
+        assert (await self.get(app, {"X-Admin-Token": "secret"})).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_checks_token(self, app, monkeypatch):
+        monkeypatch.setattr(admin.settings, "PROFILING_ENABLED", True, raising=False)
+        monkeypatch.setattr(admin.settings, "ADMIN_TOKEN", "secret", raising=False)
+        assert (await self.get(app)).status_code == 403
+        assert (await self.get(app, {"X-Admin-Token": "wrong"})).status_code == 403
+        assert (await self.get(app, {"X-Admin-Token": "secret"})).status_code == 200
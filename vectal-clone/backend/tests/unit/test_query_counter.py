@@ -0,0 +1,97 @@
+"""
+Unit tests for query counting and N+1 detection
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+
+from api.middleware.query_count import QueryCountMiddleware
+from utils.metrics import instrument_sqlalchemy
+from utils.query_counter import QUERY_SQL, QueryCounter, count_queries, mongo_shape, record_mongo, sql_shape
+
+
+@pytest.fixture(scope="module")
+def engine():
+    instrument_sqlalchemy()
+    return create_engine("sqlite://")
+
+
+def load_rows(engine, ids):
+    with engine.connect() as conn:
+        for row_id in ids:
+            conn.execute(text("SELECT :id"), {"id": row_id})
+
+
+class TestShapes:
+    """Test query shape normalization"""
+
+    def test_sql_shape_collapses_parameters(self):
+        assert sql_shape("SELECT *\n  FROM tasks WHERE id IN ($1, $2, $3)") == "SELECT * FROM tasks WHERE id IN (?)"
+        assert sql_shape("SELECT * FROM tasks WHERE id = %(id_1)s") == "SELECT * FROM tasks WHERE id = ?"
+
+    def test_mongo_shape(self):
+        assert mongo_shape("find", {"find": "notes", "filter": {}}) == "find notes"
+        assert mongo_shape("getMore", {"getMore": 123, "collection": "notes"}) == "getMore"
+
+
+class TestQueryCounter:
+    """Test counting and repeated-shape detection"""
+
+    def test_counts_statements_in_block(self, engine):
+        with count_queries() as counter:
+            load_rows(engine, range(3))
+
+        assert counter.sql == 3
+        assert counter.mongo == 0
+        assert counter.repeated() == []
+
+    def test_outside_block_not_counted(self, engine):
+        counter = QueryCounter()
+        with count_queries(counter):
+            pass
+        load_rows(engine, range(2))
+
+        assert counter.count() == 0
+
+    def test_nested_counters(self, engine):
+        with count_queries() as outer:
+            load_rows(engine, range(1))
+            with count_queries() as inner:
+                load_rows(engine, range(2))
+                record_mongo("find", {"find": "notes"})
+
+        assert (outer.sql, outer.mongo) == (3, 1)
+        assert (inner.sql, inner.mongo) == (2, 1)
+
+    def test_repeated_shape_reports_caller(self, engine):
+        with count_queries(QueryCounter(repeat_threshold=3)) as counter:
+            load_rows(engine, range(4))
+
+        [(kind, shape, count, stack)] = counter.repeated()
+        assert (kind, shape, count) == (QUERY_SQL, "SELECT ?", 4)
+        assert any("load_rows" in frame for frame in stack)
+
+
+@pytest.mark.asyncio
+class TestQueryCountMiddleware:
+    """Test the debug header and N+1 logging"""
+
+    async def test_header_and_warning(self, engine, caplog):
+        app = FastAPI()
+
+        @app.get("/rows")
+        def rows():
+            load_rows(engine, range(6))
+            return {"ok": True}
+
+        app.add_middleware(QueryCountMiddleware, header=True, repeat_threshold=5)
+
+        with caplog.at_level(logging.WARNING, logger="api.middleware.query_count"):
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.get("/rows")
+
+        assert response.headers["x-query-count"] == "sql=6, mongo=0"
+        assert "Possible N+1 in GET /rows: 6x sql: SELECT ?" in caplog.text
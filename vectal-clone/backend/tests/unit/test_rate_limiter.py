@@ -0,0 +1,125 @@
+"""
+Unit tests for the rate limiter and its middleware
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from api.middleware.rate_limit import RateLimitMiddleware, RateLimitRule
+from utils.rate_limiter import LocalRateLimiter, RateLimiter, TOKEN_BUCKET
+
+
+class TestLocalRateLimiter:
+    """Test the in-memory algorithms"""
+
+    def test_sliding_window(self):
+        """Test requests beyond the limit are rejected within the window"""
+        limiter = LocalRateLimiter()
+        results = [limiter.sliding_window("k", limit=3, window=60) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results] == [2, 1, 0, 0]
+        assert 0 < results[-1].retry_after <= 60
+
+    def test_token_bucket(self):
+        """Test a bucket allows a burst up to capacity, then refills over time"""
+        limiter = LocalRateLimiter()
+        results = [limiter.token_bucket("k", limit=2, window=60) for _ in range(3)]
+
+        assert [r.allowed for r in results] == [True, True, False]
+        assert 0 < results[-1].retry_after <= 30
+
+    def test_keys_independent(self):
+        """Test separate keys have separate budgets"""
+        limiter = LocalRateLimiter()
+        limiter.sliding_window("a", limit=1, window=60)
+
+        assert limiter.sliding_window("b", limit=1, window=60).allowed is True
+
+
+@pytest.mark.asyncio
+class TestRateLimiter:
+    """Test the Redis limiter fallback"""
+
+    async def test_falls_back_to_local(self, unavailable_redis):
+        """Test checks keep working when Redis is down"""
+        limiter = RateLimiter(redis_getter=unavailable_redis)
+
+        first = await limiter.hit("k", limit=1, window=60)
+        second = await limiter.hit("k", limit=1, window=60)
+
+        assert first.allowed is True
+        assert second.allowed is False
+
+    async def test_skips_redis_during_backoff(self):
+        """Test a failing Redis is not tried on every check"""
+        attempts = []
+
+        def failing_redis():
+            attempts.append(1)
+            raise ConnectionError("redis down")
+
+        limiter = RateLimiter(redis_getter=failing_redis, backoff=0.05)
+
+        for _ in range(3):
+            await limiter.hit("k", limit=10, window=60)
+        assert len(attempts) == 1
+
+        await asyncio.sleep(0.06)
+        await limiter.hit("k", limit=10, window=60)
+        assert len(attempts) == 2
+
+
+def make_client(rules, redis_getter):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/limited", ok), Route("/open", ok)])
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=rules,
+        limiter=RateLimiter(redis_getter=redis_getter)
+    )
+    return AsyncClient(app=app, base_url="http://test")
+
+
+@pytest.mark.asyncio
+class TestRateLimitMiddleware:
+    """Test headers and rejection"""
+
+    async def test_headers_and_429(self, unavailable_redis):
+        """Test RateLimit-* headers and 429 once the limit is reached"""
+        async with make_client([RateLimitRule("/limited", limit=2, window=60, scope="ip")], unavailable_redis) as client:
+            first = await client.get("/limited")
+            await client.get("/limited")
+            third = await client.get("/limited")
+
+        assert first.status_code == 200
+        assert first.headers["RateLimit-Limit"] == "2"
+        assert first.headers["RateLimit-Remaining"] == "1"
+        assert first.headers["RateLimit-Policy"] == "2;w=60"
+        assert third.status_code == 429
+        assert "Rate limit exceeded" in third.text
+        assert int(third.headers["Retry-After"]) >= 1
+
+    async def test_unmatched_routes_pass_through(self, unavailable_redis):
+        """Test routes without a rule are not limited"""
+        async with make_client([RateLimitRule("/limited", limit=1, window=60, scope="ip")], unavailable_redis) as client:
+            responses = [await client.get("/open") for _ in range(3)]
+
+        assert all(r.status_code == 200 for r in responses)
+        assert "RateLimit-Limit" not in responses[0].headers
+
+    async def test_method_and_prefix_rules(self, unavailable_redis):
+        """Test rules only apply to their methods and path prefix"""
+        rule = RateLimitRule("/lim*", limit=1, window=60, methods=["POST"], algorithm=TOKEN_BUCKET, scope="ip")
+        async with make_client([rule], unavailable_redis) as client:
+            gets = [await client.get("/limited") for _ in range(2)]
+
+        assert all(r.status_code == 200 for r in gets)
+        assert rule.matches("POST", "/limited")
+        assert not rule.matches("GET", "/limited")
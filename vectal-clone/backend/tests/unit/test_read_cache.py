@@ -0,0 +1,143 @@
+"""
+Unit tests for the read-through cache
+"""
+import asyncio
+import json
+
+import pytest
+
+from services import read_cache as read_cache_module
+from services.read_cache import NOTES, PROJECTS, ReadCache, query_hash
+from utils.mongo_profiles import FAST_READ, mongo_profile
+
+@pytest.fixture
+def cache(redis):
+    return ReadCache(redis_getter=lambda: redis)
+
+
+class Loader:
+    """Counts calls and returns a fresh payload each time"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {"call": self.calls}
+
+
+def test_query_hash_ignores_order():
+    assert query_hash({"page": 1, "tags": ["a"]}) == query_hash({"tags": ["a"], "page": 1})
+    assert query_hash({"page": 1}) != query_hash({"page": 2})
+
+
+@pytest.mark.asyncio
+class TestReadCache:
+    """Test hits, invalidation and single-flight loading"""
+
+    async def test_miss_then_hit(self, cache):
+        loader = Loader()
+
+        first = await cache.fetch("u1", NOTES, {"page": 1}, loader)
+        second = await cache.fetch("u1", NOTES, {"page": 1}, loader)
+
+        assert json.loads(first) == json.loads(second) == {"call": 1}
+        assert loader.calls == 1
+
+    async def test_invalidate_bumps_generation(self, cache):
+        loader = Loader()
+        await cache.fetch("u1", NOTES, {"page": 1}, loader)
+        await cache.fetch("u1", PROJECTS, {"page": 1}, loader)
+        await cache.fetch("u2", NOTES, {"page": 1}, loader)
+
+        await cache.invalidate(["u1"], NOTES)
+
+        assert json.loads(await cache.fetch("u1", NOTES, {"page": 1}, loader)) == {"call": 4}
+        # Other resources and users keep their entries
+        assert json.loads(await cache.fetch("u1", PROJECTS, {"page": 1}, loader)) == {"call": 2}
+        assert json.loads(await cache.fetch("u2", NOTES, {"page": 1}, loader)) == {"call": 3}
+
+    async def test_write_during_load_is_not_cached_as_current(self, cache):
+        """A load that raced with a write is tagged with the old generation"""
+        async def racing_loader():
+            await cache.invalidate(["u1"], NOTES)
+            return {"stale": True}
+
+        await cache.fetch("u1", NOTES, {}, racing_loader)
+        loader = Loader()
+
+        assert json.loads(await cache.fetch("u1", NOTES, {}, loader)) == {"call": 1}
+
+    async def test_expired_generation_does_not_resurrect_entries(self, cache, redis):
+        loader = Loader()
+        await cache.fetch("u1", NOTES, {}, loader)
+        await cache.invalidate(["u1"], NOTES)
+        await cache.fetch("u1", NOTES, {}, loader)
+
+        await redis.delete(cache._generation_key("u1", NOTES))
+
+        assert json.loads(await cache.fetch("u1", NOTES, {}, loader)) == {"call": 3}
+
+    async def test_concurrent_misses_share_one_load(self, cache):
+        loader = Loader(delay=0.05)
+
+        bodies = await asyncio.gather(*(cache.fetch("u1", NOTES, {"q": "x"}, loader) for _ in range(5)))
+
+        assert loader.calls == 1
+        assert len(set(bodies)) == 1
+
+    async def test_cancelled_caller_does_not_fail_others(self, cache, redis):
+        """The first caller's load is cancelled with it; the second loads again"""
+        loader = Loader(delay=0.05)
+        first = asyncio.ensure_future(cache.fetch("u1", NOTES, {}, loader))
+        second = asyncio.ensure_future(cache.fetch("u1", NOTES, {}, loader))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+
+        assert json.loads(await second) == {"call": 2}
+        assert await redis.keys("*:lock") == []
+
+    async def test_other_worker_waits_for_fill(self, redis):
+        """A second worker waits on the fill lock instead of loading"""
+        worker_a = ReadCache(redis_getter=lambda: redis)
+        worker_b = ReadCache(redis_getter=lambda: redis)
+        slow, fast = Loader(delay=0.1), Loader()
+
+        bodies = await asyncio.gather(
+            worker_a.fetch("u1", NOTES, {}, slow),
+            worker_b.fetch("u1", NOTES, {}, fast),
+        )
+
+        assert slow.calls == 1 and fast.calls == 0
+        assert bodies[0] == bodies[1]
+
+    async def test_large_bodies_are_not_cached(self, cache, monkeypatch):
+        monkeypatch.setattr(read_cache_module, "READ_CACHE_MAX_BYTES", 5)
+        loader = Loader()
+
+        await cache.fetch("u1", NOTES, {}, loader)
+        await cache.fetch("u1", NOTES, {}, loader)
+
+        assert loader.calls == 2
+
+    async def test_redis_down_bypasses_cache(self, unavailable_redis):
+        cache = ReadCache(redis_getter=unavailable_redis)
+        loader = Loader()
+
+        assert json.loads(await cache.fetch("u1", NOTES, {}, loader)) == {"call": 1}
+        await cache.invalidate(["u1"], NOTES)
+
+    async def test_fills_read_from_the_primary(self, cache, unavailable_redis):
+        """Bodies stored under the current generation never come from a secondary"""
+        async def loader():
+            with mongo_profile(FAST_READ) as profile:
+                return {"profile": profile.name}
+
+        assert json.loads(await cache.fetch("u1", NOTES, {}, loader)) == {"profile": "fast_read_primary"}
+
+        bypass = ReadCache(redis_getter=unavailable_redis)
+        assert json.loads(await bypass.fetch("u1", NOTES, {}, loader)) == {"profile": "fast_read"}
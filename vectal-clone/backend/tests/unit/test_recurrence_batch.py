@@ -0,0 +1,120 @@
+"""
+Unit tests for vectorized batch recurrence expansion
+"""
+import random
+import pytest
+from datetime import datetime, timedelta, timezone
+from utils.recurrence_batch import expand_batch
+from utils.rrule_cache import occurrences_between
+
+
+def _per_task(items, start, end):
+    """Reference expansion with the per-task dateutil loop"""
+    return [
+        sorted(occurrences_between(rule, dtstart, start, end))
+        for dtstart, rule in items
+    ]
+
+
+def _batched(items, start, end):
+    """Batch expansion regrouped per input item"""
+    batch = expand_batch(items, start, end)
+    grouped = [[] for _ in items]
+    for index, occurs_at in zip(batch.item_index.tolist(), batch.to_datetimes()):
+        grouped[index].append(occurs_at)
+    return grouped
+
+
+class TestExpandBatch:
+    """Test batch expansion matches dateutil"""
+
+    def test_simple_frequencies(self):
+        """Test plain DAILY/WEEKLY/MONTHLY/YEARLY rules"""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        items = [
+            (datetime(2023, 12, 30, 9, 0), "daily"),
+            (datetime(2024, 1, 3, 14, 30, tzinfo=timezone.utc), "FREQ=WEEKLY;INTERVAL=2"),
+            (datetime(2023, 11, 15, 8, 0), "FREQ=MONTHLY"),
+            (datetime(2020, 6, 1), "FREQ=YEARLY"),
+        ]
+
+        assert _batched(items, start, end) == _per_task(items, start, end)
+
+    def test_month_end_skips(self):
+        """Test day 31 and Feb 29 are skipped like dateutil does"""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        items = [
+            (datetime(2024, 1, 31, 9, 0), "FREQ=MONTHLY"),
+            (datetime(2024, 2, 29), "FREQ=YEARLY"),
+            (datetime(2024, 1, 31), "FREQ=MONTHLY;COUNT=5"),
+        ]
+
+        result = _batched(items, start, end)
+        assert result == _per_task(items, start, end)
+        assert len(result[1]) == 2  # 2024 and 2028
+
+    def test_count_and_until(self):
+        """Test COUNT and UNTIL bounds"""
+        start = datetime(2024, 1, 10, tzinfo=timezone.utc)
+        end = datetime(2024, 12, 31, tzinfo=timezone.utc)
+        items = [
+            (datetime(2024, 1, 1), "FREQ=DAILY;COUNT=15"),
+            (datetime(2024, 1, 1), "FREQ=WEEKLY;UNTIL=20240301T000000Z"),
+            (datetime(2024, 1, 5), "FREQ=MONTHLY;INTERVAL=3;COUNT=3"),
+        ]
+
+        result = _batched(items, start, end)
+        assert result == _per_task(items, start, end)
+        assert len(result[0]) == 6
+
+    def test_fallback_rules(self):
+        """Test BYxxx and sub-daily rules go through dateutil"""
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 4, 1, tzinfo=timezone.utc)
+        items = [
+            (datetime(2024, 1, 1), "FREQ=WEEKLY;BYDAY=MO,WE,FR"),
+            (datetime(2024, 1, 1), "FREQ=MONTHLY;BYMONTHDAY=-1"),
+            (datetime(2024, 3, 30), "FREQ=HOURLY;INTERVAL=6"),
+            (datetime(2024, 1, 1), "INVALID"),
+            (datetime(2024, 1, 1), ""),
+        ]
+
+        result = _batched(items, start, end)
+        assert result == _per_task(items, start, end)
+        assert result[3] == [] and result[4] == []
+
+    def test_sorted_by_time(self):
+        """Test results come back in chronological order"""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        items = [
+            (datetime(2024, 1, 1, 12, 0), "daily"),
+            (datetime(2024, 1, 1, 6, 0), "FREQ=WEEKLY;BYDAY=TU"),
+        ]
+
+        batch = expand_batch(items, start, end)
+        assert list(batch.occurs_at) == sorted(batch.occurs_at)
+        assert batch.counts(2).tolist() == [31, 5]
+
+    def test_random_rules_match(self):
+        """Test randomized simple rules against the per-task loop"""
+        rng = random.Random(1234)
+        frequencies = ["DAILY", "WEEKLY", "MONTHLY", "YEARLY"]
+        items = []
+        for _ in range(300):
+            dtstart = datetime(2018, 1, 1) + timedelta(
+                days=rng.randrange(0, 3000), minutes=rng.randrange(0, 1440)
+            )
+            rule = f"FREQ={rng.choice(frequencies)};INTERVAL={rng.randint(1, 4)}"
+            if rng.random() < 0.3:
+                rule += f";COUNT={rng.randint(1, 40)}"
+            elif rng.random() < 0.3:
+                until = dtstart + timedelta(days=rng.randrange(0, 1500))
+                rule += f";UNTIL={until.strftime('%Y%m%dT%H%M%SZ')}"
+            items.append((dtstart, rule))
+
+        start = datetime(2022, 3, 15, tzinfo=timezone.utc)
+        end = datetime(2023, 9, 1, tzinfo=timezone.utc)
+        assert _batched(items, start, end) == _per_task(items, start, end)
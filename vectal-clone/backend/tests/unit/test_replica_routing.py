@@ -0,0 +1,148 @@
+"""
+Unit tests for read replica routing
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+
+from api.middleware.read_your_writes import ReadYourWritesMiddleware
+from utils.datastores import DatastoreRegistry
+from utils.replica_routing import PRIMARY, REPLICA, ReplicaRouter, writer_key
+from utils.resources import PG_STATEMENT_CACHE_SIZE, AppResources
+
+PRIMARY_URL = "postgresql+asyncpg://app@primary:5432/vectal"
+REPLICA_URL = "postgresql+asyncpg://app@replica:5432/vectal"
+
+
+@pytest.fixture
+def router(redis):
+    return ReplicaRouter(redis_getter=lambda: redis, max_lag=0.05, check_interval=0.05)
+
+
+@pytest.fixture
+async def resources():
+    resources = AppResources(
+        database_url=PRIMARY_URL, replica_url=REPLICA_URL, registry=DatastoreRegistry()
+    )
+    yield resources
+    await resources.shutdown()
+
+
+def test_writer_key():
+    assert writer_key(None) is None
+    assert writer_key("Bearer a") == writer_key("Bearer a") != writer_key("Bearer b")
+    assert "Bearer" not in writer_key("Bearer a")
+
+
+@pytest.mark.asyncio
+class TestResources:
+    """Test pool options and the replica engine"""
+
+    async def test_engine_options(self, resources, monkeypatch):
+        import sqlalchemy.ext.asyncio
+
+        created = {}
+        monkeypatch.setattr(
+            sqlalchemy.ext.asyncio, "create_async_engine", lambda url, **options: created.setdefault(url, options)
+        )
+
+        resources.engine
+        resources.replica_engine
+
+        assert set(created) == {PRIMARY_URL, REPLICA_URL}
+        options = created[REPLICA_URL]
+        assert options["pool_size"] == resources.pg_pool_size
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"]["prepared_statement_cache_size"] == PG_STATEMENT_CACHE_SIZE
+        resources._engine = resources._replica_engine = None
+
+    async def test_no_replica_reads_from_primary_factory(self):
+        resources = AppResources(database_url=PRIMARY_URL, registry=DatastoreRegistry())
+
+        assert resources.replica_engine is None
+        assert resources.replica_session_factory is resources.session_factory
+        await resources.shutdown()
+
+
+@pytest.mark.asyncio
+class TestReplicaRouter:
+    """Test the lag guard and read-your-writes"""
+
+    async def test_without_replica(self, router):
+        resources = AppResources(database_url=PRIMARY_URL, registry=DatastoreRegistry())
+        router.lag = 0.0
+
+        assert await router.route(resources, None) == PRIMARY
+
+    async def test_lag_guard(self, router, resources):
+        assert await router.route(resources, None) == PRIMARY  # lag not measured yet
+
+        router.lag = 0.01
+        assert await router.route(resources, None) == REPLICA
+
+        router.lag = 1.0
+        assert await router.route(resources, None) == PRIMARY
+
+    async def test_recent_writer_reads_from_primary(self, router, resources, redis):
+        router.lag = 0.0
+        other_worker = ReplicaRouter(redis_getter=lambda: redis, max_lag=0.05, check_interval=0.05)
+
+        await other_worker.mark_write("w1")
+
+        assert await router.route(resources, "w1") == PRIMARY
+        assert await router.route(resources, "w2") == REPLICA
+
+        await asyncio.sleep(router.window + 0.05)
+        assert await router.route(resources, "w1") == REPLICA
+
+    async def test_redis_down_assumes_recent_write(self, resources, unavailable_redis):
+        router = ReplicaRouter(redis_getter=unavailable_redis)
+        router.lag = 0.0
+
+        assert await router.route(resources, "w1") == PRIMARY
+        assert await router.route(resources, None) == REPLICA
+
+    async def test_unreachable_replica_resets_lag(self, router, resources):
+        router.lag = 0.0
+
+        class Unreachable:
+            replica_engine = None
+
+        assert await router.check_lag(Unreachable()) is None
+        assert router.lag is None
+
+
+@pytest.mark.asyncio
+class TestReadYourWritesMiddleware:
+    """Test which requests mark their caller as a writer"""
+
+    @pytest.fixture
+    def app(self, router):
+        app = FastAPI()
+
+        @app.post("/items")
+        async def create(fail: bool = False):
+            if fail:
+                raise HTTPException(status_code=400, detail="bad")
+            return {"ok": True}
+
+        @app.get("/items")
+        async def list_items():
+            return []
+
+        app.add_middleware(ReadYourWritesMiddleware, router=router)
+        return app
+
+    async def test_marks_successful_writes(self, app, router):
+        headers = {"Authorization": "Bearer token"}
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/items", headers=headers)
+            assert not await router.wrote_recently(writer_key("Bearer token"))
+
+            await client.post("/items", params={"fail": True}, headers=headers)
+            assert not await router.wrote_recently(writer_key("Bearer token"))
+
+            await client.post("/items", headers=headers)
+            assert await router.wrote_recently(writer_key("Bearer token"))
@@ -0,0 +1,112 @@
+"""
+Unit tests for the application resource container
+"""
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from api.routes import readiness
+from utils.datastores import DatastoreRegistry
+from utils.resources import REDIS_SOCKET_TIMEOUT, AppResources, ShuttingDown
+
+
+def make_resources() -> AppResources:
+    return AppResources(registry=DatastoreRegistry())
+
+
+async def chunks(n: int, delay: float = 0):
+    for i in range(n):
+        await asyncio.sleep(delay)
+        yield f"chunk-{i}"
+
+
+@pytest.mark.asyncio
+class TestAppResources:
+    """Test lazy clients and stream draining"""
+
+    async def test_clients_created_on_first_use(self):
+        """Test pools are not created until a client is accessed"""
+        resources = make_resources()
+        assert resources._engine is None
+        assert resources._redis is None
+
+        assert resources.redis is resources.redis
+        await resources.shutdown()
+
+    async def test_redis_socket_timeouts(self):
+        """Test a Redis that stops responding cannot stall requests indefinitely"""
+        resources = make_resources()
+        options = resources.redis.connection_pool.connection_kwargs
+
+        assert options["socket_timeout"] == REDIS_SOCKET_TIMEOUT
+        assert options["socket_connect_timeout"] > 0
+        await resources.shutdown()
+
+    async def test_track_stream(self):
+        """Test tracked streams pass chunks through and are counted while open"""
+        resources = make_resources()
+        stream = resources.track_stream(chunks(3))
+
+        first = await stream.__anext__()
+        assert first == "chunk-0"
+        assert resources.active_streams == 1
+
+        rest = [chunk async for chunk in stream]
+        assert rest == ["chunk-1", "chunk-2"]
+        assert resources.active_streams == 0
+
+    async def test_drain_waits_for_streams(self):
+        """Test shutdown drain waits for in-flight streams to finish"""
+        resources = make_resources()
+
+        async def consume():
+            return [chunk async for chunk in resources.track_stream(chunks(5, delay=0.01))]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.005)
+
+        assert await resources.drain(timeout=1) is True
+        assert consumer.done()
+        assert len(consumer.result()) == 5
+
+    async def test_drain_timeout(self):
+        """Test drain gives up after its timeout"""
+        resources = make_resources()
+        stream = resources.track_stream(chunks(1, delay=10))
+        consumer = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+
+        assert await resources.drain(timeout=0.01) is False
+        assert resources.draining is True
+        consumer.cancel()
+
+    async def test_no_new_streams_while_draining(self):
+        """Test streams are refused once shutdown has started"""
+        resources = make_resources()
+        stream = resources.track_stream(chunks(2, delay=0.01))
+        consumer = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+
+        drain = asyncio.create_task(resources.drain(timeout=1))
+        await asyncio.sleep(0)
+        with pytest.raises(ShuttingDown):
+            resources.track_stream(chunks(1))
+
+        assert await consumer == "chunk-0"
+        assert [chunk async for chunk in stream] == ["chunk-1"]
+        assert await drain is True
+
+    async def test_readiness_fails_while_draining(self):
+        """Test the load balancer is told to stop routing to a draining worker"""
+        app = FastAPI()
+        app.include_router(readiness.router)
+        app.state.resources = make_resources()
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            assert (await client.get("/health/ready")).json()["draining"] is False
+
+            await app.state.resources.drain(timeout=0)
+            response = await client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["draining"] is True
@@ -0,0 +1,45 @@
+"""
+Unit tests for pre-validated model responses
+"""
+import json
+import pytest
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from models.schemas.chat import ConversationDetailResponse, MessageResponse
+from utils.responses import ModelResponse
+
+
+def make_conversation() -> ConversationDetailResponse:
+    now = datetime(2024, 1, 1, 9, 30, 15, 123456)
+    return ConversationDetailResponse(
+        id="conv-1",
+        user_id="user-1",
+        title=None,
+        model="gpt-4",
+        total_tokens=10,
+        is_archived=False,
+        created_at=now,
+        updated_at=now,
+        last_message_at=None,
+        message_count=1,
+        messages=[MessageResponse(id="m1", role="user", content="Hi \"there\" ✓", timestamp=now)]
+    )
+
+
+class TestModelResponse:
+    """Test the model_dump_json fast path"""
+
+    def test_matches_default_encoding(self):
+        """Test the body decodes to the same JSON FastAPI would produce"""
+        model = make_conversation()
+        response = ModelResponse(model)
+
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == jsonable_encoder(model)
+
+    def test_plain_content(self):
+        """Test non-model content is encoded with orjson"""
+        response = ModelResponse({"items": [], 1: "one"}, status_code=201)
+
+        assert response.status_code == 201
+        assert json.loads(response.body) == {"items": [], "1": "one"}
@@ -0,0 +1,90 @@
+"""
+Unit tests for the parsed recurrence rule cache
+"""
+import pytest
+from datetime import datetime, timezone
+from utils.rrule_cache import (
+    parse_rule,
+    bind_rule,
+    normalize_rule,
+    occurrences_between
+)
+
+
+class TestRuleParsing:
+    """Test rule normalization and caching"""
+    
+    def test_normalize_simple_rule(self):
+        """Test shorthand rules become RRULE syntax"""
+        assert normalize_rule("daily") == "FREQ=DAILY;INTERVAL=1"
+        assert normalize_rule("RRULE:FREQ=WEEKLY") == "FREQ=WEEKLY"
+    
+    def test_normalize_floating_until(self):
+        """Test floating UNTIL values are read as UTC"""
+        assert normalize_rule("FREQ=DAILY;UNTIL=20260110") == "FREQ=DAILY;UNTIL=20260110T235959Z"
+        assert normalize_rule("FREQ=DAILY;UNTIL=20260110T120000") == "FREQ=DAILY;UNTIL=20260110T120000Z"
+        assert normalize_rule("FREQ=DAILY;UNTIL=20260110T120000Z") == "FREQ=DAILY;UNTIL=20260110T120000Z"
+    
+    def test_parse_rule_cached(self):
+        """Test the same rule string is parsed once"""
+        parse_rule.cache_clear()
+        first = parse_rule("FREQ=DAILY;INTERVAL=2")
+        second = parse_rule("FREQ=DAILY;INTERVAL=2")
+        
+        assert first is second
+        assert parse_rule.cache_info().hits == 1
+    
+    def test_invalid_rule(self):
+        """Test invalid rules parse to None"""
+        assert parse_rule("INVALID") is None
+        assert bind_rule("INVALID", datetime(2024, 1, 1)) is None
+
+
+class TestOccurrencesBetween:
+    """Test range expansion"""
+    
+    def test_daily_range(self):
+        """Test daily occurrences in a half-open range"""
+        occurrences = occurrences_between(
+            "FREQ=DAILY;INTERVAL=1",
+            datetime(2024, 1, 1, 12, 0, 0),
+            datetime(2024, 1, 3, tzinfo=timezone.utc),
+            datetime(2024, 1, 6, 12, 0, 0, tzinfo=timezone.utc)
+        )
+        
+        assert [o.day for o in occurrences] == [3, 4, 5]
+    
+    def test_weekly_uses_task_start_weekday(self):
+        """Test bound rules take their weekday from the task, not the template"""
+        occurrences = occurrences_between(
+            "weekly",
+            datetime(2024, 1, 3, 9, 0, 0, tzinfo=timezone.utc),  # Wednesday
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 31, tzinfo=timezone.utc)
+        )
+        
+        assert len(occurrences) == 4
+        assert all(o.weekday() == 2 for o in occurrences)
+    
+    def test_monthly_with_until(self):
+        """Test rules with UNTIL stop expanding"""
+        occurrences = occurrences_between(
+            "FREQ=MONTHLY;UNTIL=20240315T000000Z",
+            datetime(2024, 1, 10, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2025, 1, 1, tzinfo=timezone.utc)
+        )
+        
+        assert [o.month for o in occurrences] == [1, 2, 3]
+    
+    def test_date_only_until_includes_last_day(self):
+        """Test a date-only UNTIL keeps the rule valid and covers that day"""
+        occurrences = occurrences_between(
+            "FREQ=DAILY;UNTIL=20260110",
+            datetime(2026, 1, 1, 9, tzinfo=timezone.utc),
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+            datetime(2026, 2, 1, tzinfo=timezone.utc)
+        )
+        
+        assert len(occurrences) == 10
+        assert occurrences[-1] == datetime(2026, 1, 10, 9, tzinfo=timezone.utc)
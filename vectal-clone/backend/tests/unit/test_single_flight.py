@@ -0,0 +1,119 @@
+"""
+Unit tests for in-process single-flight
+"""
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight, coalesce
+
+
+class Repository:
+    """Counts executions of a slow read"""
+
+    flight = SingleFlight()
+    calls = 0
+
+    @staticmethod
+    @coalesce(flight=flight)
+    async def progress(db, project_id, user_id, fields=None):
+        Repository.calls += 1
+        await asyncio.sleep(0.05)
+        return {"project_id": project_id, "user_id": user_id, "session": db}
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    Repository.calls = 0
+
+
+@pytest.mark.asyncio
+class TestCoalesce:
+    """Test sharing of concurrent identical calls"""
+
+    async def test_identical_calls_share_one_execution(self):
+        results = await asyncio.gather(*(Repository.progress(f"db{i}", "p1", "u1") for i in range(5)))
+
+        assert Repository.calls == 1
+        assert all(result is results[0] for result in results)
+        assert len(Repository.flight) == 0
+
+    async def test_session_is_not_part_of_key_but_user_is(self):
+        await asyncio.gather(
+            Repository.progress("db1", "p1", "u1"),
+            Repository.progress("db2", "p1", "u2"),
+            Repository.progress("db3", "p2", "u1"),
+            Repository.progress("db4", project_id="p1", user_id="u1"),
+        )
+
+        assert Repository.calls == 3
+
+    async def test_unhashable_arguments(self):
+        await asyncio.gather(
+            Repository.progress("db1", "p1", "u1", fields=["a", "b"]),
+            Repository.progress("db2", "p1", "u1", fields=["a", "b"]),
+            Repository.progress("db3", "p1", "u1", fields={"a": 1}),
+        )
+
+        assert Repository.calls == 2
+
+    async def test_results_do_not_outlive_the_burst(self):
+        await Repository.progress("db1", "p1", "u1")
+        await Repository.progress("db1", "p1", "u1")
+
+        assert Repository.calls == 2
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Test errors and cancellation"""
+
+    async def test_error_reaches_every_caller(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "k" not in flight
+
+    async def test_cancelled_leader_does_not_fail_followers(self):
+        """The leader's call is cancelled with it; followers rerun their own"""
+        flight = SingleFlight()
+        finished = []
+
+        def load(owner):
+            async def run():
+                await asyncio.sleep(0.05)
+                finished.append(owner)
+                return owner
+            return run
+
+        leader = asyncio.ensure_future(flight.do("k", load("leader")))
+        follower = asyncio.ensure_future(flight.do("k", load("follower")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "follower"
+        assert finished == ["follower"]
+        assert leader.cancelled()
+
+    async def test_cancelled_follower_leaves_call_running(self):
+        flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.05)
+            return 42
+
+        leader = asyncio.ensure_future(flight.do("k", load))
+        follower = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+
+        assert await leader == 42
+        assert follower.cancelled()
@@ -0,0 +1,154 @@
+"""
+Unit tests for bulk task import parsing, resolution and batch reordering
+"""
+import uuid
+
+import pytest
+from services.task_bulk_service import TaskBulkService
+from services.task_ordering_service import TaskOrderingService
+from utils.fractional_index import generate_n_keys_between
+
+
+class TestImportParsing:
+    """Test CSV and NDJSON row parsing and validation"""
+    
+    def test_parse_csv(self):
+        """Test parsing CSV with labels and empty cells"""
+        body = b"title,priority,labels\nFirst,2,work;urgent\nSecond,,\n"
+        rows, errors = TaskBulkService.validate_rows(TaskBulkService.parse_rows(body, "csv"))
+        
+        assert errors == []
+        assert rows[0][1].labels == ["work", "urgent"]
+        assert rows[0][1].priority == 2
+        assert rows[1][1].priority == 0
+        assert rows[1][1].status == "pending"
+    
+    def test_parse_ndjson(self):
+        """Test parsing NDJSON skips blank lines"""
+        body = b'{"title": "First"}\n\n{"title": "Second", "status": "completed"}\n'
+        rows, errors = TaskBulkService.validate_rows(TaskBulkService.parse_rows(body, "ndjson"))
+        
+        assert errors == []
+        assert [row.title for _, row in rows] == ["First", "Second"]
+    
+    def test_invalid_rows_reported(self):
+        """Test per-row errors for invalid JSON and invalid values"""
+        body = b'{"title": "Ok"}\nnot json\n{"title": "Bad", "priority": 9}\n'
+        rows, errors = TaskBulkService.validate_rows(TaskBulkService.parse_rows(body, "ndjson"))
+        
+        assert len(rows) == 1
+        assert [e.row for e in errors] == [2, 3]
+        assert "priority" in errors[1].errors[0]
+
+
+class TestHierarchyResolution:
+    """Test parent_ref resolution inside an import batch"""
+    
+    def _rows(self, body: bytes):
+        rows, _ = TaskBulkService.validate_rows(TaskBulkService.parse_rows(body, "csv"))
+        return rows
+    
+    def test_parent_before_child(self):
+        """Test children are ordered after their parents"""
+        rows = self._rows(b"ref,title,parent_ref\nc,Child,p\np,Parent,\n")
+        resolved, errors = TaskBulkService.resolve_hierarchy(rows)
+        
+        assert errors == []
+        assert [row.title for _, row, _, _ in resolved] == ["Parent", "Child"]
+        parent_id = resolved[0][2]
+        assert resolved[1][3] == parent_id
+    
+    def test_unknown_parent_ref(self):
+        """Test rows referencing a missing ref fail"""
+        rows = self._rows(b"ref,title,parent_ref\na,Orphan,missing\n")
+        resolved, errors = TaskBulkService.resolve_hierarchy(rows)
+        
+        assert resolved == []
+        assert "not found" in errors[0].errors[0]
+    
+    def test_cycle_detected(self):
+        """Test parent_ref cycles fail"""
+        rows = self._rows(b"ref,title,parent_ref\na,A,b\nb,B,a\n")
+        resolved, errors = TaskBulkService.resolve_hierarchy(rows)
+        
+        assert resolved == []
+        assert all("cycle" in e.errors[0] for e in errors)
+    
+    def test_duplicate_ref(self):
+        """Test duplicate refs are rejected"""
+        rows = self._rows(b"ref,title\na,First\na,Second\n")
+        resolved, errors = TaskBulkService.resolve_hierarchy(rows)
+        
+        assert len(resolved) == 1
+        assert errors[0].row == 2
+
+
+class TestReorderPlanning:
+    """Test placing batch-reordered tasks by key"""
+    
+    def _group(self, count: int, keyed: bool = True):
+        keys = generate_n_keys_between(None, None, count) if keyed else [None] * count
+        return [(uuid.uuid4(), key, i) for i, key in enumerate(keys)]
+    
+    def _apply(self, siblings, rows):
+        changed = {task_id: (key, position) for task_id, key, position in rows}
+        final = [(task_id, *changed.get(task_id, (key, position))) for task_id, key, position in siblings]
+        by_key = [task_id for task_id, _, _ in sorted(final, key=lambda s: s[1])]
+        by_position = [task_id for task_id, _, _ in sorted(final, key=lambda s: s[2])]
+        return by_key, by_position
+    
+    def test_reorder_moves_keys_and_positions(self):
+        """Test key order and integer positions both follow the new order"""
+        siblings = self._group(3)
+        ids = [task_id for task_id, _, _ in siblings]
+        
+        rows = TaskOrderingService.plan_reorder(siblings, {ids[2]: 0, ids[0]: 2})
+        by_key, by_position = self._apply(siblings, rows)
+        
+        assert by_key == by_position == [ids[2], ids[1], ids[0]]
+    
+    def test_unmoved_tasks_keep_keys(self):
+        """Test only moved tasks get new keys"""
+        siblings = self._group(5)
+        ids = [task_id for task_id, _, _ in siblings]
+        
+        rows = TaskOrderingService.plan_reorder(siblings, {ids[4]: 1})
+        keys = dict((task_id, key) for task_id, key, _ in siblings)
+        
+        assert [task_id for task_id, key, _ in rows if key != keys[task_id]] == [ids[4]]
+        assert self._apply(siblings, rows)[0] == [ids[0], ids[4], ids[1], ids[2], ids[3]]
+    
+    def test_keyless_group_is_keyed(self):
+        """Test a legacy group without keys is keyed in its new order"""
+        siblings = self._group(3, keyed=False)
+        ids = [task_id for task_id, _, _ in siblings]
+        
+        rows = TaskOrderingService.plan_reorder(siblings, {ids[0]: 5})
+        
+        assert all(key is not None for _, key, _ in rows)
+        assert self._apply(siblings, rows)[0] == [ids[1], ids[2], ids[0]]
+
+
+class TestCycleCheck:
+    """Test detection of parent cycles"""
+    
+    def test_descendant_as_parent(self):
+        """Test a task placed under its own grandchild is a cycle"""
+        root, child, grandchild = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        parent_of = {root: None, child: root, grandchild: child}
+        
+        assert TaskOrderingService.creates_cycle(parent_of, root) is False
+        parent_of[root] = grandchild
+        assert TaskOrderingService.creates_cycle(parent_of, root) is True
+    
+    def test_self_as_parent(self):
+        """Test a task cannot be its own parent"""
+        task_id = uuid.uuid4()
+        
+        assert TaskOrderingService.creates_cycle({task_id: task_id}, task_id) is True
+    
+    def test_existing_cycle_elsewhere_terminates(self):
+        """Test a cycle that does not include the task is not reported"""
+        a, b, task_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        
+        assert TaskOrderingService.creates_cycle({a: b, b: a, task_id: a}, task_id) is False
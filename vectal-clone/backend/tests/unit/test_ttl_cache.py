@@ -0,0 +1,51 @@
+"""
+Unit tests for the in-process TTL cache
+"""
+import time
+import pytest
+from utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test expiry and LRU eviction"""
+
+    def test_get_set(self):
+        """Test stored values are returned until they expire"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert "a" in cache
+        assert cache.get("missing", "default") == "default"
+
+    def test_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_discard_where(self):
+        """Test removing entries by key predicate"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set(("u1", "t1"), 1)
+        cache.set(("u1", "t2"), 2)
+        cache.set(("u2", "t1"), 3)
+
+        assert cache.discard_where(lambda key: key[0] == "u1") == 2
+        assert len(cache) == 1
+        assert cache.pop(("u2", "t1")) == 3
@@ -0,0 +1,106 @@
+"""
+Content-Encoding negotiation and compressors
+
+gzip is always available; Brotli and zstd are used when the optional
+brotli / zstandard packages are installed.
+"""
+from typing import Dict, Optional
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Levels chosen for JSON: most of the size win at a fraction of the max-level CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+BROTLI_STREAM_QUALITY = 4
+ZSTD_LEVEL = 3
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = [
+    name for name, available in (
+        ("zstd", zstandard is not None),
+        ("br", brotli is not None),
+        ("gzip", True),
+    ) if available
+]
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Encodings and q-values from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate_encoding(header: str, preference=None) -> Optional[str]:
+    """Best supported encoding the client accepts, or None for identity"""
+    accepted = _parse_accept_encoding(header or "")
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in preference or ENCODING_PREFERENCE:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body"""
+    if encoding == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_STREAM_QUALITY)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compressed bytes for chunk, flushed so the client can decode them now"""
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        """Trailing bytes ending the stream"""
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
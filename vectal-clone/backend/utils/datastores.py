@@ -0,0 +1,152 @@
+"""
+Datastore connection registry
+
+Stores are connected concurrently at startup, each bounded by its own
+timeout, so one slow datastore no longer serializes the whole boot. Lazy
+stores are warmed up in the background and awaited on first use through
+ensure(). Connection state and latency are kept for readiness reporting.
+"""
+from typing import Awaitable, Callable, Dict, Optional, Any
+from time import perf_counter
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+CONNECTING = "connecting"
+READY = "ready"
+FAILED = "failed"
+
+
+class DatastoreUnavailable(Exception):
+    """Raised when a store could not be connected"""
+
+
+class Datastore:
+    """One registered datastore and its connection state"""
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Awaitable[Any]],
+        close: Optional[Callable[[], Awaitable[Any]]],
+        timeout: float,
+        required: bool,
+        lazy: bool
+    ):
+        self.name = name
+        self.connect = connect
+        self.close = close
+        self.timeout = timeout
+        self.required = required
+        self.lazy = lazy
+        self.status = PENDING
+        self.latency_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "lazy": self.lazy,
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+        }
+
+
+class DatastoreRegistry:
+    """Concurrent connect/close and readiness of the app's datastores"""
+
+    def __init__(self):
+        self.stores: Dict[str, Datastore] = {}
+
+    def register(
+        self,
+        name: str,
+        connect: Callable[[], Awaitable[Any]],
+        close: Optional[Callable[[], Awaitable[Any]]] = None,
+        timeout: float = 10,
+        required: bool = True,
+        lazy: bool = False
+    ):
+        """Add a store; lazy stores never block startup"""
+        self.stores[name] = Datastore(name, connect, close, timeout, required and not lazy, lazy)
+
+    async def _connect(self, store: Datastore) -> bool:
+        store.status = CONNECTING
+        started = perf_counter()
+        try:
+            await asyncio.wait_for(store.connect(), timeout=store.timeout)
+        except asyncio.TimeoutError:
+            store.status = FAILED
+            store.error = f"Timed out after {store.timeout}s"
+        except Exception as e:
+            store.status = FAILED
+            store.error = str(e)
+        else:
+            store.status = READY
+            store.error = None
+        store.latency_ms = round((perf_counter() - started) * 1000, 1)
+
+        if store.status == READY:
+            logger.info(f"Connected to {store.name} in {store.latency_ms}ms")
+        else:
+            logger.error(f"Failed to connect to {store.name}: {store.error}")
+        return store.status == READY
+
+    def _start(self, store: Datastore) -> asyncio.Task:
+        """Connection attempt shared by concurrent callers"""
+        if store.task is None or (store.task.done() and store.status == FAILED):
+            store.task = asyncio.create_task(self._connect(store))
+        return store.task
+
+    async def connect_all(self):
+        """Connect eager stores concurrently and start warming up lazy ones.
+
+        Raises DatastoreUnavailable if a required store failed.
+        """
+        eager = [s for s in self.stores.values() if not s.lazy]
+        await asyncio.gather(*(self._start(s) for s in eager))
+
+        for store in self.stores.values():
+            if store.lazy:
+                self._start(store)
+
+        failed = [s.name for s in eager if s.required and s.status != READY]
+        if failed:
+            raise DatastoreUnavailable(f"Required datastores unavailable: {', '.join(failed)}")
+
+    async def ensure(self, name: str):
+        """Wait for a store to be connected, connecting it if needed"""
+        store = self.stores[name]
+        if store.status != READY and not await self._start(store):
+            raise DatastoreUnavailable(f"{name} unavailable: {store.error}")
+
+    async def close_all(self):
+        """Close every store that was connected"""
+        for store in self.stores.values():
+            if store.task is not None and not store.task.done():
+                store.task.cancel()
+
+        stores = [s for s in self.stores.values() if s.close and s.status == READY]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(s.close(), timeout=s.timeout) for s in stores),
+            return_exceptions=True
+        )
+        for store, result in zip(stores, results):
+            store.status = PENDING
+            store.task = None
+            if isinstance(result, Exception):
+                logger.error(f"Error closing {store.name}: {result}")
+
+    def readiness(self) -> Dict[str, Any]:
+        """Overall readiness plus per-store state"""
+        return {
+            "ready": all(s.status == READY for s in self.stores.values() if s.required),
+            "stores": {name: store.to_dict() for name, store in self.stores.items()},
+        }
+
+
+datastores = DatastoreRegistry()
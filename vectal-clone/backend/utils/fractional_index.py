@@ -0,0 +1,211 @@
+"""
+Fractional indexing utilities for ordering keys
+
+Keys are base-62 strings that sort lexicographically (byte order). A key
+can always be generated strictly between any two existing keys, so moving
+an item only rewrites that item's key instead of renumbering siblings.
+
+Each key is an "integer part" followed by an optional fractional part. The
+head character of the integer part encodes its length ('a' = 1 digit,
+'b' = 2 digits, ... and 'Z' = 1 digit going downwards), which keeps keys
+short when items are appended or prepended repeatedly.
+"""
+from typing import Optional, List
+
+BASE_62_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Smallest integer part; nothing can be generated before a bare key like this
+SMALLEST_INTEGER = "A" + BASE_62_DIGITS[0] * 26
+
+
+def _midpoint(a: str, b: Optional[str], digits: str = BASE_62_DIGITS) -> str:
+    """Fractional part strictly between a and b (b=None means no upper bound)"""
+    zero = digits[0]
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+    if a[-1:] == zero or (b is not None and b[-1:] == zero):
+        raise ValueError("Fractional part has a trailing zero")
+
+    if b is not None:
+        # Skip the common prefix
+        n = 0
+        while (a[n] if n < len(a) else zero) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:], digits)
+
+    digit_a = digits.index(a[0]) if a else 0
+    digit_b = digits.index(b[0]) if b is not None else len(digits)
+
+    if digit_b - digit_a > 1:
+        return digits[(digit_a + digit_b + 1) // 2]
+
+    # Digits are consecutive
+    if b is not None and len(b) > 1:
+        return b[0]
+    return digits[digit_a] + _midpoint(a[1:], None, digits)
+
+
+def _integer_length(head: str) -> int:
+    """Length of the integer part given its head character"""
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    """Integer part of a key"""
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length]
+
+
+def _increment_integer(x: str, digits: str) -> Optional[str]:
+    """Next integer part, or None when the key space is exhausted"""
+    head, body = x[0], list(x[1:])
+    for i in reversed(range(len(body))):
+        d = digits.index(body[i]) + 1
+        if d < len(digits):
+            body[i] = digits[d]
+            return head + "".join(body)
+        body[i] = digits[0]
+
+    # Carried out of the integer part
+    if head == "Z":
+        return "a" + digits[0]
+    if head == "z":
+        return None
+    new_head = chr(ord(head) + 1)
+    if new_head > "a":
+        body.append(digits[0])
+    else:
+        body.pop()
+    return new_head + "".join(body)
+
+
+def _decrement_integer(x: str, digits: str) -> Optional[str]:
+    """Previous integer part, or None when the key space is exhausted"""
+    head, body = x[0], list(x[1:])
+    for i in reversed(range(len(body))):
+        d = digits.index(body[i]) - 1
+        if d >= 0:
+            body[i] = digits[d]
+            return head + "".join(body)
+        body[i] = digits[-1]
+
+    # Borrowed out of the integer part
+    if head == "a":
+        return "Z" + digits[-1]
+    if head == "A":
+        return None
+    new_head = chr(ord(head) - 1)
+    if new_head < "Z":
+        body.append(digits[-1])
+    else:
+        body.pop()
+    return new_head + "".join(body)
+
+
+def validate_key(key: str, digits: str = BASE_62_DIGITS):
+    """Raise ValueError if key is not a valid order key"""
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key: {key!r}")
+    integer = _integer_part(key)
+    if any(c not in digits for c in key[1:]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    if key[len(integer):][-1:] == digits[0]:
+        raise ValueError(f"Invalid order key: {key!r}")
+
+
+def generate_key_between(
+    a: Optional[str],
+    b: Optional[str],
+    digits: str = BASE_62_DIGITS
+) -> str:
+    """Generate a key strictly between a and b.
+
+    a=None means "before b" and b=None means "after a"; both None returns
+    the initial key.
+    """
+    if a is not None:
+        validate_key(a, digits)
+    if b is not None:
+        validate_key(b, digits)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + digits[0]
+        integer_b = _integer_part(b)
+        fraction_b = b[len(integer_b):]
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b, digits)
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement_integer(integer_b, digits)
+        if decremented is None:
+            raise ValueError("Cannot generate a key before the smallest key")
+        return decremented
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+
+    if b is None:
+        incremented = _increment_integer(integer_a, digits)
+        if incremented is None:
+            return integer_a + _midpoint(fraction_a, None, digits)
+        return incremented
+
+    integer_b = _integer_part(b)
+    fraction_b = b[len(integer_b):]
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b, digits)
+
+    incremented = _increment_integer(integer_a, digits)
+    if incremented is None:
+        raise ValueError("Cannot increment past the largest key")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None, digits)
+
+
+def generate_n_keys_between(
+    a: Optional[str],
+    b: Optional[str],
+    n: int,
+    digits: str = BASE_62_DIGITS
+) -> List[str]:
+    """Generate n ascending keys strictly between a and b"""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [generate_key_between(a, b, digits)]
+
+    if b is None:
+        key = generate_key_between(a, b, digits)
+        keys = [key]
+        for _ in range(n - 1):
+            key = generate_key_between(key, b, digits)
+            keys.append(key)
+        return keys
+
+    if a is None:
+        key = generate_key_between(a, b, digits)
+        keys = [key]
+        for _ in range(n - 1):
+            key = generate_key_between(a, key, digits)
+            keys.append(key)
+        keys.reverse()
+        return keys
+
+    mid = n // 2
+    key = generate_key_between(a, b, digits)
+    return [
+        *generate_n_keys_between(a, key, mid, digits),
+        key,
+        *generate_n_keys_between(key, b, n - mid - 1, digits),
+    ]
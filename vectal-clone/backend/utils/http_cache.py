@@ -0,0 +1,51 @@
+"""
+ETags and conditional GET helpers
+
+Routes derive a strong ETag from a cheap version stamp (updated_at,
+current_version, counts) and answer a matching If-None-Match with 304
+before loading or serializing the full resource.
+"""
+from typing import Any, Optional
+import hashlib
+
+from fastapi import Request
+from starlette.responses import Response
+
+# Mutable resources: cache, but revalidate every time
+CACHE_REVALIDATE = "private, no-cache"
+
+# Resources that never change once created (e.g. note versions)
+CACHE_IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag for a version stamp"""
+    stamp = "|".join(
+        part.isoformat() if hasattr(part, "isoformat") else str(part)
+        for part in parts
+    )
+    return '"' + hashlib.blake2b(stamp.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether If-None-Match matches an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cache_headers(etag: str, cache_control: str = CACHE_REVALIDATE) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(request: Request, etag: str, cache_control: str = CACHE_REVALIDATE) -> Optional[Response]:
+    """304 response if the client already holds this version, otherwise None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag, cache_control))
+    return None
@@ -0,0 +1,274 @@
+"""
+Prometheus metrics and per-request timings
+
+Histograms for HTTP routes, Postgres queries, MongoDB commands and OpenAI
+calls are exported on /metrics. While a request is being served, the same
+hooks also add their durations to the request's RequestTimings, which the
+metrics middleware turns into a Server-Timing header in development.
+
+The hooks also feed the per-request query counters in utils.query_counter.
+The SQLAlchemy and pymongo hooks are process-wide: call
+install_instrumentation() once, before any engine or client is created.
+"""
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import logging
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from utils.query_counter import record_mongo, record_sql
+
+logger = logging.getLogger(__name__)
+
+# Bucket edges in seconds
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DATASTORE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+OPENAI_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Postgres statement latency",
+    ["operation"],
+    buckets=DATASTORE_BUCKETS
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by operation profile",
+    ["profile", "command", "status"],
+    buckets=DATASTORE_BUCKETS
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "openai_request_duration_seconds",
+    "OpenAI call latency (whole stream for streaming completions)",
+    ["operation", "model", "status"],
+    buckets=OPENAI_BUCKETS
+)
+OPENAI_TIME_TO_FIRST_TOKEN = Histogram(
+    "openai_time_to_first_token_seconds",
+    "Time from request to first streamed content",
+    ["model"],
+    buckets=OPENAI_BUCKETS
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total",
+    "Tokens reported by OpenAI (streamed completions count content chunks)",
+    ["operation", "model", "kind"]
+)
+
+READ_CACHE_REQUESTS = Counter(
+    "read_cache_requests_total",
+    "Read cache lookups by outcome (hit, miss, coalesced, bypass)",
+    ["resource", "result"]
+)
+READ_CACHE_LOAD_DURATION = Histogram(
+    "read_cache_load_duration_seconds",
+    "Time to load a read cache miss from the primary store",
+    ["resource"],
+    buckets=HTTP_BUCKETS
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes_total",
+    "Read-only sessions by target (primary, replica) and reason",
+    ["target", "reason"]
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the Postgres read replica",
+    multiprocess_mode="max"
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls_total",
+    "Coalesced calls by method: leaders ran the call, shared awaited a leader",
+    ["method", "role"]
+)
+
+# Server-Timing metric names
+TIMING_POSTGRES = "pg"
+TIMING_MONGO = "mongo"
+TIMING_OPENAI = "openai"
+TIMING_CACHE = "cache"
+
+SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"})
+
+
+class RequestTimings:
+    """Datastore time spent on behalf of one request
+
+    Hooks may run on Motor's executor threads, so entries are appended
+    (atomic under the GIL) and only summed when the header is built.
+    """
+
+    __slots__ = ("started", "entries")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float]] = []
+
+    def add(self, name: str, seconds: float):
+        self.entries.append((name, seconds))
+
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        """name -> (total seconds, count)"""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for name, seconds in list(self.entries):
+            total, count = totals.get(name, (0.0, 0))
+            totals[name] = (total + seconds, count + 1)
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, with total time so far as 'app'"""
+        parts = [
+            f'{name};dur={total * 1000:.1f};desc="{count}x"'
+            for name, (total, count) in self.totals().items()
+        ]
+        parts.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """Begin collecting timings for the current request context"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _request_timings.get()
+
+
+def record_timing(name: str, seconds: float):
+    """Add a duration to the current request, if there is one"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def sql_operation(statement: str) -> str:
+    """Low-cardinality label for a SQL statement"""
+    verb = statement.lstrip()[:8].split(None, 1)
+    operation = verb[0].upper() if verb else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_sql(statement)
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_DURATION.labels(sql_operation(statement)).observe(elapsed)
+    record_timing(TIMING_POSTGRES, elapsed)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_sqlalchemy():
+    """Time every statement on every engine (async engines included)"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _mongo_command_listener():
+    from pymongo import monitoring
+
+    from utils.mongo_profiles import current_profile
+
+    class MongoCommandListener(monitoring.CommandListener):
+        """Times commands from the reported duration; no per-command state"""
+
+        def started(self, event):
+            record_mongo(event.command_name, event.command)
+
+        def succeeded(self, event):
+            self._observe(event, "ok")
+
+        def failed(self, event):
+            self._observe(event, "error")
+
+        @staticmethod
+        def _observe(event, status):
+            elapsed = event.duration_micros / 1_000_000
+            # Motor runs commands with a copy of the caller's context, profile included
+            MONGO_COMMAND_DURATION.labels(current_profile().name, event.command_name, status).observe(elapsed)
+            record_timing(TIMING_MONGO, elapsed)
+
+    return MongoCommandListener()
+
+
+_mongo_listener = None
+
+
+def instrument_pymongo():
+    """Time every MongoDB command (affects clients created afterwards)"""
+    global _mongo_listener
+    if _mongo_listener is not None:
+        return
+    from pymongo import monitoring
+
+    _mongo_listener = _mongo_command_listener()
+    monitoring.register(_mongo_listener)
+
+
+def install_instrumentation():
+    """Register the datastore hooks; missing drivers are skipped"""
+    for install in (instrument_sqlalchemy, instrument_pymongo):
+        try:
+            install()
+        except ImportError as e:
+            logger.warning(f"Instrumentation not installed: {e}")
+
+
+class OpenAITimer:
+    """Records one OpenAI call: duration, time to first token and tokens"""
+
+    __slots__ = ("operation", "model", "started", "first_token_at")
+
+    def __init__(self, operation: str, model: str):
+        self.operation = operation
+        self.model = model
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            OPENAI_TIME_TO_FIRST_TOKEN.labels(self.model).observe(self.first_token_at - self.started)
+
+    def tokens(self, kind: str, count: Optional[int]):
+        if count:
+            OPENAI_TOKENS.labels(self.operation, self.model, kind).inc(count)
+
+    def usage(self, usage):
+        """Token counts from a response's usage block"""
+        if usage is not None:
+            self.tokens("prompt", getattr(usage, "prompt_tokens", None))
+            self.tokens("completion", getattr(usage, "completion_tokens", None))
+
+    def finish(self, status: str = "ok"):
+        elapsed = time.perf_counter() - self.started
+        OPENAI_REQUEST_DURATION.labels(self.operation, self.model, status).observe(elapsed)
+        record_timing(TIMING_OPENAI, elapsed)
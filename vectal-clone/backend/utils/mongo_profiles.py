@@ -0,0 +1,122 @@
+"""
+MongoDB operation profiles
+
+A profile names the consistency and latency trade-off of an operation:
+
+- FAST_READ: secondaryPreferred (secondaries at most MONGO_MAX_STALENESS
+  behind) and a time budget that pymongo sends to the server as
+  maxTimeMS. For hot listing and search reads that tolerate replication
+  lag.
+- DURABLE_WRITE: w=majority with journaling, for writes that must survive
+  a primary failover.
+- DEFAULT: the client's settings.
+
+Services select a profile explicitly, either around a block with
+mongo_profile() or for a whole method with @with_mongo_profile().
+Collections fetched with get_collection() inside the block carry the
+profile's options, and the command listener labels its latency metrics
+with the profile's name.
+
+Results that are kept beyond the request (the read cache) must not come
+from a lagging secondary: inside primary_reads() a profile reads from
+the primary instead, keeping its time budget and write concern.
+"""
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Optional
+
+import pymongo
+from pymongo import WriteConcern
+from pymongo.read_preferences import SecondaryPreferred
+
+# Seconds a FAST_READ block may take in total (sent to the server as maxTimeMS)
+MONGO_FAST_READ_TIMEOUT = 2.0
+
+# Secondaries further behind are not read from (90 is MongoDB's minimum)
+MONGO_MAX_STALENESS = 90
+
+# Milliseconds a DURABLE_WRITE waits for majority acknowledgement
+MONGO_DURABLE_WRITE_TIMEOUT_MS = 5000
+
+
+class MongoProfile:
+    """Collection options and time budget shared by a class of operations"""
+
+    __slots__ = ("name", "options", "timeout", "primary")
+
+    def __init__(
+        self,
+        name: str,
+        read_preference=None,
+        write_concern: Optional[WriteConcern] = None,
+        timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.options: Dict[str, Any] = {}
+        if read_preference is not None:
+            self.options["read_preference"] = read_preference
+        if write_concern is not None:
+            self.options["write_concern"] = write_concern
+        # The same profile without the read preference, used inside primary_reads()
+        self.primary = self if read_preference is None else MongoProfile(
+            f"{name}_primary", write_concern=write_concern, timeout=timeout
+        )
+
+    def __repr__(self) -> str:
+        return f"MongoProfile({self.name!r})"
+
+
+DEFAULT = MongoProfile("default")
+FAST_READ = MongoProfile(
+    "fast_read",
+    read_preference=SecondaryPreferred(max_staleness=MONGO_MAX_STALENESS),
+    timeout=MONGO_FAST_READ_TIMEOUT
+)
+DURABLE_WRITE = MongoProfile(
+    "durable_write",
+    write_concern=WriteConcern(w="majority", j=True, wtimeout=MONGO_DURABLE_WRITE_TIMEOUT_MS)
+)
+
+_current_profile: ContextVar[MongoProfile] = ContextVar("mongo_profile", default=DEFAULT)
+_primary_reads: ContextVar[bool] = ContextVar("mongo_primary_reads", default=False)
+
+
+def current_profile() -> MongoProfile:
+    """Profile of the operations running in this context"""
+    return _current_profile.get()
+
+
+@contextmanager
+def mongo_profile(profile: MongoProfile):
+    """Run the block's MongoDB operations under a profile"""
+    if _primary_reads.get():
+        profile = profile.primary
+    token = _current_profile.set(profile)
+    try:
+        with pymongo.timeout(profile.timeout) if profile.timeout else nullcontext():
+            yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary in the block, whatever profile is selected"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def with_mongo_profile(profile: MongoProfile):
+    """Decorator: run a coroutine function under a profile (stack under @staticmethod)"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with mongo_profile(profile):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
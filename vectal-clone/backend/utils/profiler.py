@@ -0,0 +1,212 @@
+"""
+On-demand profiling of a running worker
+
+CPU: a sampling profiler that snapshots every thread's stack with
+sys._current_frames() at a fixed interval from a background thread. It
+adds no hooks to the interpreter, so nothing runs when no profile is in
+progress and a profile costs one stack walk per thread per interval.
+
+Memory: tracemalloc snapshots at the start and end of a window, diffed by
+allocation traceback. Tracing is only switched on for the window unless it
+was already running.
+
+Both produce collapsed stacks ("frame;frame;frame weight" per line), the
+input format of flamegraph.pl, speedscope and inferno. Weights are sample
+counts for CPU and bytes for memory.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MAX_SECONDS = 120
+PROFILE_DEFAULT_INTERVAL = 0.01
+PROFILE_MIN_INTERVAL = 0.001
+
+# Frames kept per allocation traceback while tracemalloc is on
+TRACEMALLOC_FRAMES = 25
+
+# Signal-triggered profiles
+PROFILE_SIGNAL = getattr(signal, "SIGUSR2", None)
+PROFILE_SIGNAL_SECONDS = 30
+
+# Leaf frames of threads that are waiting rather than working
+IDLE_LEAF_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running on this worker"""
+
+
+_profile_lock = threading.Lock()
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the app or site-packages; stdlib files by name"""
+    if filename.startswith(_APP_ROOT):
+        return os.path.relpath(filename, _APP_ROOT)
+    marker = f"site-packages{os.sep}"
+    index = filename.rfind(marker)
+    if index != -1:
+        return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+def _frame_label(code, labels: Dict) -> str:
+    label = labels.get(code)
+    if label is None:
+        label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        labels[code] = label
+    return label
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAF_FRAMES
+
+
+def sample_stacks(seconds: float, interval: float = PROFILE_DEFAULT_INTERVAL, include_idle: bool = False) -> Tuple[Counter, int]:
+    """Sample every other thread's stack for a while; returns (stack counts, samples taken)"""
+    own_thread = threading.get_ident()
+    stacks: Counter = Counter()
+    labels: Dict = {}
+    samples = 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread or (not include_idle and _is_idle(frame)):
+                continue
+            path = []
+            while frame is not None:
+                path.append(_frame_label(frame.f_code, labels))
+                frame = frame.f_back
+            path.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(path))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    return stacks, samples
+
+
+def collapse(stacks: Iterable[Tuple[str, int]]) -> str:
+    """Collapsed-stack text, heaviest stacks first"""
+    return "".join(f"{stack} {weight}\n" for stack, weight in sorted(stacks, key=lambda item: -item[1]))
+
+
+def _cpu_profile(seconds: float, interval: float, include_idle: bool) -> str:
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running on this worker")
+    try:
+        started = time.monotonic()
+        stacks, samples = sample_stacks(seconds, interval, include_idle)
+        logger.info(f"CPU profile: {samples} samples, {len(stacks)} stacks in {time.monotonic() - started:.1f}s")
+        return collapse(stacks.items())
+    finally:
+        _profile_lock.release()
+
+
+async def profile_cpu(
+    seconds: float,
+    interval: float = PROFILE_DEFAULT_INTERVAL,
+    include_idle: bool = False
+) -> str:
+    """Collapsed CPU stacks of this worker over the next few seconds"""
+    seconds = min(seconds, PROFILE_MAX_SECONDS)
+    interval = max(interval, PROFILE_MIN_INTERVAL)
+    # Sampled from a worker thread, so the event loop being profiled keeps running
+    return await asyncio.to_thread(_cpu_profile, seconds, interval, include_idle)
+
+
+def _allocation_stacks(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> List[Tuple[str, int]]:
+    """Bytes allocated (and still live) between two snapshots, by traceback"""
+    ignore = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, os.path.abspath(__file__)),
+    )
+    after = after.filter_traces(ignore)
+    before = before.filter_traces(ignore)
+    stacks = []
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff <= 0:
+            continue
+        frames = [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+        stacks.append((";".join(frames), stat.size_diff))
+    return stacks
+
+
+async def profile_memory(seconds: float, frames: int = TRACEMALLOC_FRAMES) -> str:
+    """Collapsed stacks of memory allocated and retained over the next few seconds"""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running on this worker")
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(frames)
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(min(seconds, PROFILE_MAX_SECONDS))
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    # Diffing large snapshots is CPU heavy; keep it off the event loop
+    return collapse(await asyncio.to_thread(_allocation_stacks, before, after))
+
+
+def _profile_to_file(seconds: float, output_dir: str):
+    try:
+        collapsed = _cpu_profile(seconds, PROFILE_DEFAULT_INTERVAL, include_idle=False)
+    except ProfilerBusy:
+        logger.warning("Profile signal ignored: a profile is already running")
+        return
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(output_dir, f"profile-{os.getpid()}-{stamp}.collapsed")
+    with open(path, "w") as f:
+        f.write(collapsed)
+    logger.warning(f"CPU profile written to {path}")
+
+
+def install_signal_handler(
+    seconds: float = PROFILE_SIGNAL_SECONDS,
+    output_dir: Optional[str] = None,
+    signum: Optional[int] = PROFILE_SIGNAL
+) -> bool:
+    """Profile the worker for `seconds` whenever it receives signum (SIGUSR2)
+
+    kill -USR2 <worker pid> writes profile-<pid>-<time>.collapsed to
+    output_dir (the temp directory by default). Must be called from the
+    main thread; returns False where the signal is unavailable.
+    """
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    output_dir = output_dir or tempfile.gettempdir()
+
+    def handle(received, frame):
+        threading.Thread(
+            target=_profile_to_file, args=(seconds, output_dir), name="profiler", daemon=True
+        ).start()
+
+    signal.signal(signum, handle)
+    logger.info(f"Send signal {signum} to pid {os.getpid()} for a {seconds}s CPU profile in {output_dir}")
+    return True
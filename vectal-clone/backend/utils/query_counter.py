@@ -0,0 +1,166 @@
+"""
+Per-request query counting and N+1 detection
+
+The datastore hooks in utils.metrics report every SQL statement and MongoDB
+command to the QueryCounters active in the current context. A counter
+groups queries by shape (the statement with parameters collapsed, or the
+Mongo command and collection), so a shape repeated once per row of a list
+stands out. The stack of the code that issued the repeated query is
+captured when a shape crosses the repeat threshold, only then.
+
+Counters nest: the request middleware and a test's count_queries() block
+both see the same queries.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+import os
+import re
+import sys
+import threading
+
+# Same query shape this many times in one request is reported as an N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+# Requests running more queries than this are reported with their top shapes
+QUERY_COUNT_WARN_THRESHOLD = 30
+
+# Application frames kept in a reported stack
+STACK_LIMIT = 12
+
+QUERY_SQL = "sql"
+QUERY_MONGO = "mongo"
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PARAM = r"(?:\$\d+|%\(\w+\)s|%s|\?)"
+_PARAM_LIST = re.compile(rf"{_PARAM}(?:\s*,\s*{_PARAM})*")
+_WHITESPACE = re.compile(r"\s+")
+
+# The hooks themselves are never the offending caller
+_HOOK_FILES = {
+    os.path.join(_APP_ROOT, "utils", "metrics.py"),
+    os.path.abspath(__file__),
+}
+
+
+@lru_cache(maxsize=2048)
+def sql_shape(statement: str) -> str:
+    """Statement with whitespace and bound parameter lists collapsed"""
+    return _PARAM_LIST.sub("?", _WHITESPACE.sub(" ", statement).strip())
+
+
+def mongo_shape(command_name: str, command) -> str:
+    """Command name and the collection it targets"""
+    target = command.get(command_name) if hasattr(command, "get") else None
+    return f"{command_name} {target}" if isinstance(target, str) else command_name
+
+
+def application_stack(limit: int = STACK_LIMIT) -> List[str]:
+    """Innermost application frames of the caller, as 'file:line in function'
+
+    SQLAlchemy runs async statements in a greenlet whose own stack ends at
+    the driver, so the walk continues into the parent greenlet to reach the
+    service and route code that awaited the query.
+    """
+    try:
+        import greenlet
+        current = greenlet.getcurrent()
+    except ImportError:
+        current = None
+
+    frames: List[str] = []
+    frame = sys._getframe(1)
+    while len(frames) < limit:
+        while frame is not None and len(frames) < limit:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_ROOT) and "site-packages" not in filename and filename not in _HOOK_FILES:
+                frames.append(f"{os.path.relpath(filename, _APP_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}")
+            frame = frame.f_back
+        current = current.parent if current is not None else None
+        if current is None:
+            break
+        frame = current.gr_frame
+    return frames
+
+
+class QueryCounter:
+    """Queries run while the counter is active, grouped by shape"""
+
+    def __init__(self, repeat_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.repeat_threshold = repeat_threshold
+        self.shapes: Counter = Counter()
+        self.stacks: Dict[Tuple[str, str], List[str]] = {}
+        # Mongo commands are reported from Motor's executor threads
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, shape: str):
+        key = (kind, shape)
+        with self._lock:
+            self.shapes[key] += 1
+            count = self.shapes[key]
+        if count == self.repeat_threshold:
+            self.stacks[key] = application_stack()
+
+    def count(self, kind: Optional[str] = None) -> int:
+        return sum(n for (k, _), n in self.shapes.items() if kind is None or k == kind)
+
+    @property
+    def sql(self) -> int:
+        return self.count(QUERY_SQL)
+
+    @property
+    def mongo(self) -> int:
+        return self.count(QUERY_MONGO)
+
+    def repeated(self) -> List[Tuple[str, str, int, List[str]]]:
+        """(kind, shape, count, stack) for shapes at or over the repeat threshold"""
+        return [
+            (kind, shape, count, self.stacks.get((kind, shape), []))
+            for (kind, shape), count in self.shapes.most_common()
+            if count >= self.repeat_threshold
+        ]
+
+    def summary(self, top: int = 5) -> str:
+        """Most frequent shapes, one per line"""
+        return "\n".join(
+            f"  {count}x {kind}: {shape[:200]}"
+            for (kind, shape), count in self.shapes.most_common(top)
+        )
+
+    def header(self) -> str:
+        """Debug header value"""
+        return f"sql={self.sql}, mongo={self.mongo}"
+
+
+_active_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+
+
+def record_sql(statement: str):
+    """Report a SQL statement to every counter active in this context"""
+    counters = _active_counters.get()
+    if counters:
+        shape = sql_shape(statement)
+        for counter in counters:
+            counter.record(QUERY_SQL, shape)
+
+
+def record_mongo(command_name: str, command):
+    """Report a MongoDB command to every counter active in this context"""
+    counters = _active_counters.get()
+    if counters:
+        shape = mongo_shape(command_name, command)
+        for counter in counters:
+            counter.record(QUERY_MONGO, shape)
+
+
+@contextmanager
+def count_queries(counter: Optional[QueryCounter] = None) -> Iterator[QueryCounter]:
+    """Count the queries run inside the block (and in tasks it starts)"""
+    counter = counter or QueryCounter()
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
@@ -0,0 +1,205 @@
+"""
+Rate limiting backends
+
+Each check is a single atomic Redis round trip: the sliding-window and
+token-bucket algorithms run as Lua scripts (EVALSHA, falling back to EVAL
+once per connection). If Redis is unavailable the same algorithms run in
+process memory, so limits keep applying per worker instead of failing open.
+After a failure Redis is skipped for RATE_LIMIT_REDIS_BACKOFF seconds, so a
+Redis that hangs costs one timeout per worker rather than one per request.
+"""
+from collections import deque
+from time import monotonic, time
+from typing import Callable, NamedTuple
+import math
+import uuid
+import logging
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+# Keys tracked by the in-memory fallback per worker
+LOCAL_LIMITER_MAXSIZE = 100_000
+
+# Seconds to use the in-memory fallback before trying Redis again
+RATE_LIMIT_REDIS_BACKOFF = 5.0
+
+# Returns {allowed, remaining, reset_ms, retry_after_ms}
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', key, window)
+
+local reset = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+local retry = 0
+if allowed == 0 then
+    retry = reset
+end
+return {allowed, limit - count, reset, retry}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local refill = capacity / window
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', key, window)
+
+local retry = 0
+if allowed == 0 then
+    retry = math.ceil((1 - tokens) / refill)
+end
+return {allowed, math.floor(tokens), math.ceil((capacity - tokens) / refill), retry}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # seconds until the limit fully resets
+    retry_after: float  # seconds until the next request would be allowed
+
+
+class LocalRateLimiter:
+    """In-process limiter used when Redis is unavailable"""
+
+    def __init__(self, maxsize: int = LOCAL_LIMITER_MAXSIZE):
+        self._state = TTLCache(maxsize, 0)
+
+    def sliding_window(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time()
+        hits = self._state.get(key)
+        if hits is None:
+            hits = deque()
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+        allowed = len(hits) < limit
+        if allowed:
+            hits.append(now)
+        self._state.set(key, hits, window)
+
+        reset = hits[0] + window - now if hits else window
+        return RateLimitResult(allowed, limit, limit - len(hits), reset, 0 if allowed else reset)
+
+    def token_bucket(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time()
+        refill = limit / window
+        tokens, ts = self._state.get(key, (limit, now))
+        tokens = min(limit, tokens + max(0.0, now - ts) * refill)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._state.set(key, (tokens, now), window)
+
+        retry_after = 0 if allowed else (1 - tokens) / refill
+        return RateLimitResult(allowed, limit, math.floor(tokens), (limit - tokens) / refill, retry_after)
+
+    def hit(self, key: str, limit: int, window: float, algorithm: str) -> RateLimitResult:
+        if algorithm == TOKEN_BUCKET:
+            return self.token_bucket(key, limit, window)
+        return self.sliding_window(key, limit, window)
+
+
+def _default_redis():
+    from utils.resources import get_resources
+    return get_resources().redis
+
+
+class RateLimiter:
+    """Redis-backed rate limiter with an in-memory fallback"""
+
+    def __init__(
+        self,
+        redis_getter: Callable = _default_redis,
+        prefix: str = "ratelimit",
+        backoff: float = RATE_LIMIT_REDIS_BACKOFF
+    ):
+        self._redis_getter = redis_getter
+        self.prefix = prefix
+        self.backoff = backoff
+        self.local = LocalRateLimiter()
+        self._scripts = {}
+        # monotonic() before which Redis is skipped; 0 while it is healthy
+        self._redis_retry_at = 0.0
+
+    def _script(self, redis, algorithm: str):
+        """Registered Lua script for an algorithm (cached per client)"""
+        cached = self._scripts.get(algorithm)
+        if cached is None or cached[0] is not redis:
+            source = TOKEN_BUCKET_SCRIPT if algorithm == TOKEN_BUCKET else SLIDING_WINDOW_SCRIPT
+            cached = (redis, redis.register_script(source))
+            self._scripts[algorithm] = cached
+        return cached[1]
+
+    async def hit(
+        self,
+        key: str,
+        limit: int,
+        window: float,
+        algorithm: str = SLIDING_WINDOW
+    ) -> RateLimitResult:
+        """Count one request against key and report whether it is allowed"""
+        window_ms = max(1, int(window * 1000))
+        if monotonic() < self._redis_retry_at:
+            return self.local.hit(key, limit, window, algorithm)
+
+        try:
+            redis = self._redis_getter()
+            script = self._script(redis, algorithm)
+            args = [limit, window_ms]
+            if algorithm != TOKEN_BUCKET:
+                args.append(uuid.uuid4().hex)
+            allowed, remaining, reset_ms, retry_ms = await script(
+                keys=[f"{self.prefix}:{algorithm}:{key}"], args=args
+            )
+        except Exception as e:
+            if not self._redis_retry_at:
+                logger.warning(f"Rate limiter falling back to local memory: {e}")
+            self._redis_retry_at = monotonic() + self.backoff
+            return self.local.hit(key, limit, window, algorithm)
+
+        if self._redis_retry_at:
+            logger.info("Rate limiter using Redis again")
+            self._redis_retry_at = 0.0
+        return RateLimitResult(
+            bool(allowed), limit, max(0, int(remaining)), int(reset_ms) / 1000, int(retry_ms) / 1000
+        )
@@ -0,0 +1,168 @@
+"""
+Vectorized recurrence expansion for many tasks at once
+
+Plain DAILY/WEEKLY/MONTHLY/YEARLY rules (optionally with INTERVAL, COUNT
+and UNTIL) are expanded with NumPy datetime64 arithmetic across all tasks
+in one pass. Rules using BYxxx parts or sub-daily frequencies fall back to
+dateutil via the shared parsed-rule cache.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Tuple, List
+
+import numpy as np
+from dateutil.rrule import DAILY, WEEKLY, MONTHLY, YEARLY
+
+from utils.rrule_cache import parse_rule, occurrences_between, as_utc
+
+US_PER_DAY = 86_400_000_000
+NO_LIMIT = np.iinfo(np.int64).max
+
+
+def _to_datetime64(value: datetime) -> np.datetime64:
+    """UTC datetime64[us] for an aware or naive-as-UTC datetime"""
+    return np.datetime64(as_utc(value).astimezone(timezone.utc).replace(tzinfo=None), 'us')
+
+
+class OccurrenceBatch:
+    """Array-backed occurrences for a batch of (dtstart, rule) items.
+
+    item_index[i] is the position of the source item in the input sequence
+    and occurs_at[i] the UTC occurrence time; rows are sorted by time.
+    """
+
+    __slots__ = ('item_index', 'occurs_at')
+
+    def __init__(self, item_index: np.ndarray, occurs_at: np.ndarray):
+        self.item_index = item_index
+        self.occurs_at = occurs_at
+
+    def __len__(self) -> int:
+        return len(self.occurs_at)
+
+    def for_item(self, index: int) -> np.ndarray:
+        """Occurrence times of one input item"""
+        return self.occurs_at[self.item_index == index]
+
+    def counts(self, n_items: int) -> np.ndarray:
+        """Number of occurrences per input item"""
+        return np.bincount(self.item_index, minlength=n_items)
+
+    def to_datetimes(self) -> List[datetime]:
+        """Occurrence times as aware UTC datetimes"""
+        return [dt.replace(tzinfo=timezone.utc) for dt in self.occurs_at.astype(datetime)]
+
+
+def _expand_days(dtstart, step_days, count, until, start, end):
+    """Fixed-length steps: exact index ranges, no candidates to filter"""
+    step = step_days * US_PER_DAY
+    elapsed_start = (start - dtstart).astype(np.int64)
+    elapsed_end = (end - dtstart).astype(np.int64)
+    elapsed_until = (until - dtstart).astype(np.int64)
+
+    k_lo = np.maximum(0, -(-elapsed_start // step))  # ceil division
+    k_hi = -(-elapsed_end // step)  # exclusive
+    k_hi = np.minimum(k_hi, count)
+    k_hi = np.where(elapsed_until >= 0, np.minimum(k_hi, elapsed_until // step + 1), 0)
+
+    n = np.maximum(k_hi - k_lo, 0)
+    local = np.repeat(np.arange(len(n)), n)
+    offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    k = k_lo[local] + offsets
+    return local, dtstart[local] + (k * step[local]).astype('timedelta64[us]')
+
+
+def _expand_months(dtstart, step_months, count, until, start, end):
+    """Calendar-month steps: generate candidates, then drop overflowed days"""
+    month0 = dtstart.astype('datetime64[M]')
+    offset = dtstart - month0.astype('datetime64[us]')  # day-of-month and time
+    first = month0.astype(np.int64)
+    start_month = start.astype('datetime64[M]').astype(np.int64)
+    end_month = end.astype('datetime64[M]').astype(np.int64)
+
+    k_lo = np.maximum(0, (start_month - first) // step_months)
+    k_hi = np.minimum((end_month - first) // step_months + 1, count)
+
+    n = np.maximum(k_hi - k_lo, 0)
+    local = np.repeat(np.arange(len(n)), n)
+    offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    months = first[local] + (k_lo[local] + offsets) * step_months[local]
+    times = months.astype('datetime64[M]').astype('datetime64[us]') + offset[local]
+
+    # Day 31 in a 30-day month (or Feb 29 off leap years) rolls over and is skipped
+    mask = (
+        (times.astype('datetime64[M]').astype(np.int64) == months)
+        & (times >= start) & (times < end) & (times <= until[local])
+    )
+    return local[mask], times[mask]
+
+
+def expand_batch(
+    items: Sequence[Tuple[datetime, str]],
+    start: datetime,
+    end: datetime
+) -> OccurrenceBatch:
+    """Occurrences in [start, end) for many (dtstart, rule) pairs"""
+    start64 = _to_datetime64(start)
+    end64 = _to_datetime64(end)
+
+    groups = {'days': ([], [], [], [], []), 'months': ([], [], [], [], [])}
+    fallback_index: List[int] = []
+    fallback_times: List[datetime] = []
+
+    for i, (dtstart, rule) in enumerate(items):
+        template = parse_rule(rule) if rule else None
+        if template is None:
+            continue
+
+        freq = template._freq
+        interval = template._interval
+        count = template._count if template._count is not None else NO_LIMIT
+        day = as_utc(dtstart).astimezone(timezone.utc).day
+
+        explicit_by = any(v is not None for v in template._original_rule.values())
+        simple = not explicit_by and freq in (DAILY, WEEKLY, MONTHLY, YEARLY)
+        # With COUNT, skipped months would shift the count; let dateutil handle those
+        if simple and freq in (MONTHLY, YEARLY) and count != NO_LIMIT and day > 28:
+            simple = False
+
+        if not simple:
+            for occurs_at in occurrences_between(rule, dtstart, start, end):
+                fallback_index.append(i)
+                fallback_times.append(occurs_at)
+            continue
+
+        until = template._until
+        if freq in (DAILY, WEEKLY):
+            group, step = groups['days'], interval * (7 if freq == WEEKLY else 1)
+        else:
+            group, step = groups['months'], interval * (12 if freq == YEARLY else 1)
+
+        group[0].append(i)
+        # dateutil drops sub-second precision from dtstart
+        group[1].append(_to_datetime64(dtstart.replace(microsecond=0)))
+        group[2].append(step)
+        group[3].append(count)
+        group[4].append(_to_datetime64(until) if until is not None else np.datetime64('9999-12-31', 'us'))
+
+    index_parts = [np.asarray(fallback_index, dtype=np.int64)]
+    time_parts = [np.array([_to_datetime64(t) for t in fallback_times], dtype='datetime64[us]')]
+
+    for name, expand in (('days', _expand_days), ('months', _expand_months)):
+        indexes, dtstarts, steps, counts, untils = groups[name]
+        if not indexes:
+            continue
+        local, times = expand(
+            np.array(dtstarts, dtype='datetime64[us]'),
+            np.array(steps, dtype=np.int64),
+            np.array(counts, dtype=np.int64),
+            np.array(untils, dtype='datetime64[us]'),
+            start64,
+            end64
+        )
+        index_parts.append(np.asarray(indexes, dtype=np.int64)[local])
+        time_parts.append(times)
+
+    item_index = np.concatenate(index_parts)
+    occurs_at = np.concatenate(time_parts)
+    order = np.lexsort((item_index, occurs_at))
+    return OccurrenceBatch(item_index[order], occurs_at[order])
@@ -0,0 +1,158 @@
+"""
+Read replica routing with a replication lag guard
+
+Read-only routes take their session from get_read_db, which asks the
+ReplicaRouter where to send it. A read goes to the replica unless:
+
+- no replica is configured, or it is unreachable;
+- the replica's measured lag is unknown or above REPLICA_MAX_LAG;
+- the caller wrote within the read-your-writes window.
+
+A background monitor measures the lag every REPLICA_LAG_CHECK_INTERVAL
+seconds. Since reads only use a replica whose lag was at most
+REPLICA_MAX_LAG, a write is visible there once the window
+(REPLICA_MAX_LAG + REPLICA_LAG_CHECK_INTERVAL) has passed.
+
+Writers are identified by a digest of their Authorization header. It is
+recorded in-process and in Redis, so every worker sees it.
+"""
+from typing import Callable, Optional
+import asyncio
+import hashlib
+import logging
+
+from utils.config import settings
+from utils.metrics import DB_READ_ROUTES, DB_REPLICA_LAG
+from utils.resources import AppResources, get_resources
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_MAX_LAG = 2.0
+REPLICA_LAG_CHECK_INTERVAL = 1.0
+REPLICA_WRITER_PREFIX = "pgwriter"
+REPLICA_WRITERS_MAXSIZE = 10_000
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+# Seconds the replica is behind; 0 on a primary or a caught-up standby
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def writer_key(authorization: Optional[str]) -> Optional[str]:
+    """Identity of the caller for read-your-writes, without keeping the credential"""
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+
+def _default_redis():
+    return get_resources().redis
+
+
+class ReplicaRouter:
+    """Chooses the primary or the replica for read-only sessions"""
+
+    def __init__(
+        self,
+        redis_getter: Callable = _default_redis,
+        max_lag: Optional[float] = None,
+        check_interval: Optional[float] = None
+    ):
+        self._redis_getter = redis_getter
+        self.max_lag = getattr(settings, "REPLICA_MAX_LAG", REPLICA_MAX_LAG) if max_lag is None else max_lag
+        self.check_interval = (
+            getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", REPLICA_LAG_CHECK_INTERVAL)
+            if check_interval is None else check_interval
+        )
+        # None until the first successful check: unknown lag reads from the primary
+        self.lag: Optional[float] = None
+        self._writers = TTLCache(REPLICA_WRITERS_MAXSIZE, self.window)
+
+    @property
+    def window(self) -> float:
+        """Seconds after a write during which the writer reads from the primary"""
+        return self.max_lag + self.check_interval
+
+    @staticmethod
+    def _key(writer: str) -> str:
+        return f"{REPLICA_WRITER_PREFIX}:{writer}"
+
+    async def mark_write(self, writer: Optional[str]):
+        """Send this writer's reads to the primary for the next window"""
+        if not writer:
+            return
+        self._writers.set(writer, True)
+        try:
+            await self._redis_getter().set(self._key(writer), 1, px=int(self.window * 1000))
+        except Exception as e:
+            logger.warning(f"Could not record write for replica routing: {e}")
+
+    async def wrote_recently(self, writer: Optional[str]) -> bool:
+        if not writer:
+            return False
+        if writer in self._writers:
+            return True
+        try:
+            return bool(await self._redis_getter().exists(self._key(writer)))
+        except Exception as e:
+            # Without Redis another worker's write cannot be ruled out
+            logger.warning(f"Could not check recent writes for replica routing: {e}")
+            return True
+
+    async def route(self, resources: AppResources, writer: Optional[str]) -> str:
+        """PRIMARY or REPLICA for a read-only session"""
+        if resources.replica_engine is None:
+            reason = "no_replica"
+        elif self.lag is None or self.lag > self.max_lag:
+            reason = "lagging"
+        elif await self.wrote_recently(writer):
+            reason = "recent_write"
+        else:
+            DB_READ_ROUTES.labels(REPLICA, "ok").inc()
+            return REPLICA
+        DB_READ_ROUTES.labels(PRIMARY, reason).inc()
+        return PRIMARY
+
+    async def session_factory(self, resources: AppResources, writer: Optional[str]):
+        """Session factory for a read-only request"""
+        if await self.route(resources, writer) == REPLICA:
+            return resources.replica_session_factory
+        return resources.session_factory
+
+    async def check_lag(self, resources: AppResources) -> Optional[float]:
+        """Measure the replica's lag; None if it could not be reached"""
+        from sqlalchemy import text
+
+        try:
+            async with resources.replica_engine.connect() as conn:
+                lag = float((await conn.execute(text(REPLICA_LAG_SQL))).scalar() or 0)
+        except Exception as e:
+            if self.lag is not None:
+                logger.warning(f"Replica unreachable, reading from the primary: {e}")
+            self.lag = None
+            return None
+
+        if lag > self.max_lag and (self.lag is None or self.lag <= self.max_lag):
+            logger.warning(f"Replica lag {lag:.1f}s exceeds {self.max_lag}s, reading from the primary")
+        self.lag = lag
+        DB_REPLICA_LAG.set(lag)
+        return lag
+
+    async def run_lag_monitor(self, resources: AppResources):
+        """Keep self.lag current while the app runs"""
+        while True:
+            await self.check_lag(resources)
+            await asyncio.sleep(self.check_interval)
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,386 @@
+"""
+Application resource container
+
+AppResources owns the pooled clients (Postgres engine, Motor client, Redis
+pool, Qdrant and OpenAI clients, plus an optional Postgres read replica)
+for the lifetime of the app. It is created
+in the FastAPI lifespan, stored on app.state and reachable from services
+through get_resources(). Clients are created on first use, so tests and
+load tests can build a container with their own URLs and install it with
+set_resources() to reuse warm pools.
+
+Once shutdown starts the container is draining: readiness reports 503 so
+the load balancer stops routing here, and new streaming responses are
+refused with ShuttingDown while the open ones finish.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import logging
+
+from utils.config import settings
+from utils.datastores import DatastoreRegistry, datastores
+
+logger = logging.getLogger(__name__)
+
+# Postgres pool (each overridable by the setting of the same name)
+PG_POOL_SIZE = 10
+PG_MAX_OVERFLOW = 20
+PG_POOL_TIMEOUT = 30
+PG_POOL_RECYCLE = 1800
+PG_POOL_PRE_PING = True
+
+# asyncpg prepared statements cached per connection; set 0 behind
+# PgBouncer in transaction pooling mode
+PG_STATEMENT_CACHE_SIZE = 500
+
+# MongoDB pool
+MONGO_MAX_POOL_SIZE = 100
+MONGO_MIN_POOL_SIZE = 0
+MONGO_DEFAULT_DATABASE = "vectal"
+
+# Redis pool
+REDIS_MAX_CONNECTIONS = 50
+
+# Seconds before a Redis connect or command gives up; the command timeout
+# must exceed the change feed's XREAD block (1s)
+REDIS_SOCKET_CONNECT_TIMEOUT = 1.0
+REDIS_SOCKET_TIMEOUT = 3.0
+
+# Seconds shutdown waits for in-flight streaming responses
+SHUTDOWN_DRAIN_TIMEOUT = 10
+
+
+class ShuttingDown(Exception):
+    """Raised when a stream is started on a draining worker"""
+
+
+class AppResources:
+    """Pooled clients shared by every request on a worker"""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        replica_url: Optional[str] = None,
+        mongodb_url: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        qdrant_url: Optional[str] = None,
+        openai_api_key: Optional[str] = None,
+        openai_base_url: Optional[str] = None,
+        pg_pool_size: Optional[int] = None,
+        pg_max_overflow: Optional[int] = None,
+        mongo_max_pool_size: int = MONGO_MAX_POOL_SIZE,
+        redis_max_connections: int = REDIS_MAX_CONNECTIONS,
+        registry: Optional[DatastoreRegistry] = None,
+        legacy_connections: bool = False,
+        mongo_profiles: bool = True
+    ):
+        self.database_url = database_url or settings.DATABASE_URL
+        self.replica_url = replica_url or getattr(settings, "DATABASE_REPLICA_URL", None)
+        self.mongodb_url = mongodb_url or settings.MONGODB_URL
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.qdrant_url = qdrant_url or getattr(settings, "QDRANT_URL", None)
+        self.openai_api_key = openai_api_key or settings.OPENAI_API_KEY
+        self.openai_base_url = openai_base_url or getattr(settings, "OPENAI_BASE_URL", None)
+        self.pg_pool_size = getattr(settings, "PG_POOL_SIZE", PG_POOL_SIZE) if pg_pool_size is None else pg_pool_size
+        self.pg_max_overflow = (
+            getattr(settings, "PG_MAX_OVERFLOW", PG_MAX_OVERFLOW) if pg_max_overflow is None else pg_max_overflow
+        )
+        self.mongo_max_pool_size = mongo_max_pool_size
+        self.redis_max_connections = redis_max_connections
+        self.registry = registry or datastores
+        # Also open the db.mongodb / db.redis_client / db.vector_db clients, for
+        # deployments still running modules that have not moved to the
+        # container; each of those stores then has a second pool
+        self.legacy_connections = legacy_connections
+        # Collection options of MongoDB operation profiles (in-memory test
+        # doubles do not support them)
+        self.mongo_profiles = mongo_profiles
+
+        self._engine = None
+        self._session_factory = None
+        self._replica_engine = None
+        self._replica_session_factory = None
+        self._mongo_client = None
+        self._redis = None
+        self._qdrant = None
+        self._openai = None
+
+        self.active_streams = 0
+        self.draining = False
+        self._streams_idle = asyncio.Event()
+        self._streams_idle.set()
+
+    async def startup(self):
+        """Connect every datastore concurrently"""
+        self.registry.register("postgres", self._connect_postgres, self._close_postgres, timeout=10)
+        if self.replica_url:
+            # Reads fall back to the primary, so a missing replica never blocks startup
+            self.registry.register(
+                "postgres_replica", self._connect_replica, self._close_replica, timeout=10, required=False
+            )
+        self.registry.register("mongodb", self._connect_mongodb, self._close_mongodb, timeout=10)
+        self.registry.register("redis", self._connect_redis, self._close_redis, timeout=5)
+        if self.qdrant_url:
+            self.registry.register("qdrant", self._connect_qdrant, self._close_qdrant, timeout=15, lazy=True)
+
+        await self.registry.connect_all()
+
+    def _create_pg_engine(self, url: str):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        options = {}
+        if url.startswith("postgresql+asyncpg"):
+            cache_size = getattr(settings, "PG_STATEMENT_CACHE_SIZE", PG_STATEMENT_CACHE_SIZE)
+            # SQLAlchemy's prepared statement LRU and asyncpg's own cache
+            options["connect_args"] = {
+                "prepared_statement_cache_size": cache_size,
+                "statement_cache_size": cache_size,
+            }
+        return create_async_engine(
+            url,
+            pool_size=self.pg_pool_size,
+            max_overflow=self.pg_max_overflow,
+            pool_timeout=getattr(settings, "PG_POOL_TIMEOUT", PG_POOL_TIMEOUT),
+            pool_recycle=getattr(settings, "PG_POOL_RECYCLE", PG_POOL_RECYCLE),
+            pool_pre_ping=getattr(settings, "PG_POOL_PRE_PING", PG_POOL_PRE_PING),
+            **options
+        )
+
+    @property
+    def engine(self):
+        """Postgres engine, created on first use"""
+        if self._engine is None:
+            self._engine = self._create_pg_engine(self.database_url)
+        return self._engine
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+            self._session_factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        return self._session_factory
+
+    @property
+    def replica_engine(self):
+        """Read replica engine, or None without DATABASE_REPLICA_URL"""
+        if self._replica_engine is None and self.replica_url:
+            self._replica_engine = self._create_pg_engine(self.replica_url)
+        return self._replica_engine
+
+    @property
+    def replica_session_factory(self):
+        """Sessions on the read replica (the primary's factory without one)"""
+        if self.replica_engine is None:
+            return self.session_factory
+        if self._replica_session_factory is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+            self._replica_session_factory = async_sessionmaker(
+                self.replica_engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._replica_session_factory
+
+    @property
+    def mongo_client(self):
+        """Motor client, created on first use"""
+        if self._mongo_client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self._mongo_client = AsyncIOMotorClient(
+                self.mongodb_url,
+                maxPoolSize=self.mongo_max_pool_size,
+                minPoolSize=MONGO_MIN_POOL_SIZE
+            )
+        return self._mongo_client
+
+    @property
+    def mongo_db(self):
+        """Database named in the MongoDB URL"""
+        return self.mongo_client.get_default_database(MONGO_DEFAULT_DATABASE)
+
+    @property
+    def redis(self):
+        """Redis client backed by a shared connection pool"""
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                max_connections=self.redis_max_connections,
+                socket_connect_timeout=getattr(settings, "REDIS_SOCKET_CONNECT_TIMEOUT", REDIS_SOCKET_CONNECT_TIMEOUT),
+                socket_timeout=getattr(settings, "REDIS_SOCKET_TIMEOUT", REDIS_SOCKET_TIMEOUT),
+                decode_responses=True
+            )
+        return self._redis
+
+    async def _connect_postgres(self):
+        from sqlalchemy import text
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _close_postgres(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = self._session_factory = None
+
+    async def _connect_replica(self):
+        from sqlalchemy import text
+        async with self.replica_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _close_replica(self):
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose()
+            self._replica_engine = self._replica_session_factory = None
+
+    async def _connect_mongodb(self):
+        pending = [self.mongo_client.admin.command("ping")]
+        if self.legacy_connections:
+            from db.mongodb import connect_mongodb
+            pending.append(connect_mongodb())
+        await asyncio.gather(*pending)
+
+    async def _close_mongodb(self):
+        if self._mongo_client is not None:
+            self._mongo_client.close()
+            self._mongo_client = None
+        if self.legacy_connections:
+            from db.mongodb import close_mongodb
+            await close_mongodb()
+
+    async def _connect_redis(self):
+        pending = [self.redis.ping()]
+        if self.legacy_connections:
+            from db.redis_client import connect_redis
+            pending.append(connect_redis())
+        await asyncio.gather(*pending)
+
+    async def _close_redis(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        if self.legacy_connections:
+            from db.redis_client import close_redis
+            await close_redis()
+
+    async def _connect_qdrant(self):
+        pending = [self.qdrant.get_collections()]
+        if self.legacy_connections:
+            from db.vector_db import connect_qdrant
+            pending.append(connect_qdrant())
+        await asyncio.gather(*pending)
+
+    async def _close_qdrant(self):
+        if self._qdrant is not None:
+            await self._qdrant.close()
+            self._qdrant = None
+        if self.legacy_connections:
+            from db.vector_db import close_qdrant
+            await close_qdrant()
+
+    @property
+    def qdrant(self):
+        """Qdrant client, created on first use"""
+        if self._qdrant is None:
+            from qdrant_client import AsyncQdrantClient
+            self._qdrant = AsyncQdrantClient(url=self.qdrant_url)
+        return self._qdrant
+
+    @property
+    def openai(self):
+        """OpenAI client, created on first use"""
+        if self._openai is None:
+            from openai import AsyncOpenAI
+            self._openai = AsyncOpenAI(api_key=self.openai_api_key, base_url=self.openai_base_url)
+        return self._openai
+
+    def collection(self, name: str):
+        """MongoDB collection from the shared client, with the active operation profile's options"""
+        from utils.mongo_profiles import current_profile
+
+        collection = self.mongo_db[name]
+        options = current_profile().options
+        if options and self.mongo_profiles:
+            collection = collection.with_options(**options)
+        return collection
+
+    @asynccontextmanager
+    async def session(self):
+        """Postgres session from the shared pool, for work outside a request"""
+        async with self.session_factory() as session:
+            yield session
+
+    def track_stream(self, body: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Wrap a streaming response body so shutdown waits for it to finish
+
+        Raises ShuttingDown once draining, before any response is sent.
+        """
+        if self.draining:
+            raise ShuttingDown()
+        return self._tracked(body)
+
+    async def _tracked(self, body: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        self.active_streams += 1
+        self._streams_idle.clear()
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self.active_streams -= 1
+            if self.active_streams == 0:
+                self._streams_idle.set()
+
+    async def drain(self, timeout: float = SHUTDOWN_DRAIN_TIMEOUT) -> bool:
+        """Wait for in-flight streams; returns False if some were still open"""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._streams_idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutting down with {self.active_streams} streams still open")
+            return False
+        return True
+
+    async def shutdown(self):
+        """Drain streams, then close every pool"""
+        await self.drain()
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+        await self.registry.close_all()
+
+        # Clients created outside startup() (e.g. in tests) are not in the registry
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        if self._mongo_client is not None:
+            self._mongo_client.close()
+            self._mongo_client = None
+        if self._qdrant is not None:
+            await self._qdrant.close()
+            self._qdrant = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = self._session_factory = None
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose()
+            self._replica_engine = self._replica_session_factory = None
+
+
+_resources: Optional[AppResources] = None
+
+
+def set_resources(resources: Optional[AppResources]):
+    """Install the container used by get_resources()"""
+    global _resources
+    _resources = resources
+
+
+def get_resources() -> AppResources:
+    """Container of the running app (a default one is created outside the lifespan)"""
+    global _resources
+    if _resources is None:
+        _resources = AppResources()
+    return _resources
+
+
+def get_collection(name: str):
+    """MongoDB collection from the running app's client"""
+    return get_resources().collection(name)
@@ -0,0 +1,36 @@
+"""
+Pre-validated model responses
+
+ModelResponse is the fast path for routes that have already built their
+response model: returning it skips FastAPI's dump-and-revalidate against
+response_model and serializes the model once with pydantic-core
+(model_dump_json). The decorator's response_model still documents the
+route in OpenAPI. RawJSONResponse sends a body that is already JSON, such
+as one served from the read cache.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def dump_json(content: Any) -> bytes:
+    """JSON bytes of a Pydantic model or plain JSON-serializable content"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ModelResponse(JSONResponse):
+    """Response for an already validated Pydantic model"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+class RawJSONResponse(JSONResponse):
+    """Response whose content is already serialized JSON"""
+
+    def render(self, content: Any) -> bytes:
+        return content.encode("utf-8") if isinstance(content, str) else content
@@ -0,0 +1,86 @@
+"""
+Parsed recurrence rule cache
+
+Parsing an RRULE string is far more expensive than evaluating it, and the
+same handful of rule strings are shared by most recurring tasks. Rules are
+parsed once into dateutil rrule templates keyed by rule string, then bound
+to each task's start date with rrule.replace().
+"""
+from functools import lru_cache
+from datetime import datetime, timezone
+import re
+from typing import Optional, List
+
+from dateutil.rrule import rrule, rrulestr
+
+# Shorthand rules accepted by RecurrenceRule.parse_simple_rule
+SIMPLE_FREQUENCIES = {
+    "daily": "DAILY",
+    "weekly": "WEEKLY",
+    "monthly": "MONTHLY",
+    "yearly": "YEARLY",
+}
+
+# Templates are parsed against a fixed, timezone-aware start date
+TEMPLATE_DTSTART = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Floating UNTIL (date-only or without Z), which dateutil rejects next to
+# an aware start date
+FLOATING_UNTIL = re.compile(r"UNTIL=(\d{8})(T\d{6})?(?![\dTZ])", re.IGNORECASE)
+
+
+def _utc_until(match: re.Match) -> str:
+    """Floating UNTIL as UTC; a date covers the whole day"""
+    return f"UNTIL={match.group(1)}{(match.group(2) or 'T235959').upper()}Z"
+
+
+def normalize_rule(rule: str) -> str:
+    """Normalize shorthand and 'RRULE:'-prefixed rules to bare RRULE syntax"""
+    rule = rule.strip()
+    if rule.lower() in SIMPLE_FREQUENCIES:
+        return f"FREQ={SIMPLE_FREQUENCIES[rule.lower()]};INTERVAL=1"
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[len("RRULE:"):]
+    return FLOATING_UNTIL.sub(_utc_until, rule)
+
+
+@lru_cache(maxsize=4096)
+def parse_rule(rule: str) -> Optional[rrule]:
+    """Parse a rule string once; returns None for invalid rules"""
+    try:
+        parsed = rrulestr(normalize_rule(rule), dtstart=TEMPLATE_DTSTART)
+    except (ValueError, TypeError, KeyError, IndexError):
+        return None
+    return parsed if isinstance(parsed, rrule) else None
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def bind_rule(rule: str, dtstart: datetime) -> Optional[rrule]:
+    """Cached rule bound to a start date, or None if the rule is invalid"""
+    template = parse_rule(rule)
+    if template is None:
+        return None
+    try:
+        return template.replace(dtstart=as_utc(dtstart))
+    except ValueError:
+        return None
+
+
+def occurrences_between(
+    rule: str,
+    dtstart: datetime,
+    start: datetime,
+    end: datetime
+) -> List[datetime]:
+    """Occurrences of a rule in [start, end)"""
+    bound = bind_rule(rule, dtstart)
+    if bound is None:
+        return []
+    end = as_utc(end)
+    return [o for o in bound.between(as_utc(start), end, inc=True) if o < end]
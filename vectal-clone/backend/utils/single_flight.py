@@ -0,0 +1,106 @@
+"""
+In-process single-flight for identical concurrent reads
+
+When several requests on a worker make the same call at the same time
+(a dashboard firing GET /projects/{id}/progress from three components),
+only the first runs it; the others await the same task. Nothing is kept
+once the call finishes, so the next burst runs it again. The only
+staleness is within a burst: a caller that joins a running call may miss
+a write that committed after that call started.
+
+The call runs with the first caller's arguments, including its session,
+and is cancelled if that caller is; the others then run it again.
+
+Shared results must be treated as read-only by callers. Only use it for
+methods that return plain data (dicts, tuples, models), not ORM objects
+bound to the first caller's session.
+"""
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable
+import asyncio
+import inspect
+
+from utils.metrics import SINGLE_FLIGHT_CALLS
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], label: str = "") -> Any:
+        """Result of fn(), shared with every concurrent caller using the same key
+
+        fn() belongs to the first caller and may use its request-scoped
+        resources (its session), so the call is cancelled with that caller.
+        The callers sharing it then start over with their own fn().
+        """
+        while True:
+            task = self._calls.get(key)
+            if task is None or task.cancelled():
+                SINGLE_FLIGHT_CALLS.labels(label, "leader").inc()
+                task = asyncio.create_task(fn())
+                self._calls[key] = task
+                task.add_done_callback(lambda done: self._forget(key, done))
+                # Not shielded: cancelling the leader cancels the call
+                return await task
+
+            SINGLE_FLIGHT_CALLS.labels(label, "shared").inc()
+            try:
+                # Shielded: a cancelled follower leaves the call running
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller went away
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(item) for item in value)
+        return frozenset(items) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+single_flight = SingleFlight()
+
+
+def coalesce(exclude: Iterable[str] = ("db",), flight: SingleFlight = single_flight):
+    """Decorator: concurrent calls with equal arguments share one execution
+
+    Arguments named in exclude (the caller's session by default) are left
+    out of the key; every other argument, including the user ID, is part
+    of it. Stack it under @staticmethod.
+    """
+    exclude = frozenset(exclude)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple(
+                _freeze(value) for param, value in bound.arguments.items() if param not in exclude
+            )
+            return await flight.do(key, lambda: func(*args, **kwargs), name)
+
+        return wrapper
+
+    return decorator
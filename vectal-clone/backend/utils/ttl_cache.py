@@ -0,0 +1,55 @@
+"""
+In-process LRU cache with per-entry expiry
+"""
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire after a TTL (seconds)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key, or default if missing or expired"""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries when full"""
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value"""
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove all keys matching predicate"""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None